@@ -0,0 +1,91 @@
+"""
+Event-loop latency while many coroutines cite through Reference_Handler.
+
+A ticker coroutine sleeps for 1 ms in a loop and records how late it wakes
+up, while N coroutines cite either with the blocking cite or with acite.
+
+    python devtools/benchmarks/bench_async.py --coroutines 10000
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from reference_handler import Reference_Handler
+
+from fixtures import raw_citation
+
+
+async def ticker(delays, stop):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.001)
+        delays.append(time.perf_counter() - start - 0.001)
+
+
+async def run(database, n_coroutines, n_refs, use_async):
+    raws = [raw_citation(i) for i in range(n_refs)]
+    rf = await Reference_Handler.aopen(database)
+
+    async def cite(i):
+        kwargs = {
+            'raw': raws[i % n_refs],
+            'alias': 'paper_%d' % (i % n_refs),
+            'module': 'coroutine_%d' % (i % 100),
+            'level': 1,
+            'note': 'benchmark'
+        }
+        if use_async:
+            await rf.acite(**kwargs)
+        else:
+            rf.cite(**kwargs)
+        await asyncio.sleep(0)
+
+    delays = []
+    stop = asyncio.Event()
+    tick = asyncio.ensure_future(ticker(delays, stop))
+
+    start = time.perf_counter()
+    await asyncio.gather(*[cite(i) for i in range(n_coroutines)])
+    await rf.aflush()
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await tick
+    total = sum(rf.total_mentions(reference_id=i + 1) for i in range(n_refs))
+    await rf.aclose()
+
+    delays.sort()
+    return (
+        elapsed, total == n_coroutines, delays[len(delays) // 2], delays[-1]
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--coroutines', type=int, default=10000)
+    parser.add_argument('--refs', type=int, default=10)
+    args = parser.parse_args()
+
+    print(
+        '%-8s %10s %8s %14s %14s' %
+        ('mode', 'cites/s', 'exact', 'median lag ms', 'max lag ms')
+    )
+    for mode, use_async in (('cite', False), ('acite', True)):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            database = os.path.join(tmpdir, 'bench.db')
+            elapsed, exact, median, worst = asyncio.run(
+                run(database, args.coroutines, args.refs, use_async)
+            )
+        print(
+            '%-8s %10.0f %8s %14.2f %14.2f' % (
+                mode, args.coroutines / elapsed, exact, 1000 * median,
+                1000 * worst
+            )
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Time of dump(fmt='text') with the text formatted in a pool of processes.
+
+The render cache and the parse cache of the handler are emptied before each
+run, so every citation is formatted. With --parse, the stored fields of the
+citations are emptied too, so every raw text is parsed as well, as in
+databases from before the fields were stored.
+The serial dump is the baseline of the speedups; the output of every run is
+checked against it, in order. The number of cores of the machine is printed
+first: with fewer cores than workers, the runs mostly measure the cost of
+spawning the pool and of sending the chunks to it. Without --parse, the
+formatting of each citation is cheap and the pool is rarely worth it.
+
+    python devtools/benchmarks/bench_dump_workers.py --citations 2000 [--parse]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from reference_handler import Reference_Handler
+
+from fixtures import populate
+
+
+def run(rf, workers, parse):
+    """Returns the time of a dump from empty caches, and the dump."""
+    rf.backend.cur.execute('DELETE FROM render_cache')
+    if parse:
+        rf.backend.cur.execute('DELETE FROM citation_fields')
+    rf.backend.commit()
+    rf.parse_cache.clear()
+
+    start = time.perf_counter()
+    dump = rf.dump(fmt='text', workers=workers)
+
+    return time.perf_counter() - start, dump
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--citations', type=int, default=2000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument(
+        '--parse',
+        action='store_true',
+        help='Empty the stored fields, so the raw texts are parsed'
+    )
+    args = parser.parse_args()
+
+    print('cores: %d' % os.cpu_count())
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        rf = Reference_Handler(os.path.join(tmpdir, 'bench.db'))
+        populate(rf, args.citations)
+
+        serial, expected = run(rf, None, args.parse)
+        print('%-10s %12s %10s' % ('workers', 'time [s]', 'speedup'))
+        print('%-10s %12.2f %10.2f' % ('serial', serial, 1.0))
+        for workers in args.workers:
+            elapsed, dump = run(rf, workers, args.parse)
+            if dump != expected:
+                raise RuntimeError(
+                    'The dump with %d workers differs' % workers
+                )
+            print('%-10d %12.2f %10.2f' % (workers, elapsed, serial / elapsed))
+
+        rf.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Time taken by `import reference_handler`, measured with python -X importtime.
+
+Each run is a fresh interpreter. The bytecode is cached in a temporary
+directory by a first, unmeasured run, so the numbers are those of an
+installed package rather than of compiling the sources. The report gives the
+median total and the modules with the largest median self time, and lists
+the heavy optional modules that the import pulled in, which should be none.
+
+    python devtools/benchmarks/bench_import.py --runs 20 --top 10
+"""
+
+import argparse
+import collections
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# Modules that should only be imported when the feature needing them is used
+lazy_modules = [
+    'asyncio', 'bibtexparser', 'concurrent.futures', 'pprint', 'pyparsing',
+    'socket', 'sqlite3', 'tempfile'
+]
+
+script = """
+import sys
+import reference_handler
+print(' '.join(m for m in %r if m in sys.modules))
+""" % (lazy_modules,)
+
+
+def run(env):
+    """Returns the self and cumulative times in microseconds of each module,
+    and the lazy modules that were imported."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', script],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+
+    return times, result.stdout.split()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env = dict(os.environ, PYTHONPYCACHEPREFIX=tmpdir)
+        env.pop('PYTHONDONTWRITEBYTECODE', None)
+
+        run(env)
+
+        self_times = collections.defaultdict(list)
+        totals = []
+        for i in range(args.runs):
+            times, imported = run(env)
+            totals.append(times['reference_handler'][1])
+            for name, (self_us, cumulative_us) in times.items():
+                self_times[name].append(self_us)
+
+    print(
+        'import reference_handler: %.1f ms (median of %d runs)' %
+        (statistics.median(totals) / 1000, args.runs)
+    )
+    print('lazy modules imported: %s' % (', '.join(imported) or 'none'))
+    print()
+    print('%-45s %12s' % ('module', 'self [ms]'))
+    medians = {
+        name: statistics.median(values) for name, values in self_times.items()
+    }
+    for name in sorted(medians, key=medians.get, reverse=True)[:args.top]:
+        print('%-45s %12.2f' % (name, medians[name] / 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Throughput of decode_latex, against the four passes of the separate regexps.
+
+The text is a bibliography of the given size made of a few entries dense in
+LaTeX accents, symbols, dashes and braces, and of plain prose. decode_latex
+replaces the commands in one scan with decode_re and pairs the braces by
+splitting the text; the passes replace the matches of dash_re, symbol_re,
+accent_re and brace_re in turn, as decode_latex used to. Both must give the
+same text. The report gives the best of the runs.
+
+    python devtools/benchmarks/bench_latex.py --size 4 --runs 5
+"""
+
+import argparse
+import time
+
+from reference_handler import latex_utf8
+
+entries = [
+    r"""@article{Vorlova_2015,
+ author = {Barbora Vorlov{\'{a}} and Dana Nachtigallov{\'{a}} and Jana
+ Jir{\'{a}}skov{\'{a}}-Van{\'{\i}}{\v{c}}kov{\'{a}} and
+ Jan {\v{R}}ez{\'{a}}{\v{c}} and Jind{\v{r}}ich Fanfrl{\'{\i}}k and
+ Martin Lep{\v{s}}{\'{\i}}k},
+ title = {Malonate-based inhibitors of mammalian serine racemase},
+ journal = {European Journal of Medicinal Chemistry},
+ pages = {189--197},
+ year = {2015}
+}
+""",
+    r"""@article{Lowdin_1950,
+ author = {Per-Olov L\"{o}wdin and Bj\o{}rn R{\o}nning and \L{}ukasz
+ Kr\'{o}l and Jos\'{e} Ant\'{o}nio Mu\~{n}oz},
+ title = {On the {Non-Orthogonality} Problem --- a {Review}},
+ journal = {The Journal of Chemical Physics},
+ pages = {365--375},
+ year = {1950}
+}
+""",
+    """@misc{Plain_2020,
+ author = {Jane Doe and Richard Roe},
+ title = {A study of plain text without any markup at all, which is the
+ common case in the databases of most codes},
+ year = {2020}
+}
+""",
+]
+
+
+def decode_latex_passes(text):
+    """Decodes the LaTeX with the four passes of the separate regexps."""
+    text = latex_utf8.dash_re.sub(latex_utf8._decode_latex_dash, text)
+    text = latex_utf8.symbol_re.sub(latex_utf8._decode_latex_symbol, text)
+    text = latex_utf8.accent_re.sub(latex_utf8._decode_latex_accent, text)
+
+    return latex_utf8.brace_re.sub(r'\1', text)
+
+
+def best_time(function, text, runs):
+    """Returns the shortest time of the runs of the function, and its
+    result."""
+    times = []
+    for i in range(runs):
+        start = time.perf_counter()
+        result = function(text)
+        times.append(time.perf_counter() - start)
+
+    return min(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument(
+        '--size', type=float, default=4, help='The size of the text in MB'
+    )
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    bibliography = ''.join(entries)
+    text = bibliography * int(args.size * 1e6 / len(bibliography) + 1)
+    size = len(text.encode('utf-8')) / 1e6
+
+    passes, expected = best_time(decode_latex_passes, text, args.runs)
+    scan, result = best_time(latex_utf8.decode_latex, text, args.runs)
+    if result != expected:
+        raise RuntimeError('decode_latex differs from the four passes')
+
+    print('text: %.1f MB' % size)
+    print('%-15s %10s %10s' % ('', 'time [s]', 'MB/s'))
+    print('%-15s %10.3f %10.1f' % ('four passes', passes, size / passes))
+    print('%-15s %10.3f %10.1f' % ('decode_latex', scan, size / scan))
+    print('speedup: %.2f' % (passes / scan))
+
+
+if __name__ == '__main__':
+    main()
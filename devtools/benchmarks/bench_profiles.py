@@ -0,0 +1,66 @@
+"""
+Cite and dump throughput of Reference_Handler under each SQLite profile.
+
+Every cite is committed on its own (no buffering), so the numbers mostly
+reflect the cost of a transaction under the profile's journal and
+synchronous settings.
+
+    python devtools/benchmarks/bench_profiles.py --cites 2000 --dumps 20
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from reference_handler import Reference_Handler
+from reference_handler.reference_handler import sqlite_profiles
+
+from fixtures import raw_citation
+
+
+def run(profile, n_cites, n_refs, n_dumps):
+    """Returns the number of cites and dumps per second."""
+    raws = [raw_citation(i) for i in range(n_refs)]
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        rf = Reference_Handler(
+            os.path.join(tmpdir, 'bench.db'), profile=profile
+        )
+
+        start = time.perf_counter()
+        for i in range(n_cites):
+            rf.cite(
+                raw=raws[i % n_refs],
+                alias='paper_%d' % (i % n_refs),
+                module='module_%d' % (i % 37),
+                level=1 + i % 3,
+                note='benchmark'
+            )
+        cite_rate = n_cites / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for i in range(n_dumps):
+            rf.dump()
+        dump_rate = n_dumps / (time.perf_counter() - start)
+
+        rf.close()
+
+    return cite_rate, dump_rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--cites', type=int, default=2000)
+    parser.add_argument('--refs', type=int, default=100)
+    parser.add_argument('--dumps', type=int, default=20)
+    args = parser.parse_args()
+
+    print('%-10s %12s %12s' % ('profile', 'cites/s', 'dumps/s'))
+    for profile in sqlite_profiles:
+        cite_rate, dump_rate = run(profile, args.cites, args.refs, args.dumps)
+        print('%-10s %12.0f %12.1f' % (profile, cite_rate, dump_rate))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Stress benchmark for citing from many threads into one Reference_Handler.
+
+Each thread cites a handful of references from its own module; at the end
+the counts in the database are checked against the number of calls made.
+
+    python devtools/benchmarks/bench_threads.py --threads 1 2 4 8
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from reference_handler import Reference_Handler
+
+from fixtures import raw_citation
+
+
+def run(n_threads, n_cites, n_refs, **kwargs):
+    """Returns the wall time and whether the counts are exact."""
+    raws = [raw_citation(i) for i in range(n_refs)]
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        rf = Reference_Handler(os.path.join(tmpdir, 'bench.db'), **kwargs)
+
+        def worker(i):
+            for j in range(n_cites):
+                k = j % n_refs
+                rf.cite(
+                    raw=raws[k],
+                    alias='paper_%d' % k,
+                    module='thread_%d' % i,
+                    level=1,
+                    note='benchmark'
+                )
+
+        threads = [
+            threading.Thread(target=worker, args=(i,))
+            for i in range(n_threads)
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        rf.flush()
+        elapsed = time.perf_counter() - start
+
+        total = sum(
+            rf.total_mentions(reference_id=i + 1) for i in range(n_refs)
+        )
+        exact = total == n_threads * n_cites
+        rf.conn.close()
+
+    return elapsed, exact
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--cites', type=int, default=2000)
+    parser.add_argument('--refs', type=int, default=10)
+    args = parser.parse_args()
+
+    print('%-10s %8s %12s %8s' % ('mode', 'threads', 'cites/s', 'exact'))
+    for mode, kwargs in (('direct', {}), ('buffered', {'buffered': True})):
+        for n_threads in args.threads:
+            elapsed, exact = run(n_threads, args.cites, args.refs, **kwargs)
+            rate = n_threads * args.cites / elapsed
+            print('%-10s %8d %12.0f %8s' % (mode, n_threads, rate, exact))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,36 @@
+"""
+Citations shared by the benchmarks, which import this module from the
+directory of the scripts.
+"""
+
+raw_template = """@article{{Paper{0},
+ author = {{Doe, Jane and Roe, Richard and M\\"{{u}}ller, Hans}},
+ title = {{The $\\alpha$-helix of H$_2$O, part {0}}},
+ journal = {{Journal of Benchmarks}},
+ volume = {{{1}}},
+ pages = {{1--{0}}},
+ year = {{2020}},
+ doi = {{10.0000/bench.{0}}}
+}}
+"""
+
+
+def raw_citation(i):
+    """Returns the raw BibTeX text of the i-th citation."""
+    return raw_template.format(i, i % 50)
+
+
+def populate(rf, n_citations):
+    """
+    Cites the first n_citations citations once each, in one transaction, from
+    37 modules and all the levels.
+    """
+    rf.cite_many(
+        (
+            raw_citation(i),
+            'paper_%d' % i,
+            'module_%d' % (i % 37),
+            'benchmark',
+            1 + i % 3,
+        ) for i in range(n_citations)
+    )
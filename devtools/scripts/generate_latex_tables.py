@@ -0,0 +1,102 @@
+"""
+Generates reference_handler/_latex_tables.py, the static LaTeX tables.
+
+The encoding dictionary of latex_utf8 and the patterns of the regexps of
+latex_utf8 and reference_handler are built from the dictionaries of accents,
+symbols, dashes, subscripts, superscripts and Greek letters. Building them
+on every import is slow, so this script writes them into a module that is
+loaded on first use instead. Rerun it after changing those dictionaries;
+with --check it only reports whether the module is up to date.
+
+    PYTHONPATH=. python devtools/scripts/generate_latex_tables.py [--check]
+"""
+
+import argparse
+import os
+import sys
+
+from reference_handler.latex_utf8 import _construct_encoding
+from reference_handler.latex_utf8 import _construct_patterns
+from reference_handler.reference_handler import _math_symbol_patterns
+
+output = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir,
+    'reference_handler', '_latex_tables.py'
+)
+
+header = '''"""
+The LaTeX encoding table and the patterns of the LaTeX regexps.
+
+Generated by devtools/scripts/generate_latex_tables.py from the dictionaries
+in latex_utf8.py and reference_handler.py. Do not edit.
+"""
+'''
+
+# The width of the lines of the module
+width = 79
+
+
+def literal(text, indent):
+    """Returns the ASCII source of a string, split on several lines if it is
+    too long for one."""
+    if indent + len(ascii(text)) < width - 1:
+        return ascii(text)
+
+    chunks = ['']
+    for char in text:
+        if indent + 4 + len(ascii(chunks[-1] + char)) > width:
+            chunks.append('')
+        chunks[-1] += char
+
+    prefix = '\n' + ' ' * (indent + 4)
+    return '(%s%s\n%s)' % (
+        prefix, prefix.join(ascii(chunk) for chunk in chunks), ' ' * indent
+    )
+
+
+def render():
+    """Returns the source of the module of tables."""
+    patterns = _construct_patterns()
+    patterns.update(_math_symbol_patterns())
+
+    lines = [header, '# yapf: disable', '']
+    lines.append('# The LaTeX encoding of each accented or special character')
+    lines.append('encoding = {')
+    for key, value in _construct_encoding().items():
+        lines.append('    %s: %s,' % (ascii(key), ascii(value)))
+    lines.append('}')
+    lines.append('')
+    lines.append('# The patterns of the regexps, keyed by their names')
+    lines.append('patterns = {')
+    for name, pattern in patterns.items():
+        lines.append('    %s:' % ascii(name))
+        lines.append('        %s,' % literal(pattern, 8))
+    lines.append('}')
+
+    return '\n'.join(lines) + '\n'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument(
+        '--check',
+        action='store_true',
+        help='Exit with an error if the module is out of date'
+    )
+    args = parser.parse_args()
+
+    text = render()
+
+    if args.check:
+        with open(output, 'r') as f:
+            if f.read() != text:
+                print('%s is out of date' % os.path.normpath(output))
+                sys.exit(1)
+        return
+
+    with open(output, 'w') as f:
+        f.write(text)
+
+
+if __name__ == '__main__':
+    main()
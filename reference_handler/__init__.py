@@ -5,13 +5,21 @@ A Python package that facilitates the citation of scientific material.
 
 # Add imports here
 from .reference_handler import Reference_Handler  # noqa: F401
+from .backends import Backend, SQLiteBackend  # noqa: F401
+from .backends import MemoryBackend, LogBackend  # noqa: F401
 from .latex_utf8 import decode_latex  # noqa: F401
 from .latex_utf8 import encode_latex  # noqa: F401
 
-# Handle versioneer
-from ._version import get_versions
 
-versions = get_versions()
-__version__ = versions['version']
-__git_revision__ = versions['full-revisionid']
-del get_versions, versions
+# Handle versioneer. Finding the version may run git, so it is done when
+# __version__ or __git_revision__ is first accessed rather than on import.
+def __getattr__(name):
+    if name in ('__version__', '__git_revision__'):
+        from ._version import get_versions
+
+        versions = get_versions()
+        globals()['__version__'] = versions['version']
+        globals()['__git_revision__'] = versions['full-revisionid']
+        return globals()[name]
+
+    raise AttributeError('module %r has no attribute %r' % (__name__, name))
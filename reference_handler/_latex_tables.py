@@ -0,0 +1,1525 @@
+"""
+The LaTeX encoding table and the patterns of the LaTeX regexps.
+
+Generated by devtools/scripts/generate_latex_tables.py from the dictionaries
+in latex_utf8.py and reference_handler.py. Do not edit.
+"""
+
+# yapf: disable
+
+# The LaTeX encoding of each accented or special character
+encoding = {
+    'A\u0308': '\\"{A}',
+    '\xc4': '\\"{A}',
+    'B\u0308': '\\"{B}',
+    'C\u0308': '\\"{C}',
+    'D\u0308': '\\"{D}',
+    'E\u0308': '\\"{E}',
+    '\xcb': '\\"{E}',
+    'F\u0308': '\\"{F}',
+    'G\u0308': '\\"{G}',
+    'H\u0308': '\\"{H}',
+    '\u1e26': '\\"{H}',
+    'I\u0308': '\\"{I}',
+    '\xcf': '\\"{I}',
+    'J\u0308': '\\"{J}',
+    'K\u0308': '\\"{K}',
+    'L\u0308': '\\"{L}',
+    'M\u0308': '\\"{M}',
+    'N\u0308': '\\"{N}',
+    'O\u0308': '\\"{O}',
+    '\xd6': '\\"{O}',
+    'P\u0308': '\\"{P}',
+    'Q\u0308': '\\"{Q}',
+    'R\u0308': '\\"{R}',
+    'S\u0308': '\\"{S}',
+    'T\u0308': '\\"{T}',
+    'U\u0308': '\\"{U}',
+    '\xdc': '\\"{U}',
+    'V\u0308': '\\"{V}',
+    'W\u0308': '\\"{W}',
+    '\u1e84': '\\"{W}',
+    'X\u0308': '\\"{X}',
+    '\u1e8c': '\\"{X}',
+    'Y\u0308': '\\"{Y}',
+    '\u0178': '\\"{Y}',
+    'Z\u0308': '\\"{Z}',
+    'a\u0308': '\\"{a}',
+    '\xe4': '\\"{a}',
+    'b\u0308': '\\"{b}',
+    'c\u0308': '\\"{c}',
+    'd\u0308': '\\"{d}',
+    'e\u0308': '\\"{e}',
+    '\xeb': '\\"{e}',
+    'f\u0308': '\\"{f}',
+    'g\u0308': '\\"{g}',
+    'h\u0308': '\\"{h}',
+    '\u1e27': '\\"{h}',
+    'i\u0308': '\\"{i}',
+    '\xef': '\\"{i}',
+    'j\u0308': '\\"{j}',
+    'k\u0308': '\\"{k}',
+    'l\u0308': '\\"{l}',
+    'm\u0308': '\\"{m}',
+    'n\u0308': '\\"{n}',
+    'o\u0308': '\\"{o}',
+    '\xf6': '\\"{o}',
+    'p\u0308': '\\"{p}',
+    'q\u0308': '\\"{q}',
+    'r\u0308': '\\"{r}',
+    's\u0308': '\\"{s}',
+    't\u0308': '\\"{t}',
+    '\u1e97': '\\"{t}',
+    'u\u0308': '\\"{u}',
+    '\xfc': '\\"{u}',
+    'v\u0308': '\\"{v}',
+    'w\u0308': '\\"{w}',
+    '\u1e85': '\\"{w}',
+    'x\u0308': '\\"{x}',
+    '\u1e8d': '\\"{x}',
+    'y\u0308': '\\"{y}',
+    '\xff': '\\"{y}',
+    'z\u0308': '\\"{z}',
+    '\u0131\u0308': '\\"{\u0131}',
+    '\u0237\u0308': '\\"{\u0237}',
+    'A\u0301': "\\'{A}",
+    '\xc1': "\\'{A}",
+    'B\u0301': "\\'{B}",
+    'C\u0301': "\\'{C}",
+    '\u0106': "\\'{C}",
+    'D\u0301': "\\'{D}",
+    'E\u0301': "\\'{E}",
+    '\xc9': "\\'{E}",
+    'F\u0301': "\\'{F}",
+    'G\u0301': "\\'{G}",
+    '\u01f4': "\\'{G}",
+    'H\u0301': "\\'{H}",
+    'I\u0301': "\\'{I}",
+    '\xcd': "\\'{I}",
+    'J\u0301': "\\'{J}",
+    'K\u0301': "\\'{K}",
+    '\u1e30': "\\'{K}",
+    'L\u0301': "\\'{L}",
+    '\u0139': "\\'{L}",
+    'M\u0301': "\\'{M}",
+    '\u1e3e': "\\'{M}",
+    'N\u0301': "\\'{N}",
+    '\u0143': "\\'{N}",
+    'O\u0301': "\\'{O}",
+    '\xd3': "\\'{O}",
+    'P\u0301': "\\'{P}",
+    '\u1e54': "\\'{P}",
+    'Q\u0301': "\\'{Q}",
+    'R\u0301': "\\'{R}",
+    '\u0154': "\\'{R}",
+    'S\u0301': "\\'{S}",
+    '\u015a': "\\'{S}",
+    'T\u0301': "\\'{T}",
+    'U\u0301': "\\'{U}",
+    '\xda': "\\'{U}",
+    'V\u0301': "\\'{V}",
+    'W\u0301': "\\'{W}",
+    '\u1e82': "\\'{W}",
+    'X\u0301': "\\'{X}",
+    'Y\u0301': "\\'{Y}",
+    '\xdd': "\\'{Y}",
+    'Z\u0301': "\\'{Z}",
+    '\u0179': "\\'{Z}",
+    'a\u0301': "\\'{a}",
+    '\xe1': "\\'{a}",
+    'b\u0301': "\\'{b}",
+    'c\u0301': "\\'{c}",
+    '\u0107': "\\'{c}",
+    'd\u0301': "\\'{d}",
+    'e\u0301': "\\'{e}",
+    '\xe9': "\\'{e}",
+    'f\u0301': "\\'{f}",
+    'g\u0301': "\\'{g}",
+    '\u01f5': "\\'{g}",
+    'h\u0301': "\\'{h}",
+    'i\u0301': "\\'{i}",
+    '\xed': "\\'{i}",
+    'j\u0301': "\\'{j}",
+    'k\u0301': "\\'{k}",
+    '\u1e31': "\\'{k}",
+    'l\u0301': "\\'{l}",
+    '\u013a': "\\'{l}",
+    'm\u0301': "\\'{m}",
+    '\u1e3f': "\\'{m}",
+    'n\u0301': "\\'{n}",
+    '\u0144': "\\'{n}",
+    'o\u0301': "\\'{o}",
+    '\xf3': "\\'{o}",
+    'p\u0301': "\\'{p}",
+    '\u1e55': "\\'{p}",
+    'q\u0301': "\\'{q}",
+    'r\u0301': "\\'{r}",
+    '\u0155': "\\'{r}",
+    's\u0301': "\\'{s}",
+    '\u015b': "\\'{s}",
+    't\u0301': "\\'{t}",
+    'u\u0301': "\\'{u}",
+    '\xfa': "\\'{u}",
+    'v\u0301': "\\'{v}",
+    'w\u0301': "\\'{w}",
+    '\u1e83': "\\'{w}",
+    'x\u0301': "\\'{x}",
+    'y\u0301': "\\'{y}",
+    '\xfd': "\\'{y}",
+    'z\u0301': "\\'{z}",
+    '\u017a': "\\'{z}",
+    '\u0131\u0301': "\\'{\u0131}",
+    '\u0237\u0301': "\\'{\u0237}",
+    'A\u0307': '\\.{A}',
+    '\u0226': '\\.{A}',
+    'B\u0307': '\\.{B}',
+    '\u1e02': '\\.{B}',
+    'C\u0307': '\\.{C}',
+    '\u010a': '\\.{C}',
+    'D\u0307': '\\.{D}',
+    '\u1e0a': '\\.{D}',
+    'E\u0307': '\\.{E}',
+    '\u0116': '\\.{E}',
+    'F\u0307': '\\.{F}',
+    '\u1e1e': '\\.{F}',
+    'G\u0307': '\\.{G}',
+    '\u0120': '\\.{G}',
+    'H\u0307': '\\.{H}',
+    '\u1e22': '\\.{H}',
+    'I\u0307': '\\.{I}',
+    '\u0130': '\\.{I}',
+    'J\u0307': '\\.{J}',
+    'K\u0307': '\\.{K}',
+    'L\u0307': '\\.{L}',
+    'M\u0307': '\\.{M}',
+    '\u1e40': '\\.{M}',
+    'N\u0307': '\\.{N}',
+    '\u1e44': '\\.{N}',
+    'O\u0307': '\\.{O}',
+    '\u022e': '\\.{O}',
+    'P\u0307': '\\.{P}',
+    '\u1e56': '\\.{P}',
+    'Q\u0307': '\\.{Q}',
+    'R\u0307': '\\.{R}',
+    '\u1e58': '\\.{R}',
+    'S\u0307': '\\.{S}',
+    '\u1e60': '\\.{S}',
+    'T\u0307': '\\.{T}',
+    '\u1e6a': '\\.{T}',
+    'U\u0307': '\\.{U}',
+    'V\u0307': '\\.{V}',
+    'W\u0307': '\\.{W}',
+    '\u1e86': '\\.{W}',
+    'X\u0307': '\\.{X}',
+    '\u1e8a': '\\.{X}',
+    'Y\u0307': '\\.{Y}',
+    '\u1e8e': '\\.{Y}',
+    'Z\u0307': '\\.{Z}',
+    '\u017b': '\\.{Z}',
+    'a\u0307': '\\.{a}',
+    '\u0227': '\\.{a}',
+    'b\u0307': '\\.{b}',
+    '\u1e03': '\\.{b}',
+    'c\u0307': '\\.{c}',
+    '\u010b': '\\.{c}',
+    'd\u0307': '\\.{d}',
+    '\u1e0b': '\\.{d}',
+    'e\u0307': '\\.{e}',
+    '\u0117': '\\.{e}',
+    'f\u0307': '\\.{f}',
+    '\u1e1f': '\\.{f}',
+    'g\u0307': '\\.{g}',
+    '\u0121': '\\.{g}',
+    'h\u0307': '\\.{h}',
+    '\u1e23': '\\.{h}',
+    'i\u0307': '\\.{i}',
+    'j\u0307': '\\.{j}',
+    'k\u0307': '\\.{k}',
+    'l\u0307': '\\.{l}',
+    'm\u0307': '\\.{m}',
+    '\u1e41': '\\.{m}',
+    'n\u0307': '\\.{n}',
+    '\u1e45': '\\.{n}',
+    'o\u0307': '\\.{o}',
+    '\u022f': '\\.{o}',
+    'p\u0307': '\\.{p}',
+    '\u1e57': '\\.{p}',
+    'q\u0307': '\\.{q}',
+    'r\u0307': '\\.{r}',
+    '\u1e59': '\\.{r}',
+    's\u0307': '\\.{s}',
+    '\u1e61': '\\.{s}',
+    't\u0307': '\\.{t}',
+    '\u1e6b': '\\.{t}',
+    'u\u0307': '\\.{u}',
+    'v\u0307': '\\.{v}',
+    'w\u0307': '\\.{w}',
+    '\u1e87': '\\.{w}',
+    'x\u0307': '\\.{x}',
+    '\u1e8b': '\\.{x}',
+    'y\u0307': '\\.{y}',
+    '\u1e8f': '\\.{y}',
+    'z\u0307': '\\.{z}',
+    '\u017c': '\\.{z}',
+    '\u0131\u0307': '\\.{\u0131}',
+    '\u0237\u0307': '\\.{\u0237}',
+    'A\u0304': '\\={A}',
+    '\u0100': '\\={A}',
+    'B\u0304': '\\={B}',
+    'C\u0304': '\\={C}',
+    'D\u0304': '\\={D}',
+    'E\u0304': '\\={E}',
+    '\u0112': '\\={E}',
+    'F\u0304': '\\={F}',
+    'G\u0304': '\\={G}',
+    '\u1e20': '\\={G}',
+    'H\u0304': '\\={H}',
+    'I\u0304': '\\={I}',
+    '\u012a': '\\={I}',
+    'J\u0304': '\\={J}',
+    'K\u0304': '\\={K}',
+    'L\u0304': '\\={L}',
+    'M\u0304': '\\={M}',
+    'N\u0304': '\\={N}',
+    'O\u0304': '\\={O}',
+    '\u014c': '\\={O}',
+    'P\u0304': '\\={P}',
+    'Q\u0304': '\\={Q}',
+    'R\u0304': '\\={R}',
+    'S\u0304': '\\={S}',
+    'T\u0304': '\\={T}',
+    'U\u0304': '\\={U}',
+    '\u016a': '\\={U}',
+    'V\u0304': '\\={V}',
+    'W\u0304': '\\={W}',
+    'X\u0304': '\\={X}',
+    'Y\u0304': '\\={Y}',
+    '\u0232': '\\={Y}',
+    'Z\u0304': '\\={Z}',
+    'a\u0304': '\\={a}',
+    '\u0101': '\\={a}',
+    'b\u0304': '\\={b}',
+    'c\u0304': '\\={c}',
+    'd\u0304': '\\={d}',
+    'e\u0304': '\\={e}',
+    '\u0113': '\\={e}',
+    'f\u0304': '\\={f}',
+    'g\u0304': '\\={g}',
+    '\u1e21': '\\={g}',
+    'h\u0304': '\\={h}',
+    'i\u0304': '\\={i}',
+    '\u012b': '\\={i}',
+    'j\u0304': '\\={j}',
+    'k\u0304': '\\={k}',
+    'l\u0304': '\\={l}',
+    'm\u0304': '\\={m}',
+    'n\u0304': '\\={n}',
+    'o\u0304': '\\={o}',
+    '\u014d': '\\={o}',
+    'p\u0304': '\\={p}',
+    'q\u0304': '\\={q}',
+    'r\u0304': '\\={r}',
+    's\u0304': '\\={s}',
+    't\u0304': '\\={t}',
+    'u\u0304': '\\={u}',
+    '\u016b': '\\={u}',
+    'v\u0304': '\\={v}',
+    'w\u0304': '\\={w}',
+    'x\u0304': '\\={x}',
+    'y\u0304': '\\={y}',
+    '\u0233': '\\={y}',
+    'z\u0304': '\\={z}',
+    '\u0131\u0304': '\\={\u0131}',
+    '\u0237\u0304': '\\={\u0237}',
+    'A\u0302': '\\^{A}',
+    '\xc2': '\\^{A}',
+    'B\u0302': '\\^{B}',
+    'C\u0302': '\\^{C}',
+    '\u0108': '\\^{C}',
+    'D\u0302': '\\^{D}',
+    'E\u0302': '\\^{E}',
+    '\xca': '\\^{E}',
+    'F\u0302': '\\^{F}',
+    'G\u0302': '\\^{G}',
+    '\u011c': '\\^{G}',
+    'H\u0302': '\\^{H}',
+    '\u0124': '\\^{H}',
+    'I\u0302': '\\^{I}',
+    '\xce': '\\^{I}',
+    'J\u0302': '\\^{J}',
+    '\u0134': '\\^{J}',
+    'K\u0302': '\\^{K}',
+    'L\u0302': '\\^{L}',
+    'M\u0302': '\\^{M}',
+    'N\u0302': '\\^{N}',
+    'O\u0302': '\\^{O}',
+    '\xd4': '\\^{O}',
+    'P\u0302': '\\^{P}',
+    'Q\u0302': '\\^{Q}',
+    'R\u0302': '\\^{R}',
+    'S\u0302': '\\^{S}',
+    '\u015c': '\\^{S}',
+    'T\u0302': '\\^{T}',
+    'U\u0302': '\\^{U}',
+    '\xdb': '\\^{U}',
+    'V\u0302': '\\^{V}',
+    'W\u0302': '\\^{W}',
+    '\u0174': '\\^{W}',
+    'X\u0302': '\\^{X}',
+    'Y\u0302': '\\^{Y}',
+    '\u0176': '\\^{Y}',
+    'Z\u0302': '\\^{Z}',
+    '\u1e90': '\\^{Z}',
+    'a\u0302': '\\^{a}',
+    '\xe2': '\\^{a}',
+    'b\u0302': '\\^{b}',
+    'c\u0302': '\\^{c}',
+    '\u0109': '\\^{c}',
+    'd\u0302': '\\^{d}',
+    'e\u0302': '\\^{e}',
+    '\xea': '\\^{e}',
+    'f\u0302': '\\^{f}',
+    'g\u0302': '\\^{g}',
+    '\u011d': '\\^{g}',
+    'h\u0302': '\\^{h}',
+    '\u0125': '\\^{h}',
+    'i\u0302': '\\^{i}',
+    '\xee': '\\^{i}',
+    'j\u0302': '\\^{j}',
+    '\u0135': '\\^{j}',
+    'k\u0302': '\\^{k}',
+    'l\u0302': '\\^{l}',
+    'm\u0302': '\\^{m}',
+    'n\u0302': '\\^{n}',
+    'o\u0302': '\\^{o}',
+    '\xf4': '\\^{o}',
+    'p\u0302': '\\^{p}',
+    'q\u0302': '\\^{q}',
+    'r\u0302': '\\^{r}',
+    's\u0302': '\\^{s}',
+    '\u015d': '\\^{s}',
+    't\u0302': '\\^{t}',
+    'u\u0302': '\\^{u}',
+    '\xfb': '\\^{u}',
+    'v\u0302': '\\^{v}',
+    'w\u0302': '\\^{w}',
+    '\u0175': '\\^{w}',
+    'x\u0302': '\\^{x}',
+    'y\u0302': '\\^{y}',
+    '\u0177': '\\^{y}',
+    'z\u0302': '\\^{z}',
+    '\u1e91': '\\^{z}',
+    '\u0131\u0302': '\\^{\u0131}',
+    '\u0237\u0302': '\\^{\u0237}',
+    'A\u0300': '\\`{A}',
+    '\xc0': '\\`{A}',
+    'B\u0300': '\\`{B}',
+    'C\u0300': '\\`{C}',
+    'D\u0300': '\\`{D}',
+    'E\u0300': '\\`{E}',
+    '\xc8': '\\`{E}',
+    'F\u0300': '\\`{F}',
+    'G\u0300': '\\`{G}',
+    'H\u0300': '\\`{H}',
+    'I\u0300': '\\`{I}',
+    '\xcc': '\\`{I}',
+    'J\u0300': '\\`{J}',
+    'K\u0300': '\\`{K}',
+    'L\u0300': '\\`{L}',
+    'M\u0300': '\\`{M}',
+    'N\u0300': '\\`{N}',
+    '\u01f8': '\\`{N}',
+    'O\u0300': '\\`{O}',
+    '\xd2': '\\`{O}',
+    'P\u0300': '\\`{P}',
+    'Q\u0300': '\\`{Q}',
+    'R\u0300': '\\`{R}',
+    'S\u0300': '\\`{S}',
+    'T\u0300': '\\`{T}',
+    'U\u0300': '\\`{U}',
+    '\xd9': '\\`{U}',
+    'V\u0300': '\\`{V}',
+    'W\u0300': '\\`{W}',
+    '\u1e80': '\\`{W}',
+    'X\u0300': '\\`{X}',
+    'Y\u0300': '\\`{Y}',
+    '\u1ef2': '\\`{Y}',
+    'Z\u0300': '\\`{Z}',
+    'a\u0300': '\\`{a}',
+    '\xe0': '\\`{a}',
+    'b\u0300': '\\`{b}',
+    'c\u0300': '\\`{c}',
+    'd\u0300': '\\`{d}',
+    'e\u0300': '\\`{e}',
+    '\xe8': '\\`{e}',
+    'f\u0300': '\\`{f}',
+    'g\u0300': '\\`{g}',
+    'h\u0300': '\\`{h}',
+    'i\u0300': '\\`{i}',
+    '\xec': '\\`{i}',
+    'j\u0300': '\\`{j}',
+    'k\u0300': '\\`{k}',
+    'l\u0300': '\\`{l}',
+    'm\u0300': '\\`{m}',
+    'n\u0300': '\\`{n}',
+    '\u01f9': '\\`{n}',
+    'o\u0300': '\\`{o}',
+    '\xf2': '\\`{o}',
+    'p\u0300': '\\`{p}',
+    'q\u0300': '\\`{q}',
+    'r\u0300': '\\`{r}',
+    's\u0300': '\\`{s}',
+    't\u0300': '\\`{t}',
+    'u\u0300': '\\`{u}',
+    '\xf9': '\\`{u}',
+    'v\u0300': '\\`{v}',
+    'w\u0300': '\\`{w}',
+    '\u1e81': '\\`{w}',
+    'x\u0300': '\\`{x}',
+    'y\u0300': '\\`{y}',
+    '\u1ef3': '\\`{y}',
+    'z\u0300': '\\`{z}',
+    '\u0131\u0300': '\\`{\u0131}',
+    '\u0237\u0300': '\\`{\u0237}',
+    'A\u030d': '\\|{A}',
+    'B\u030d': '\\|{B}',
+    'C\u030d': '\\|{C}',
+    'D\u030d': '\\|{D}',
+    'E\u030d': '\\|{E}',
+    'F\u030d': '\\|{F}',
+    'G\u030d': '\\|{G}',
+    'H\u030d': '\\|{H}',
+    'I\u030d': '\\|{I}',
+    'J\u030d': '\\|{J}',
+    'K\u030d': '\\|{K}',
+    'L\u030d': '\\|{L}',
+    'M\u030d': '\\|{M}',
+    'N\u030d': '\\|{N}',
+    'O\u030d': '\\|{O}',
+    'P\u030d': '\\|{P}',
+    'Q\u030d': '\\|{Q}',
+    'R\u030d': '\\|{R}',
+    'S\u030d': '\\|{S}',
+    'T\u030d': '\\|{T}',
+    'U\u030d': '\\|{U}',
+    'V\u030d': '\\|{V}',
+    'W\u030d': '\\|{W}',
+    'X\u030d': '\\|{X}',
+    'Y\u030d': '\\|{Y}',
+    'Z\u030d': '\\|{Z}',
+    'a\u030d': '\\|{a}',
+    'b\u030d': '\\|{b}',
+    'c\u030d': '\\|{c}',
+    'd\u030d': '\\|{d}',
+    'e\u030d': '\\|{e}',
+    'f\u030d': '\\|{f}',
+    'g\u030d': '\\|{g}',
+    'h\u030d': '\\|{h}',
+    'i\u030d': '\\|{i}',
+    'j\u030d': '\\|{j}',
+    'k\u030d': '\\|{k}',
+    'l\u030d': '\\|{l}',
+    'm\u030d': '\\|{m}',
+    'n\u030d': '\\|{n}',
+    'o\u030d': '\\|{o}',
+    'p\u030d': '\\|{p}',
+    'q\u030d': '\\|{q}',
+    'r\u030d': '\\|{r}',
+    's\u030d': '\\|{s}',
+    't\u030d': '\\|{t}',
+    'u\u030d': '\\|{u}',
+    'v\u030d': '\\|{v}',
+    'w\u030d': '\\|{w}',
+    'x\u030d': '\\|{x}',
+    'y\u030d': '\\|{y}',
+    'z\u030d': '\\|{z}',
+    '\u0131\u030d': '\\|{\u0131}',
+    '\u0237\u030d': '\\|{\u0237}',
+    'A\u0303': '\\~{A}',
+    '\xc3': '\\~{A}',
+    'B\u0303': '\\~{B}',
+    'C\u0303': '\\~{C}',
+    'D\u0303': '\\~{D}',
+    'E\u0303': '\\~{E}',
+    '\u1ebc': '\\~{E}',
+    'F\u0303': '\\~{F}',
+    'G\u0303': '\\~{G}',
+    'H\u0303': '\\~{H}',
+    'I\u0303': '\\~{I}',
+    '\u0128': '\\~{I}',
+    'J\u0303': '\\~{J}',
+    'K\u0303': '\\~{K}',
+    'L\u0303': '\\~{L}',
+    'M\u0303': '\\~{M}',
+    'N\u0303': '\\~{N}',
+    '\xd1': '\\~{N}',
+    'O\u0303': '\\~{O}',
+    '\xd5': '\\~{O}',
+    'P\u0303': '\\~{P}',
+    'Q\u0303': '\\~{Q}',
+    'R\u0303': '\\~{R}',
+    'S\u0303': '\\~{S}',
+    'T\u0303': '\\~{T}',
+    'U\u0303': '\\~{U}',
+    '\u0168': '\\~{U}',
+    'V\u0303': '\\~{V}',
+    '\u1e7c': '\\~{V}',
+    'W\u0303': '\\~{W}',
+    'X\u0303': '\\~{X}',
+    'Y\u0303': '\\~{Y}',
+    '\u1ef8': '\\~{Y}',
+    'Z\u0303': '\\~{Z}',
+    'a\u0303': '\\~{a}',
+    '\xe3': '\\~{a}',
+    'b\u0303': '\\~{b}',
+    'c\u0303': '\\~{c}',
+    'd\u0303': '\\~{d}',
+    'e\u0303': '\\~{e}',
+    '\u1ebd': '\\~{e}',
+    'f\u0303': '\\~{f}',
+    'g\u0303': '\\~{g}',
+    'h\u0303': '\\~{h}',
+    'i\u0303': '\\~{i}',
+    '\u0129': '\\~{i}',
+    'j\u0303': '\\~{j}',
+    'k\u0303': '\\~{k}',
+    'l\u0303': '\\~{l}',
+    'm\u0303': '\\~{m}',
+    'n\u0303': '\\~{n}',
+    '\xf1': '\\~{n}',
+    'o\u0303': '\\~{o}',
+    '\xf5': '\\~{o}',
+    'p\u0303': '\\~{p}',
+    'q\u0303': '\\~{q}',
+    'r\u0303': '\\~{r}',
+    's\u0303': '\\~{s}',
+    't\u0303': '\\~{t}',
+    'u\u0303': '\\~{u}',
+    '\u0169': '\\~{u}',
+    'v\u0303': '\\~{v}',
+    '\u1e7d': '\\~{v}',
+    'w\u0303': '\\~{w}',
+    'x\u0303': '\\~{x}',
+    'y\u0303': '\\~{y}',
+    '\u1ef9': '\\~{y}',
+    'z\u0303': '\\~{z}',
+    '\u0131\u0303': '\\~{\u0131}',
+    '\u0237\u0303': '\\~{\u0237}',
+    'A\u0331': '\\b{A}',
+    'B\u0331': '\\b{B}',
+    '\u1e06': '\\b{B}',
+    'C\u0331': '\\b{C}',
+    'D\u0331': '\\b{D}',
+    '\u1e0e': '\\b{D}',
+    'E\u0331': '\\b{E}',
+    'F\u0331': '\\b{F}',
+    'G\u0331': '\\b{G}',
+    'H\u0331': '\\b{H}',
+    'I\u0331': '\\b{I}',
+    'J\u0331': '\\b{J}',
+    'K\u0331': '\\b{K}',
+    '\u1e34': '\\b{K}',
+    'L\u0331': '\\b{L}',
+    '\u1e3a': '\\b{L}',
+    'M\u0331': '\\b{M}',
+    'N\u0331': '\\b{N}',
+    '\u1e48': '\\b{N}',
+    'O\u0331': '\\b{O}',
+    'P\u0331': '\\b{P}',
+    'Q\u0331': '\\b{Q}',
+    'R\u0331': '\\b{R}',
+    '\u1e5e': '\\b{R}',
+    'S\u0331': '\\b{S}',
+    'T\u0331': '\\b{T}',
+    '\u1e6e': '\\b{T}',
+    'U\u0331': '\\b{U}',
+    'V\u0331': '\\b{V}',
+    'W\u0331': '\\b{W}',
+    'X\u0331': '\\b{X}',
+    'Y\u0331': '\\b{Y}',
+    'Z\u0331': '\\b{Z}',
+    '\u1e94': '\\b{Z}',
+    'a\u0331': '\\b{a}',
+    'b\u0331': '\\b{b}',
+    '\u1e07': '\\b{b}',
+    'c\u0331': '\\b{c}',
+    'd\u0331': '\\b{d}',
+    '\u1e0f': '\\b{d}',
+    'e\u0331': '\\b{e}',
+    'f\u0331': '\\b{f}',
+    'g\u0331': '\\b{g}',
+    'h\u0331': '\\b{h}',
+    '\u1e96': '\\b{h}',
+    'i\u0331': '\\b{i}',
+    'j\u0331': '\\b{j}',
+    'k\u0331': '\\b{k}',
+    '\u1e35': '\\b{k}',
+    'l\u0331': '\\b{l}',
+    '\u1e3b': '\\b{l}',
+    'm\u0331': '\\b{m}',
+    'n\u0331': '\\b{n}',
+    '\u1e49': '\\b{n}',
+    'o\u0331': '\\b{o}',
+    'p\u0331': '\\b{p}',
+    'q\u0331': '\\b{q}',
+    'r\u0331': '\\b{r}',
+    '\u1e5f': '\\b{r}',
+    's\u0331': '\\b{s}',
+    't\u0331': '\\b{t}',
+    '\u1e6f': '\\b{t}',
+    'u\u0331': '\\b{u}',
+    'v\u0331': '\\b{v}',
+    'w\u0331': '\\b{w}',
+    'x\u0331': '\\b{x}',
+    'y\u0331': '\\b{y}',
+    'z\u0331': '\\b{z}',
+    '\u1e95': '\\b{z}',
+    '\u0131\u0331': '\\b{\u0131}',
+    '\u0237\u0331': '\\b{\u0237}',
+    'A\u0327': '\\c{A}',
+    'B\u0327': '\\c{B}',
+    'C\u0327': '\\c{C}',
+    '\xc7': '\\c{C}',
+    'D\u0327': '\\c{D}',
+    '\u1e10': '\\c{D}',
+    'E\u0327': '\\c{E}',
+    '\u0228': '\\c{E}',
+    'F\u0327': '\\c{F}',
+    'G\u0327': '\\c{G}',
+    '\u0122': '\\c{G}',
+    'H\u0327': '\\c{H}',
+    '\u1e28': '\\c{H}',
+    'I\u0327': '\\c{I}',
+    'J\u0327': '\\c{J}',
+    'K\u0327': '\\c{K}',
+    '\u0136': '\\c{K}',
+    'L\u0327': '\\c{L}',
+    '\u013b': '\\c{L}',
+    'M\u0327': '\\c{M}',
+    'N\u0327': '\\c{N}',
+    '\u0145': '\\c{N}',
+    'O\u0327': '\\c{O}',
+    'P\u0327': '\\c{P}',
+    'Q\u0327': '\\c{Q}',
+    'R\u0327': '\\c{R}',
+    '\u0156': '\\c{R}',
+    'S\u0327': '\\c{S}',
+    '\u015e': '\\c{S}',
+    'T\u0327': '\\c{T}',
+    '\u0162': '\\c{T}',
+    'U\u0327': '\\c{U}',
+    'V\u0327': '\\c{V}',
+    'W\u0327': '\\c{W}',
+    'X\u0327': '\\c{X}',
+    'Y\u0327': '\\c{Y}',
+    'Z\u0327': '\\c{Z}',
+    'a\u0327': '\\c{a}',
+    'b\u0327': '\\c{b}',
+    'c\u0327': '\\c{c}',
+    '\xe7': '\\c{c}',
+    'd\u0327': '\\c{d}',
+    '\u1e11': '\\c{d}',
+    'e\u0327': '\\c{e}',
+    '\u0229': '\\c{e}',
+    'f\u0327': '\\c{f}',
+    'g\u0327': '\\c{g}',
+    '\u0123': '\\c{g}',
+    'h\u0327': '\\c{h}',
+    '\u1e29': '\\c{h}',
+    'i\u0327': '\\c{i}',
+    'j\u0327': '\\c{j}',
+    'k\u0327': '\\c{k}',
+    '\u0137': '\\c{k}',
+    'l\u0327': '\\c{l}',
+    '\u013c': '\\c{l}',
+    'm\u0327': '\\c{m}',
+    'n\u0327': '\\c{n}',
+    '\u0146': '\\c{n}',
+    'o\u0327': '\\c{o}',
+    'p\u0327': '\\c{p}',
+    'q\u0327': '\\c{q}',
+    'r\u0327': '\\c{r}',
+    '\u0157': '\\c{r}',
+    's\u0327': '\\c{s}',
+    '\u015f': '\\c{s}',
+    't\u0327': '\\c{t}',
+    '\u0163': '\\c{t}',
+    'u\u0327': '\\c{u}',
+    'v\u0327': '\\c{v}',
+    'w\u0327': '\\c{w}',
+    'x\u0327': '\\c{x}',
+    'y\u0327': '\\c{y}',
+    'z\u0327': '\\c{z}',
+    '\u0131\u0327': '\\c{\u0131}',
+    '\u0237\u0327': '\\c{\u0237}',
+    'A\u030f': '\\C{A}',
+    '\u0200': '\\C{A}',
+    'B\u030f': '\\C{B}',
+    'C\u030f': '\\C{C}',
+    'D\u030f': '\\C{D}',
+    'E\u030f': '\\C{E}',
+    '\u0204': '\\C{E}',
+    'F\u030f': '\\C{F}',
+    'G\u030f': '\\C{G}',
+    'H\u030f': '\\C{H}',
+    'I\u030f': '\\C{I}',
+    '\u0208': '\\C{I}',
+    'J\u030f': '\\C{J}',
+    'K\u030f': '\\C{K}',
+    'L\u030f': '\\C{L}',
+    'M\u030f': '\\C{M}',
+    'N\u030f': '\\C{N}',
+    'O\u030f': '\\C{O}',
+    '\u020c': '\\C{O}',
+    'P\u030f': '\\C{P}',
+    'Q\u030f': '\\C{Q}',
+    'R\u030f': '\\C{R}',
+    '\u0210': '\\C{R}',
+    'S\u030f': '\\C{S}',
+    'T\u030f': '\\C{T}',
+    'U\u030f': '\\C{U}',
+    '\u0214': '\\C{U}',
+    'V\u030f': '\\C{V}',
+    'W\u030f': '\\C{W}',
+    'X\u030f': '\\C{X}',
+    'Y\u030f': '\\C{Y}',
+    'Z\u030f': '\\C{Z}',
+    'a\u030f': '\\C{a}',
+    '\u0201': '\\C{a}',
+    'b\u030f': '\\C{b}',
+    'c\u030f': '\\C{c}',
+    'd\u030f': '\\C{d}',
+    'e\u030f': '\\C{e}',
+    '\u0205': '\\C{e}',
+    'f\u030f': '\\C{f}',
+    'g\u030f': '\\C{g}',
+    'h\u030f': '\\C{h}',
+    'i\u030f': '\\C{i}',
+    '\u0209': '\\C{i}',
+    'j\u030f': '\\C{j}',
+    'k\u030f': '\\C{k}',
+    'l\u030f': '\\C{l}',
+    'm\u030f': '\\C{m}',
+    'n\u030f': '\\C{n}',
+    'o\u030f': '\\C{o}',
+    '\u020d': '\\C{o}',
+    'p\u030f': '\\C{p}',
+    'q\u030f': '\\C{q}',
+    'r\u030f': '\\C{r}',
+    '\u0211': '\\C{r}',
+    's\u030f': '\\C{s}',
+    't\u030f': '\\C{t}',
+    'u\u030f': '\\C{u}',
+    '\u0215': '\\C{u}',
+    'v\u030f': '\\C{v}',
+    'w\u030f': '\\C{w}',
+    'x\u030f': '\\C{x}',
+    'y\u030f': '\\C{y}',
+    'z\u030f': '\\C{z}',
+    '\u0131\u030f': '\\C{\u0131}',
+    '\u0237\u030f': '\\C{\u0237}',
+    'A\u0323': '\\d{A}',
+    '\u1ea0': '\\d{A}',
+    'B\u0323': '\\d{B}',
+    '\u1e04': '\\d{B}',
+    'C\u0323': '\\d{C}',
+    'D\u0323': '\\d{D}',
+    '\u1e0c': '\\d{D}',
+    'E\u0323': '\\d{E}',
+    '\u1eb8': '\\d{E}',
+    'F\u0323': '\\d{F}',
+    'G\u0323': '\\d{G}',
+    'H\u0323': '\\d{H}',
+    '\u1e24': '\\d{H}',
+    'I\u0323': '\\d{I}',
+    '\u1eca': '\\d{I}',
+    'J\u0323': '\\d{J}',
+    'K\u0323': '\\d{K}',
+    '\u1e32': '\\d{K}',
+    'L\u0323': '\\d{L}',
+    '\u1e36': '\\d{L}',
+    'M\u0323': '\\d{M}',
+    '\u1e42': '\\d{M}',
+    'N\u0323': '\\d{N}',
+    '\u1e46': '\\d{N}',
+    'O\u0323': '\\d{O}',
+    '\u1ecc': '\\d{O}',
+    'P\u0323': '\\d{P}',
+    'Q\u0323': '\\d{Q}',
+    'R\u0323': '\\d{R}',
+    '\u1e5a': '\\d{R}',
+    'S\u0323': '\\d{S}',
+    '\u1e62': '\\d{S}',
+    'T\u0323': '\\d{T}',
+    '\u1e6c': '\\d{T}',
+    'U\u0323': '\\d{U}',
+    '\u1ee4': '\\d{U}',
+    'V\u0323': '\\d{V}',
+    '\u1e7e': '\\d{V}',
+    'W\u0323': '\\d{W}',
+    '\u1e88': '\\d{W}',
+    'X\u0323': '\\d{X}',
+    'Y\u0323': '\\d{Y}',
+    '\u1ef4': '\\d{Y}',
+    'Z\u0323': '\\d{Z}',
+    '\u1e92': '\\d{Z}',
+    'a\u0323': '\\d{a}',
+    '\u1ea1': '\\d{a}',
+    'b\u0323': '\\d{b}',
+    '\u1e05': '\\d{b}',
+    'c\u0323': '\\d{c}',
+    'd\u0323': '\\d{d}',
+    '\u1e0d': '\\d{d}',
+    'e\u0323': '\\d{e}',
+    '\u1eb9': '\\d{e}',
+    'f\u0323': '\\d{f}',
+    'g\u0323': '\\d{g}',
+    'h\u0323': '\\d{h}',
+    '\u1e25': '\\d{h}',
+    'i\u0323': '\\d{i}',
+    '\u1ecb': '\\d{i}',
+    'j\u0323': '\\d{j}',
+    'k\u0323': '\\d{k}',
+    '\u1e33': '\\d{k}',
+    'l\u0323': '\\d{l}',
+    '\u1e37': '\\d{l}',
+    'm\u0323': '\\d{m}',
+    '\u1e43': '\\d{m}',
+    'n\u0323': '\\d{n}',
+    '\u1e47': '\\d{n}',
+    'o\u0323': '\\d{o}',
+    '\u1ecd': '\\d{o}',
+    'p\u0323': '\\d{p}',
+    'q\u0323': '\\d{q}',
+    'r\u0323': '\\d{r}',
+    '\u1e5b': '\\d{r}',
+    's\u0323': '\\d{s}',
+    '\u1e63': '\\d{s}',
+    't\u0323': '\\d{t}',
+    '\u1e6d': '\\d{t}',
+    'u\u0323': '\\d{u}',
+    '\u1ee5': '\\d{u}',
+    'v\u0323': '\\d{v}',
+    '\u1e7f': '\\d{v}',
+    'w\u0323': '\\d{w}',
+    '\u1e89': '\\d{w}',
+    'x\u0323': '\\d{x}',
+    'y\u0323': '\\d{y}',
+    '\u1ef5': '\\d{y}',
+    'z\u0323': '\\d{z}',
+    '\u1e93': '\\d{z}',
+    '\u0131\u0323': '\\d{\u0131}',
+    '\u0237\u0323': '\\d{\u0237}',
+    'A\u0311': '\\f{A}',
+    '\u0202': '\\f{A}',
+    'B\u0311': '\\f{B}',
+    'C\u0311': '\\f{C}',
+    'D\u0311': '\\f{D}',
+    'E\u0311': '\\f{E}',
+    '\u0206': '\\f{E}',
+    'F\u0311': '\\f{F}',
+    'G\u0311': '\\f{G}',
+    'H\u0311': '\\f{H}',
+    'I\u0311': '\\f{I}',
+    '\u020a': '\\f{I}',
+    'J\u0311': '\\f{J}',
+    'K\u0311': '\\f{K}',
+    'L\u0311': '\\f{L}',
+    'M\u0311': '\\f{M}',
+    'N\u0311': '\\f{N}',
+    'O\u0311': '\\f{O}',
+    '\u020e': '\\f{O}',
+    'P\u0311': '\\f{P}',
+    'Q\u0311': '\\f{Q}',
+    'R\u0311': '\\f{R}',
+    '\u0212': '\\f{R}',
+    'S\u0311': '\\f{S}',
+    'T\u0311': '\\f{T}',
+    'U\u0311': '\\f{U}',
+    '\u0216': '\\f{U}',
+    'V\u0311': '\\f{V}',
+    'W\u0311': '\\f{W}',
+    'X\u0311': '\\f{X}',
+    'Y\u0311': '\\f{Y}',
+    'Z\u0311': '\\f{Z}',
+    'a\u0311': '\\f{a}',
+    '\u0203': '\\f{a}',
+    'b\u0311': '\\f{b}',
+    'c\u0311': '\\f{c}',
+    'd\u0311': '\\f{d}',
+    'e\u0311': '\\f{e}',
+    '\u0207': '\\f{e}',
+    'f\u0311': '\\f{f}',
+    'g\u0311': '\\f{g}',
+    'h\u0311': '\\f{h}',
+    'i\u0311': '\\f{i}',
+    '\u020b': '\\f{i}',
+    'j\u0311': '\\f{j}',
+    'k\u0311': '\\f{k}',
+    'l\u0311': '\\f{l}',
+    'm\u0311': '\\f{m}',
+    'n\u0311': '\\f{n}',
+    'o\u0311': '\\f{o}',
+    '\u020f': '\\f{o}',
+    'p\u0311': '\\f{p}',
+    'q\u0311': '\\f{q}',
+    'r\u0311': '\\f{r}',
+    '\u0213': '\\f{r}',
+    's\u0311': '\\f{s}',
+    't\u0311': '\\f{t}',
+    'u\u0311': '\\f{u}',
+    '\u0217': '\\f{u}',
+    'v\u0311': '\\f{v}',
+    'w\u0311': '\\f{w}',
+    'x\u0311': '\\f{x}',
+    'y\u0311': '\\f{y}',
+    'z\u0311': '\\f{z}',
+    '\u0131\u0311': '\\f{\u0131}',
+    '\u0237\u0311': '\\f{\u0237}',
+    'A\u0309': '\\h{A}',
+    '\u1ea2': '\\h{A}',
+    'B\u0309': '\\h{B}',
+    'C\u0309': '\\h{C}',
+    'D\u0309': '\\h{D}',
+    'E\u0309': '\\h{E}',
+    '\u1eba': '\\h{E}',
+    'F\u0309': '\\h{F}',
+    'G\u0309': '\\h{G}',
+    'H\u0309': '\\h{H}',
+    'I\u0309': '\\h{I}',
+    '\u1ec8': '\\h{I}',
+    'J\u0309': '\\h{J}',
+    'K\u0309': '\\h{K}',
+    'L\u0309': '\\h{L}',
+    'M\u0309': '\\h{M}',
+    'N\u0309': '\\h{N}',
+    'O\u0309': '\\h{O}',
+    '\u1ece': '\\h{O}',
+    'P\u0309': '\\h{P}',
+    'Q\u0309': '\\h{Q}',
+    'R\u0309': '\\h{R}',
+    'S\u0309': '\\h{S}',
+    'T\u0309': '\\h{T}',
+    'U\u0309': '\\h{U}',
+    '\u1ee6': '\\h{U}',
+    'V\u0309': '\\h{V}',
+    'W\u0309': '\\h{W}',
+    'X\u0309': '\\h{X}',
+    'Y\u0309': '\\h{Y}',
+    '\u1ef6': '\\h{Y}',
+    'Z\u0309': '\\h{Z}',
+    'a\u0309': '\\h{a}',
+    '\u1ea3': '\\h{a}',
+    'b\u0309': '\\h{b}',
+    'c\u0309': '\\h{c}',
+    'd\u0309': '\\h{d}',
+    'e\u0309': '\\h{e}',
+    '\u1ebb': '\\h{e}',
+    'f\u0309': '\\h{f}',
+    'g\u0309': '\\h{g}',
+    'h\u0309': '\\h{h}',
+    'i\u0309': '\\h{i}',
+    '\u1ec9': '\\h{i}',
+    'j\u0309': '\\h{j}',
+    'k\u0309': '\\h{k}',
+    'l\u0309': '\\h{l}',
+    'm\u0309': '\\h{m}',
+    'n\u0309': '\\h{n}',
+    'o\u0309': '\\h{o}',
+    '\u1ecf': '\\h{o}',
+    'p\u0309': '\\h{p}',
+    'q\u0309': '\\h{q}',
+    'r\u0309': '\\h{r}',
+    's\u0309': '\\h{s}',
+    't\u0309': '\\h{t}',
+    'u\u0309': '\\h{u}',
+    '\u1ee7': '\\h{u}',
+    'v\u0309': '\\h{v}',
+    'w\u0309': '\\h{w}',
+    'x\u0309': '\\h{x}',
+    'y\u0309': '\\h{y}',
+    '\u1ef7': '\\h{y}',
+    'z\u0309': '\\h{z}',
+    '\u0131\u0309': '\\h{\u0131}',
+    '\u0237\u0309': '\\h{\u0237}',
+    'A\u030b': '\\H{A}',
+    'B\u030b': '\\H{B}',
+    'C\u030b': '\\H{C}',
+    'D\u030b': '\\H{D}',
+    'E\u030b': '\\H{E}',
+    'F\u030b': '\\H{F}',
+    'G\u030b': '\\H{G}',
+    'H\u030b': '\\H{H}',
+    'I\u030b': '\\H{I}',
+    'J\u030b': '\\H{J}',
+    'K\u030b': '\\H{K}',
+    'L\u030b': '\\H{L}',
+    'M\u030b': '\\H{M}',
+    'N\u030b': '\\H{N}',
+    'O\u030b': '\\H{O}',
+    '\u0150': '\\H{O}',
+    'P\u030b': '\\H{P}',
+    'Q\u030b': '\\H{Q}',
+    'R\u030b': '\\H{R}',
+    'S\u030b': '\\H{S}',
+    'T\u030b': '\\H{T}',
+    'U\u030b': '\\H{U}',
+    '\u0170': '\\H{U}',
+    'V\u030b': '\\H{V}',
+    'W\u030b': '\\H{W}',
+    'X\u030b': '\\H{X}',
+    'Y\u030b': '\\H{Y}',
+    'Z\u030b': '\\H{Z}',
+    'a\u030b': '\\H{a}',
+    'b\u030b': '\\H{b}',
+    'c\u030b': '\\H{c}',
+    'd\u030b': '\\H{d}',
+    'e\u030b': '\\H{e}',
+    'f\u030b': '\\H{f}',
+    'g\u030b': '\\H{g}',
+    'h\u030b': '\\H{h}',
+    'i\u030b': '\\H{i}',
+    'j\u030b': '\\H{j}',
+    'k\u030b': '\\H{k}',
+    'l\u030b': '\\H{l}',
+    'm\u030b': '\\H{m}',
+    'n\u030b': '\\H{n}',
+    'o\u030b': '\\H{o}',
+    '\u0151': '\\H{o}',
+    'p\u030b': '\\H{p}',
+    'q\u030b': '\\H{q}',
+    'r\u030b': '\\H{r}',
+    's\u030b': '\\H{s}',
+    't\u030b': '\\H{t}',
+    'u\u030b': '\\H{u}',
+    '\u0171': '\\H{u}',
+    'v\u030b': '\\H{v}',
+    'w\u030b': '\\H{w}',
+    'x\u030b': '\\H{x}',
+    'y\u030b': '\\H{y}',
+    'z\u030b': '\\H{z}',
+    '\u0131\u030b': '\\H{\u0131}',
+    '\u0237\u030b': '\\H{\u0237}',
+    'A\u0328': '\\k{A}',
+    '\u0104': '\\k{A}',
+    'B\u0328': '\\k{B}',
+    'C\u0328': '\\k{C}',
+    'D\u0328': '\\k{D}',
+    'E\u0328': '\\k{E}',
+    '\u0118': '\\k{E}',
+    'F\u0328': '\\k{F}',
+    'G\u0328': '\\k{G}',
+    'H\u0328': '\\k{H}',
+    'I\u0328': '\\k{I}',
+    '\u012e': '\\k{I}',
+    'J\u0328': '\\k{J}',
+    'K\u0328': '\\k{K}',
+    'L\u0328': '\\k{L}',
+    'M\u0328': '\\k{M}',
+    'N\u0328': '\\k{N}',
+    'O\u0328': '\\k{O}',
+    '\u01ea': '\\k{O}',
+    'P\u0328': '\\k{P}',
+    'Q\u0328': '\\k{Q}',
+    'R\u0328': '\\k{R}',
+    'S\u0328': '\\k{S}',
+    'T\u0328': '\\k{T}',
+    'U\u0328': '\\k{U}',
+    '\u0172': '\\k{U}',
+    'V\u0328': '\\k{V}',
+    'W\u0328': '\\k{W}',
+    'X\u0328': '\\k{X}',
+    'Y\u0328': '\\k{Y}',
+    'Z\u0328': '\\k{Z}',
+    'a\u0328': '\\k{a}',
+    '\u0105': '\\k{a}',
+    'b\u0328': '\\k{b}',
+    'c\u0328': '\\k{c}',
+    'd\u0328': '\\k{d}',
+    'e\u0328': '\\k{e}',
+    '\u0119': '\\k{e}',
+    'f\u0328': '\\k{f}',
+    'g\u0328': '\\k{g}',
+    'h\u0328': '\\k{h}',
+    'i\u0328': '\\k{i}',
+    '\u012f': '\\k{i}',
+    'j\u0328': '\\k{j}',
+    'k\u0328': '\\k{k}',
+    'l\u0328': '\\k{l}',
+    'm\u0328': '\\k{m}',
+    'n\u0328': '\\k{n}',
+    'o\u0328': '\\k{o}',
+    '\u01eb': '\\k{o}',
+    'p\u0328': '\\k{p}',
+    'q\u0328': '\\k{q}',
+    'r\u0328': '\\k{r}',
+    's\u0328': '\\k{s}',
+    't\u0328': '\\k{t}',
+    'u\u0328': '\\k{u}',
+    '\u0173': '\\k{u}',
+    'v\u0328': '\\k{v}',
+    'w\u0328': '\\k{w}',
+    'x\u0328': '\\k{x}',
+    'y\u0328': '\\k{y}',
+    'z\u0328': '\\k{z}',
+    '\u0131\u0328': '\\k{\u0131}',
+    '\u0237\u0328': '\\k{\u0237}',
+    'A\u030a': '\\r{A}',
+    '\xc5': '\\r{A}',
+    'B\u030a': '\\r{B}',
+    'C\u030a': '\\r{C}',
+    'D\u030a': '\\r{D}',
+    'E\u030a': '\\r{E}',
+    'F\u030a': '\\r{F}',
+    'G\u030a': '\\r{G}',
+    'H\u030a': '\\r{H}',
+    'I\u030a': '\\r{I}',
+    'J\u030a': '\\r{J}',
+    'K\u030a': '\\r{K}',
+    'L\u030a': '\\r{L}',
+    'M\u030a': '\\r{M}',
+    'N\u030a': '\\r{N}',
+    'O\u030a': '\\r{O}',
+    'P\u030a': '\\r{P}',
+    'Q\u030a': '\\r{Q}',
+    'R\u030a': '\\r{R}',
+    'S\u030a': '\\r{S}',
+    'T\u030a': '\\r{T}',
+    'U\u030a': '\\r{U}',
+    '\u016e': '\\r{U}',
+    'V\u030a': '\\r{V}',
+    'W\u030a': '\\r{W}',
+    'X\u030a': '\\r{X}',
+    'Y\u030a': '\\r{Y}',
+    'Z\u030a': '\\r{Z}',
+    'a\u030a': '\\r{a}',
+    '\xe5': '\\r{a}',
+    'b\u030a': '\\r{b}',
+    'c\u030a': '\\r{c}',
+    'd\u030a': '\\r{d}',
+    'e\u030a': '\\r{e}',
+    'f\u030a': '\\r{f}',
+    'g\u030a': '\\r{g}',
+    'h\u030a': '\\r{h}',
+    'i\u030a': '\\r{i}',
+    'j\u030a': '\\r{j}',
+    'k\u030a': '\\r{k}',
+    'l\u030a': '\\r{l}',
+    'm\u030a': '\\r{m}',
+    'n\u030a': '\\r{n}',
+    'o\u030a': '\\r{o}',
+    'p\u030a': '\\r{p}',
+    'q\u030a': '\\r{q}',
+    'r\u030a': '\\r{r}',
+    's\u030a': '\\r{s}',
+    't\u030a': '\\r{t}',
+    'u\u030a': '\\r{u}',
+    '\u016f': '\\r{u}',
+    'v\u030a': '\\r{v}',
+    'w\u030a': '\\r{w}',
+    '\u1e98': '\\r{w}',
+    'x\u030a': '\\r{x}',
+    'y\u030a': '\\r{y}',
+    '\u1e99': '\\r{y}',
+    'z\u030a': '\\r{z}',
+    '\u0131\u030a': '\\r{\u0131}',
+    '\u0237\u030a': '\\r{\u0237}',
+    'A\u0361': '\\t{A}',
+    'B\u0361': '\\t{B}',
+    'C\u0361': '\\t{C}',
+    'D\u0361': '\\t{D}',
+    'E\u0361': '\\t{E}',
+    'F\u0361': '\\t{F}',
+    'G\u0361': '\\t{G}',
+    'H\u0361': '\\t{H}',
+    'I\u0361': '\\t{I}',
+    'J\u0361': '\\t{J}',
+    'K\u0361': '\\t{K}',
+    'L\u0361': '\\t{L}',
+    'M\u0361': '\\t{M}',
+    'N\u0361': '\\t{N}',
+    'O\u0361': '\\t{O}',
+    'P\u0361': '\\t{P}',
+    'Q\u0361': '\\t{Q}',
+    'R\u0361': '\\t{R}',
+    'S\u0361': '\\t{S}',
+    'T\u0361': '\\t{T}',
+    'U\u0361': '\\t{U}',
+    'V\u0361': '\\t{V}',
+    'W\u0361': '\\t{W}',
+    'X\u0361': '\\t{X}',
+    'Y\u0361': '\\t{Y}',
+    'Z\u0361': '\\t{Z}',
+    'a\u0361': '\\t{a}',
+    'b\u0361': '\\t{b}',
+    'c\u0361': '\\t{c}',
+    'd\u0361': '\\t{d}',
+    'e\u0361': '\\t{e}',
+    'f\u0361': '\\t{f}',
+    'g\u0361': '\\t{g}',
+    'h\u0361': '\\t{h}',
+    'i\u0361': '\\t{i}',
+    'j\u0361': '\\t{j}',
+    'k\u0361': '\\t{k}',
+    'l\u0361': '\\t{l}',
+    'm\u0361': '\\t{m}',
+    'n\u0361': '\\t{n}',
+    'o\u0361': '\\t{o}',
+    'p\u0361': '\\t{p}',
+    'q\u0361': '\\t{q}',
+    'r\u0361': '\\t{r}',
+    's\u0361': '\\t{s}',
+    't\u0361': '\\t{t}',
+    'u\u0361': '\\t{u}',
+    'v\u0361': '\\t{v}',
+    'w\u0361': '\\t{w}',
+    'x\u0361': '\\t{x}',
+    'y\u0361': '\\t{y}',
+    'z\u0361': '\\t{z}',
+    '\u0131\u0361': '\\t{\u0131}',
+    '\u0237\u0361': '\\t{\u0237}',
+    'A\u0306': '\\u{A}',
+    '\u0102': '\\u{A}',
+    'B\u0306': '\\u{B}',
+    'C\u0306': '\\u{C}',
+    'D\u0306': '\\u{D}',
+    'E\u0306': '\\u{E}',
+    '\u0114': '\\u{E}',
+    'F\u0306': '\\u{F}',
+    'G\u0306': '\\u{G}',
+    '\u011e': '\\u{G}',
+    'H\u0306': '\\u{H}',
+    'I\u0306': '\\u{I}',
+    '\u012c': '\\u{I}',
+    'J\u0306': '\\u{J}',
+    'K\u0306': '\\u{K}',
+    'L\u0306': '\\u{L}',
+    'M\u0306': '\\u{M}',
+    'N\u0306': '\\u{N}',
+    'O\u0306': '\\u{O}',
+    '\u014e': '\\u{O}',
+    'P\u0306': '\\u{P}',
+    'Q\u0306': '\\u{Q}',
+    'R\u0306': '\\u{R}',
+    'S\u0306': '\\u{S}',
+    'T\u0306': '\\u{T}',
+    'U\u0306': '\\u{U}',
+    '\u016c': '\\u{U}',
+    'V\u0306': '\\u{V}',
+    'W\u0306': '\\u{W}',
+    'X\u0306': '\\u{X}',
+    'Y\u0306': '\\u{Y}',
+    'Z\u0306': '\\u{Z}',
+    'a\u0306': '\\u{a}',
+    '\u0103': '\\u{a}',
+    'b\u0306': '\\u{b}',
+    'c\u0306': '\\u{c}',
+    'd\u0306': '\\u{d}',
+    'e\u0306': '\\u{e}',
+    '\u0115': '\\u{e}',
+    'f\u0306': '\\u{f}',
+    'g\u0306': '\\u{g}',
+    '\u011f': '\\u{g}',
+    'h\u0306': '\\u{h}',
+    'i\u0306': '\\u{i}',
+    '\u012d': '\\u{i}',
+    'j\u0306': '\\u{j}',
+    'k\u0306': '\\u{k}',
+    'l\u0306': '\\u{l}',
+    'm\u0306': '\\u{m}',
+    'n\u0306': '\\u{n}',
+    'o\u0306': '\\u{o}',
+    '\u014f': '\\u{o}',
+    'p\u0306': '\\u{p}',
+    'q\u0306': '\\u{q}',
+    'r\u0306': '\\u{r}',
+    's\u0306': '\\u{s}',
+    't\u0306': '\\u{t}',
+    'u\u0306': '\\u{u}',
+    '\u016d': '\\u{u}',
+    'v\u0306': '\\u{v}',
+    'w\u0306': '\\u{w}',
+    'x\u0306': '\\u{x}',
+    'y\u0306': '\\u{y}',
+    'z\u0306': '\\u{z}',
+    '\u0131\u0306': '\\u{\u0131}',
+    '\u0237\u0306': '\\u{\u0237}',
+    'A\u030e': '\\U{A}',
+    'B\u030e': '\\U{B}',
+    'C\u030e': '\\U{C}',
+    'D\u030e': '\\U{D}',
+    'E\u030e': '\\U{E}',
+    'F\u030e': '\\U{F}',
+    'G\u030e': '\\U{G}',
+    'H\u030e': '\\U{H}',
+    'I\u030e': '\\U{I}',
+    'J\u030e': '\\U{J}',
+    'K\u030e': '\\U{K}',
+    'L\u030e': '\\U{L}',
+    'M\u030e': '\\U{M}',
+    'N\u030e': '\\U{N}',
+    'O\u030e': '\\U{O}',
+    'P\u030e': '\\U{P}',
+    'Q\u030e': '\\U{Q}',
+    'R\u030e': '\\U{R}',
+    'S\u030e': '\\U{S}',
+    'T\u030e': '\\U{T}',
+    'U\u030e': '\\U{U}',
+    'V\u030e': '\\U{V}',
+    'W\u030e': '\\U{W}',
+    'X\u030e': '\\U{X}',
+    'Y\u030e': '\\U{Y}',
+    'Z\u030e': '\\U{Z}',
+    'a\u030e': '\\U{a}',
+    'b\u030e': '\\U{b}',
+    'c\u030e': '\\U{c}',
+    'd\u030e': '\\U{d}',
+    'e\u030e': '\\U{e}',
+    'f\u030e': '\\U{f}',
+    'g\u030e': '\\U{g}',
+    'h\u030e': '\\U{h}',
+    'i\u030e': '\\U{i}',
+    'j\u030e': '\\U{j}',
+    'k\u030e': '\\U{k}',
+    'l\u030e': '\\U{l}',
+    'm\u030e': '\\U{m}',
+    'n\u030e': '\\U{n}',
+    'o\u030e': '\\U{o}',
+    'p\u030e': '\\U{p}',
+    'q\u030e': '\\U{q}',
+    'r\u030e': '\\U{r}',
+    's\u030e': '\\U{s}',
+    't\u030e': '\\U{t}',
+    'u\u030e': '\\U{u}',
+    'v\u030e': '\\U{v}',
+    'w\u030e': '\\U{w}',
+    'x\u030e': '\\U{x}',
+    'y\u030e': '\\U{y}',
+    'z\u030e': '\\U{z}',
+    '\u0131\u030e': '\\U{\u0131}',
+    '\u0237\u030e': '\\U{\u0237}',
+    'A\u030c': '\\v{A}',
+    '\u01cd': '\\v{A}',
+    'B\u030c': '\\v{B}',
+    'C\u030c': '\\v{C}',
+    '\u010c': '\\v{C}',
+    'D\u030c': '\\v{D}',
+    '\u010e': '\\v{D}',
+    'E\u030c': '\\v{E}',
+    '\u011a': '\\v{E}',
+    'F\u030c': '\\v{F}',
+    'G\u030c': '\\v{G}',
+    '\u01e6': '\\v{G}',
+    'H\u030c': '\\v{H}',
+    '\u021e': '\\v{H}',
+    'I\u030c': '\\v{I}',
+    '\u01cf': '\\v{I}',
+    'J\u030c': '\\v{J}',
+    'K\u030c': '\\v{K}',
+    '\u01e8': '\\v{K}',
+    'L\u030c': '\\v{L}',
+    '\u013d': '\\v{L}',
+    'M\u030c': '\\v{M}',
+    'N\u030c': '\\v{N}',
+    '\u0147': '\\v{N}',
+    'O\u030c': '\\v{O}',
+    '\u01d1': '\\v{O}',
+    'P\u030c': '\\v{P}',
+    'Q\u030c': '\\v{Q}',
+    'R\u030c': '\\v{R}',
+    '\u0158': '\\v{R}',
+    'S\u030c': '\\v{S}',
+    '\u0160': '\\v{S}',
+    'T\u030c': '\\v{T}',
+    '\u0164': '\\v{T}',
+    'U\u030c': '\\v{U}',
+    '\u01d3': '\\v{U}',
+    'V\u030c': '\\v{V}',
+    'W\u030c': '\\v{W}',
+    'X\u030c': '\\v{X}',
+    'Y\u030c': '\\v{Y}',
+    'Z\u030c': '\\v{Z}',
+    '\u017d': '\\v{Z}',
+    'a\u030c': '\\v{a}',
+    '\u01ce': '\\v{a}',
+    'b\u030c': '\\v{b}',
+    'c\u030c': '\\v{c}',
+    '\u010d': '\\v{c}',
+    'd\u030c': '\\v{d}',
+    '\u010f': '\\v{d}',
+    'e\u030c': '\\v{e}',
+    '\u011b': '\\v{e}',
+    'f\u030c': '\\v{f}',
+    'g\u030c': '\\v{g}',
+    '\u01e7': '\\v{g}',
+    'h\u030c': '\\v{h}',
+    '\u021f': '\\v{h}',
+    'i\u030c': '\\v{i}',
+    '\u01d0': '\\v{i}',
+    'j\u030c': '\\v{j}',
+    '\u01f0': '\\v{j}',
+    'k\u030c': '\\v{k}',
+    '\u01e9': '\\v{k}',
+    'l\u030c': '\\v{l}',
+    '\u013e': '\\v{l}',
+    'm\u030c': '\\v{m}',
+    'n\u030c': '\\v{n}',
+    '\u0148': '\\v{n}',
+    'o\u030c': '\\v{o}',
+    '\u01d2': '\\v{o}',
+    'p\u030c': '\\v{p}',
+    'q\u030c': '\\v{q}',
+    'r\u030c': '\\v{r}',
+    '\u0159': '\\v{r}',
+    's\u030c': '\\v{s}',
+    '\u0161': '\\v{s}',
+    't\u030c': '\\v{t}',
+    '\u0165': '\\v{t}',
+    'u\u030c': '\\v{u}',
+    '\u01d4': '\\v{u}',
+    'v\u030c': '\\v{v}',
+    'w\u030c': '\\v{w}',
+    'x\u030c': '\\v{x}',
+    'y\u030c': '\\v{y}',
+    'z\u030c': '\\v{z}',
+    '\u017e': '\\v{z}',
+    '\u0131\u030c': '\\v{\u0131}',
+    '\u0237\u030c': '\\v{\u0237}',
+    '\u0131': '\\i',
+    '\u0237': '\\j',
+    '\u0142': '\\l',
+    '\u0141': '\\L',
+    '\xf8': '\\o',
+    '\xd8': '\\O',
+    '\u2013': '--',
+    '\u2014': '---',
+}
+
+# The patterns of the regexps, keyed by their names
+patterns = {
+    'accent_re':
+        '\\\\(["\'.=^`|~bcCdfhHkrtuUv]){([a-zA-Z\\u0131\\u0237])}',
+    'symbol_re':
+        '\\\\([ijlLoO])',
+    'dash_re':
+        '([^-]?)(-{2,3})([^-]?)',
+    'brace_re':
+        '{([^}]*)}',
+    'decode_re':
+        (
+            '-{2,}|\\\\["\'.=^`|~bcCdfhHkrtuUv]{(?:[a-zA-Z\\u0131\\u0237]|\\\\'
+            '[ij])}|\\\\[ijlLoO]'
+        ),
+    'subscript_re':
+        '\\$_([-0123456789+=()aeoxhklmnpstiruv.]+)\\$',
+    'superscript_re':
+        '\\$\\^([-0123456789+=()abcdefghijklmnoprstuvwxyz]+)\\$',
+    'greek_symbol_re':
+        (
+            '\\$\\\\(alpha|beta|gamma|delta|epsilon|zeta|eta|theta|iota|kappa|'
+            'lamda|lambda|mu|nu|xi|omicron|pi|rho|sigma|tau|upsilon|phi|chi|ps'
+            'i|omega|Alpha|Beta|Gamma|Delta|Epsilon|Zeta|Eta|Theta|Iota|Kappa|'
+            'Lamda|Lambda|Mu|Nu|Xi|Omicron|Pi|Rho|Sigma|Tau|Upsilon|Phi|Chi|Ps'
+            'i|Omega)\\$'
+        ),
+}
@@ -0,0 +1,1809 @@
+"""
+Storage backends of Reference_Handler.
+
+A backend stores the citations and their contexts. Reference_Handler does the
+parsing, caching, buffering and threading, and reads and writes the data only
+through the methods of Backend, so the SQLite database can be replaced by a
+store better suited to the application.
+"""
+
+import abc
+import functools
+import glob
+import os
+import struct
+import zlib
+
+from .utils import raw_digest
+
+# The number of parameters bound in each "IN (...)" query, below the
+# SQLITE_MAX_VARIABLE_NUMBER of older SQLite versions.
+_chunk_size = 500
+
+# Adds to the count of a context, creating it if needed.
+_upsert_context_sql = (
+    "INSERT INTO context (reference_id, module, note, level, count) "
+    "VALUES (?, ?, ?, ?, ?) "
+    "ON CONFLICT (reference_id, module, note, level) "
+    "DO UPDATE SET count = count + excluded.count;"
+)
+
+# Adds to the count of a context known by its id, provided the row still
+# holds the same context and its citation still has the same raw text.
+_increment_context_sql = (
+    "UPDATE context SET count = count + ? "
+    "WHERE id = ? AND reference_id = ? AND module = ? AND note = ? "
+    "AND level = ? AND EXISTS "
+    "(SELECT 1 FROM citation WHERE id = ? AND raw_hash = ?);"
+)
+
+# The columns by which citations can be looked up
+_key_columns = ('raw_hash', 'alias', 'doi')
+
+# The levels with a column in citation_totals, which holds the sum of the
+# counts of the contexts up to that level.
+_total_levels = (1, 2, 3)
+
+# The most important level, up to the one asked for, with counted mentions,
+# from the columns of citation_totals.
+_total_level_sql = (
+    "MIN(?, CASE WHEN level1 > 0 THEN 1 WHEN level2 > 0 THEN 2 ELSE 3 END)"
+)
+
+# The records of the log of LogBackend: a header of the record type, the
+# length of the payload and its CRC-32, followed by the payload.
+_record_header = struct.Struct('<BII')
+_citation_record = 1
+_count_record = 2
+_identity_record = 3
+_citation_fields = struct.Struct('<I')
+_count_fields = struct.Struct('<Iiq')
+_string_length = struct.Struct('<i')
+
+# Named sets of PRAGMAs applied to the database connection. 'durable' is
+# SQLite's own default behavior, 'balanced' keeps the database safe from
+# application crashes but may lose the last transactions on a power failure,
+# and 'ephemeral' trades all durability for speed.
+sqlite_profiles = {
+    'durable':
+        {
+            'journal_mode': 'DELETE',
+            'synchronous': 'FULL',
+            'mmap_size': 0,
+            'cache_size': -2000,
+            'temp_store': 'DEFAULT',
+            'busy_timeout': 5000
+        },
+    'balanced':
+        {
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'mmap_size': 256 * 1024 * 1024,
+            'cache_size': -64 * 1024,
+            'temp_store': 'MEMORY',
+            'busy_timeout': 5000
+        },
+    'ephemeral':
+        {
+            'journal_mode': 'MEMORY',
+            'synchronous': 'OFF',
+            'mmap_size': 256 * 1024 * 1024,
+            'cache_size': -64 * 1024,
+            'temp_store': 'MEMORY',
+            'busy_timeout': 5000
+        }
+}
+
+# The environment variable selecting the profile when none is given
+profile_variable = 'REFERENCE_HANDLER_PROFILE'
+
+
+class Backend(abc.ABC):
+    """
+    The interface of the storage of Reference_Handler.
+
+    Citations are rows (raw, raw_hash, alias, doi) with an integer ID, where
+    raw_hash, alias and doi are unique and doi may be None. Contexts are rows
+    (reference_id, module, note, level, count) with an integer ID, unique by
+    all their columns but the count. IDs start at 1 and are never reused.
+
+    Writes belong to a transaction ended by commit or rollback. Backends are
+    not thread-safe: Reference_Handler serializes the calls with its lock.
+    """
+
+    @abc.abstractmethod
+    def get_reference_ids(self, keys, column='raw_hash'):
+        """
+        Returns a dictionary of the IDs of the citations whose column,
+        'raw_hash', 'alias' or 'doi', has one of the given values, for those
+        that exist.
+        """
+
+    @abc.abstractmethod
+    def add_citations(self, citations):
+        """
+        Adds citations given as tuples (raw, raw_hash, alias, doi). Raises
+        sqlite3.IntegrityError if one of them is already present.
+        """
+
+    @abc.abstractmethod
+    def get_context_id(self, reference_id, module, note, level):
+        """
+        Returns the ID of the given context, or None if it does not exist.
+        """
+
+    @abc.abstractmethod
+    def add_context(self, reference_id, module, note, level, count=0):
+        """
+        Adds a context and returns its ID. Raises sqlite3.IntegrityError if
+        it is already present.
+        """
+
+    @abc.abstractmethod
+    def add_counts(self, contexts):
+        """
+        Adds to the counts of contexts given as tuples (reference_id, module,
+        note, level, count), creating the missing ones.
+        """
+
+    @abc.abstractmethod
+    def increment_contexts(self, rows):
+        """
+        Adds to the counts of contexts known by their ID, given as tuples
+        (count, context_id, reference_id, module, note, level, raw_hash). A
+        row is only applied if the context still has those values and its
+        citation still has that digest of the raw text, which is not the case
+        if it has been deleted or the database has been replaced.
+
+        Returns
+        -------
+        ret: list
+            The rows that were not applied.
+        """
+
+    @abc.abstractmethod
+    def mentions(self, level, minimum=1):
+        """
+        Returns tuples (reference_id, raw, count, level) of the citations
+        whose contexts up to the given level add up to at least minimum,
+        from the most to the least mentioned. The level returned is the
+        lowest level, but at least 1, of the contexts with a count, or the
+        given level if none has.
+        """
+
+    def iter_mentions(self, level, minimum=1, chunk_size=1000, version=None):
+        """
+        Yields the same tuples as mentions, reading them from the storage
+        chunk_size at a time where the backend supports it. If a version is
+        given, each tuple has a fifth element with the text rendered with
+        that version of the formatting, or None if there is none, and a
+        sixth element with the parsed fields of the citations without text,
+        or None if they are not stored.
+        """
+
+        rows = self.mentions(level, minimum)
+        for i in range(0, len(rows), chunk_size):
+            chunk = rows[i:i + chunk_size]
+            if version is not None:
+                texts = self.get_renderings([row[0] for row in chunk], version)
+                fields = self.get_fields(
+                    [row[0] for row in chunk if row[0] not in texts]
+                )
+                chunk = [
+                    row + (texts.get(row[0]), fields.get(row[0]))
+                    for row in chunk
+                ]
+            yield from chunk
+
+    def get_renderings(self, reference_ids, version):
+        """
+        Returns a dictionary of the rendered text of the given citations,
+        for those rendered with the given version of the formatting since
+        their raw text last changed. Backends without a render cache have
+        none.
+        """
+
+        return {}
+
+    def add_renderings(self, renderings):
+        """
+        Stores the rendered text of citations, as tuples (reference_id,
+        version, text), for their current raw text. Backends without a
+        render cache ignore them. The cache may be written outside of the
+        transactions of the other methods.
+        """
+
+    def get_fields(self, reference_ids):
+        """
+        Returns a dictionary of the fields parsed from the raw text of the
+        given citations, as dictionaries, for those whose fields are stored
+        for their current raw text. Backends that do not store the fields
+        have none.
+        """
+
+        return {}
+
+    def add_fields(self, fields):
+        """
+        Stores the fields parsed from the raw text of citations, as tuples
+        (reference_id, fields) where fields is a dictionary of strings.
+        Backends that do not store the fields ignore them.
+        """
+
+    def cache_renderings(self, renderings, fields):
+        """
+        Stores and commits the rendered text and the parsed fields of
+        citations, as add_renderings and add_fields, if the storage can be
+        written. Returns whether they were stored.
+        """
+
+        self.add_renderings(renderings)
+        self.add_fields(fields)
+        self.commit()
+
+        return True
+
+    @abc.abstractmethod
+    def total_mentions(self, reference_id=None, alias=None):
+        """
+        Returns a tuple (reference_id, count) with the sum of the counts of
+        the contexts of the given citation, or None if it has no contexts.
+        """
+
+    @abc.abstractmethod
+    def total_citations(self, reference_id=None, alias=None):
+        """
+        Returns the number of citations, or 1 if the given citation exists
+        and 0 otherwise.
+        """
+
+    @abc.abstractmethod
+    def total_contexts(self, reference_id=None, alias=None):
+        """
+        Returns the number of contexts of the given citation.
+        """
+
+    @abc.abstractmethod
+    def commit(self):
+        """Makes the writes since the last commit permanent."""
+
+    @abc.abstractmethod
+    def rollback(self):
+        """Discards the writes since the last commit."""
+
+    def save(self):
+        """
+        Writes data held in memory to permanent storage, for backends that
+        keep a copy in memory. Does nothing by default.
+        """
+
+    @abc.abstractmethod
+    def close(self):
+        """Commits and releases the storage."""
+
+
+class SQLiteBackend(Backend):
+    """
+    Stores the citations and contexts in the tables of a SQLite database.
+
+    Parameters
+    ----------
+    database: str
+        The file name of the SQLite database.
+
+    profile: str or dict, Optional, default: None
+        The name of one of the sqlite_profiles, or a dictionary of PRAGMAs
+        to apply to the connection. If None, the profile named by the
+        environment variable REFERENCE_HANDLER_PROFILE is used, if set.
+
+    in_memory: bool, Optional, default: False
+        If True, work on a copy of the database held in memory, loaded from
+        the file if it exists and written back to it by save.
+    """
+
+    # The migrations of the schema, in order, as the version each one brings
+    # the database to and the name of the method doing it. Migrations must
+    # not commit, and must cope with databases created before the version
+    # was recorded, when all of them are run.
+    migrations = [
+        (1, '_create_tables'),
+        (2, '_migrate_citation_hash'),
+        (3, '_create_context_key'),
+        (4, '_create_log_tables'),
+        (5, '_create_citation_totals'),
+        (6, '_create_render_cache'),
+        (7, '_create_citation_fields'),
+        (8, '_add_log_identity'),
+    ]
+
+    # The current version of the schema, kept in PRAGMA user_version
+    schema_version = migrations[-1][0]
+
+    def __init__(self, database, profile=None, in_memory=False):
+        if profile is None:
+            profile = os.environ.get(profile_variable)
+        if isinstance(profile, str):
+            if profile not in sqlite_profiles:
+                raise ValueError(
+                    'Invalid profile %s. Please use one of %s' %
+                    (profile, ', '.join(sqlite_profiles))
+                )
+            profile = sqlite_profiles[profile]
+
+        import sqlite3
+
+        self.database = database
+        self.in_memory = in_memory
+
+        # The connection is shared by all the threads of the handler, which
+        # take turns through its lock.
+        if in_memory:
+            self.conn = sqlite3.connect(':memory:', check_same_thread=False)
+            if os.path.exists(database):
+                source = sqlite3.connect(database)
+                try:
+                    source.backup(self.conn)
+                finally:
+                    source.close()
+        else:
+            self.conn = sqlite3.connect(database, check_same_thread=False)
+        self.cur = self.conn.cursor()
+        if profile is not None:
+            self._apply_profile(profile)
+        self._initialize_tables()
+
+    def get_reference_ids(self, keys, column='raw_hash'):
+        if column not in _key_columns:
+            raise NameError('Cannot look up citations by %s' % column)
+
+        keys = list(keys)
+        ret = {}
+
+        for i in range(0, len(keys), _chunk_size):
+            chunk = keys[i:i + _chunk_size]
+            self.cur.execute(
+                "SELECT %s, id FROM citation WHERE %s IN (%s);" %
+                (column, column, ', '.join('?' * len(chunk))), chunk
+            )
+            ret.update(self.cur.fetchall())
+
+        return ret
+
+    def add_citations(self, citations):
+        self.cur.executemany(
+            "INSERT INTO citation (raw, raw_hash, alias, doi) "
+            "VALUES (?, ?, ?, ?);", citations
+        )
+
+    def get_context_id(self, reference_id, module, note, level):
+        self.cur.execute(
+            "SELECT id FROM context WHERE reference_id=? AND module=? AND "
+            "note=? AND level=?;", (reference_id, module, note, level)
+        )
+
+        ret = self.cur.fetchall()
+
+        if len(ret) == 0:
+            return None
+
+        return ret[0][0]
+
+    def add_context(self, reference_id, module, note, level, count=0):
+        self.cur.execute(
+            "INSERT INTO context (reference_id, module, note, count, level) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (reference_id, module, note, count, level)
+        )
+
+        return self.cur.lastrowid
+
+    def add_counts(self, contexts):
+        self.cur.executemany(_upsert_context_sql, contexts)
+
+    def increment_contexts(self, rows):
+        rows = [tuple(row) for row in rows]
+        parameters = [row[:6] + (row[2], row[6]) for row in rows]
+
+        # Keep the earlier writes of the transaction if some rows fail
+        if not self.conn.in_transaction:
+            self.cur.execute("BEGIN;")
+        self.cur.execute("SAVEPOINT increment_contexts;")
+        self.cur.executemany(_increment_context_sql, parameters)
+
+        ret = []
+        if self.cur.rowcount != len(rows):
+            # Find the rows that failed, one at a time
+            self.cur.execute("ROLLBACK TO increment_contexts;")
+            for row, values in zip(rows, parameters):
+                self.cur.execute(_increment_context_sql, values)
+                if self.cur.rowcount == 0:
+                    ret.append(row)
+        self.cur.execute("RELEASE increment_contexts;")
+
+        return ret
+
+    def mentions(self, level, minimum=1):
+        self.cur.execute(*self._mentions_query(level, minimum))
+
+        return self.cur.fetchall()
+
+    def iter_mentions(self, level, minimum=1, chunk_size=1000, version=None):
+        import json
+
+        # A cursor of its own, so the other methods can be used meanwhile
+        cur = self.conn.cursor()
+        cur.execute(*self._mentions_query(level, minimum, version))
+        while True:
+            rows = cur.fetchmany(chunk_size)
+            if len(rows) == 0:
+                break
+            if version is not None:
+                rows = [
+                    row if row[5] is None else row[:5] + (json.loads(row[5]),)
+                    for row in rows
+                ]
+            yield from rows
+
+    def total_mentions(self, reference_id=None, alias=None):
+        if reference_id is None:
+            self.cur.execute(
+                """
+                SELECT t1.id, t2.total
+                FROM citation t1
+                INNER JOIN citation_totals t2
+                ON t1.id = t2.reference_id
+                WHERE alias = ? AND t2.n_contexts > 0
+            """, (alias,)
+            )
+        else:
+            self.cur.execute(
+                """
+                SELECT t1.id, t2.total
+                FROM citation t1
+                INNER JOIN citation_totals t2
+                ON t1.id = t2.reference_id
+                WHERE id = ? AND t2.n_contexts > 0
+            """, (reference_id,)
+            )
+
+        ret = self.cur.fetchall()
+
+        if len(ret) == 0:
+            return None
+
+        return ret[0]
+
+    def get_renderings(self, reference_ids, version):
+        ret = {}
+
+        for i in range(0, len(reference_ids), _chunk_size):
+            chunk = reference_ids[i:i + _chunk_size]
+            self.cur.execute(
+                "SELECT t1.id, t2.text FROM citation t1 "
+                "INNER JOIN render_cache t2 ON t2.reference_id = t1.id "
+                "AND t2.raw_hash = t1.raw_hash AND t2.version = ? "
+                "WHERE t1.id IN (%s);" % ', '.join('?' * len(chunk)),
+                [version] + list(chunk)
+            )
+            ret.update(self.cur.fetchall())
+
+        return ret
+
+    def add_renderings(self, renderings):
+        self.cur.executemany(
+            "INSERT OR REPLACE INTO render_cache "
+            "SELECT id, raw_hash, ?, ? FROM citation WHERE id = ?;", [
+                (version, text, reference_id)
+                for reference_id, version, text in renderings
+            ]
+        )
+
+    def cache_renderings(self, renderings, fields):
+        """
+        Stores the rendered text and the parsed fields in a savepoint, which
+        is rolled back if the database is locked or read-only, without
+        resetting the cursor of the dump reading the citations.
+        """
+
+        import sqlite3
+
+        # Outside of a transaction, the release is the commit, which fails
+        # while another connection reads
+        nested = self.conn.in_transaction
+        self.cur.execute("SAVEPOINT cache_renderings;")
+        try:
+            self.add_renderings(renderings)
+            self.add_fields(fields)
+            self.cur.execute("RELEASE cache_renderings;")
+        except sqlite3.OperationalError:
+            if nested:
+                self.cur.execute("ROLLBACK TO cache_renderings;")
+                self.cur.execute("RELEASE cache_renderings;")
+            else:
+                self.cur.execute("ROLLBACK;")
+            return False
+
+        self.commit()
+
+        return True
+
+    def get_fields(self, reference_ids):
+        import json
+
+        ret = {}
+
+        for i in range(0, len(reference_ids), _chunk_size):
+            chunk = reference_ids[i:i + _chunk_size]
+            self.cur.execute(
+                "SELECT t1.id, t2.fields FROM citation t1 "
+                "INNER JOIN citation_fields t2 ON t2.reference_id = t1.id "
+                "AND t2.raw_hash = t1.raw_hash "
+                "WHERE t1.id IN (%s);" % ', '.join('?' * len(chunk)), chunk
+            )
+            for reference_id, fields in self.cur.fetchall():
+                ret[reference_id] = json.loads(fields)
+
+        return ret
+
+    def add_fields(self, fields):
+        import json
+
+        self.cur.executemany(
+            "INSERT OR REPLACE INTO citation_fields "
+            "SELECT id, raw_hash, ? FROM citation WHERE id = ?;", [
+                (json.dumps(values), reference_id)
+                for reference_id, values in fields
+            ]
+        )
+
+    def total_citations(self, reference_id=None, alias=None):
+        if reference_id is not None:
+            self.cur.execute(
+                "SELECT COUNT(*) FROM citation WHERE id=?;", (reference_id,)
+            )
+        elif alias is not None:
+            self.cur.execute(
+                "SELECT COUNT(*) FROM citation WHERE alias = ?", (alias,)
+            )
+        else:
+            self.cur.execute("SELECT COUNT(*) FROM citation")
+
+        return self.cur.fetchall()[0][0]
+
+    def total_contexts(self, reference_id=None, alias=None):
+        if reference_id is None:
+            self.cur.execute(
+                """
+                SELECT COUNT(*)
+                FROM citation
+                INNER JOIN (
+                    SELECT id, reference_id FROM context
+                ) t2
+                ON citation.id = t2.reference_id WHERE alias=?
+            """, (alias,)
+            )
+        else:
+            self.cur.execute(
+                "SELECT COUNT(*) FROM context WHERE reference_id = ?;",
+                (reference_id,)
+            )
+
+        return self.cur.fetchall()[0][0]
+
+    def commit(self):
+        self.conn.commit()
+
+    def rollback(self):
+        # Unlike Connection.rollback before Python 3.11, the statement leaves
+        # the other cursors alone, so a dump being read goes on.
+        if self.conn.in_transaction:
+            self.cur.execute("ROLLBACK;")
+
+    def save(self):
+        """
+        Writes the in-memory database to its file, using the SQLite backup
+        API. The copy is made in a temporary file next to the database and
+        renamed over it, so the file is always either the old or the new
+        version. The file keeps its permissions, or gets those of new files,
+        and the rename is synced to disk where the directory can be. Does
+        nothing if the database is not held in memory.
+        """
+
+        if not self.in_memory:
+            return
+
+        import sqlite3
+        import stat
+        import tempfile
+
+        self.conn.commit()
+
+        path = os.path.abspath(self.database)
+        fd, tmp = tempfile.mkstemp(
+            prefix=os.path.basename(path) + '.',
+            suffix='.tmp',
+            dir=os.path.dirname(path)
+        )
+        os.close(fd)
+
+        try:
+            # mkstemp creates the file readable by its owner only
+            if os.path.exists(path):
+                os.chmod(tmp, stat.S_IMODE(os.stat(path).st_mode))
+            else:
+                os.chmod(tmp, _new_file_mode())
+            target = sqlite3.connect(tmp)
+            try:
+                self.conn.backup(target)
+            finally:
+                target.close()
+            os.replace(tmp, path)
+        except Exception:
+            os.remove(tmp)
+            raise
+
+        # Directories cannot be opened on Windows
+        if os.name == 'posix':
+            fd = os.open(os.path.dirname(path), os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def close(self):
+        self.conn.commit()
+        self.save()
+        self.conn.close()
+
+    def compact_logs(self, paths, retire=False):
+        """
+        Folds the segments of the logs written by LogBackend into the
+        database, each in one transaction.
+
+        How far each segment has been read is kept in the log_segment table,
+        along with the identity of the log written in the segment, so only
+        the records appended since the last compaction are read. A segment
+        whose name is reused by a new log is read from its start. Segments
+        that have not grown are skipped after reading their identity. The
+        offset is read again once the write lock is held, so that concurrent
+        compactions never fold the same records twice.
+        Records left incomplete by a crash, or still being written, are left
+        for a later compaction. The IDs of the citations of each log are
+        mapped to those of the database in the log_reference table.
+        Citations are deduplicated by their raw text, then by DOI, then by
+        alias, like Reference_Handler.merge.
+
+        Parameters
+        ----------
+        paths: iterable
+            The file names of the segments, e.g. from LogBackend.find_logs,
+            in the order they were written.
+
+        retire: bool, Optional, default: False
+            If True, paths are all the segments of the database, and the
+            rows of the segments that no longer exist are dropped, with the
+            mappings of the logs left without any segment.
+
+        Returns
+        -------
+        ret: int
+            The number of records folded into the database.
+        """
+
+        self.conn.commit()
+
+        paths = list(paths)
+        ret = 0
+        for path in paths:
+            # Segments are known by their name, so that the logs can be
+            # moved along with the database. The logs written before they
+            # had an identity are known by the name without the segment
+            # number.
+            name = os.path.basename(path)
+            identity = read_log_identity(path)
+            log = name.rsplit('.', 2)[0] if identity is None else identity
+
+            if os.path.getsize(path) <= self._log_offset(name, log):
+                continue
+
+            # Take the write lock before reading the offset again, in case
+            # another process is compacting the same segment.
+            self.cur.execute("BEGIN IMMEDIATE;")
+            try:
+                records, end = read_log(path, self._log_offset(name, log))
+                records = [record for record in records if record[0] != 'i']
+
+                self.cur.execute(
+                    "SELECT local_id, reference_id FROM log_reference "
+                    "WHERE log = ?;", (log,)
+                )
+                ids = dict(self.cur.fetchall())
+
+                citations = [
+                    record[1:] for record in records if record[0] == 'c'
+                ]
+                if len(citations) > 0:
+                    ids.update(self._fold_citations(log, citations))
+
+                counts = {}
+                for record in records:
+                    if record[0] == 'x':
+                        context = (ids[record[1]],) + record[2:5]
+                        counts[context] = counts.get(context, 0) + record[5]
+                self.add_counts(
+                    [context + (count,) for context, count in counts.items()]
+                )
+
+                self.cur.execute(
+                    "INSERT OR REPLACE INTO log_segment (name, offset, log) "
+                    "VALUES (?, ?, ?);", (name, end, log)
+                )
+                self._drop_orphan_logs()
+            except Exception:
+                self.conn.rollback()
+                raise
+
+            self.conn.commit()
+            ret += len(records)
+
+        if retire:
+            names = [os.path.basename(path) for path in paths]
+            self.cur.execute("BEGIN IMMEDIATE;")
+            try:
+                self.cur.execute(
+                    "DELETE FROM log_segment WHERE name NOT IN (%s);" %
+                    ', '.join('?' * len(names)), names
+                )
+                self._drop_orphan_logs()
+            except Exception:
+                self.conn.rollback()
+                raise
+            self.conn.commit()
+
+        return ret
+
+    def _log_offset(self, name, log):
+        """
+        Returns how far the segment of the given name has been read, if it
+        belongs to the given log, or 0 if it is new.
+        """
+
+        self.cur.execute(
+            "SELECT offset, log FROM log_segment WHERE name = ?;", (name,)
+        )
+        row = self.cur.fetchone()
+
+        return 0 if row is None or row[1] != log else row[0]
+
+    def _drop_orphan_logs(self):
+        """
+        Removes the mappings of the citation IDs of the logs that have no
+        segment left in the log_segment table.
+        """
+
+        self.cur.execute(
+            "DELETE FROM log_reference WHERE log NOT IN ("
+            "SELECT log FROM log_segment);"
+        )
+
+    def _fold_citations(self, log, citations):
+        """
+        Matches the citations (local_id, raw, raw_hash, alias, doi) of a log
+        to those of the database, adding the missing ones, and records the
+        mapping of their IDs. Returns the mapping.
+        """
+
+        ret = {}
+        for column, index in (('raw_hash', 2), ('doi', 4), ('alias', 3)):
+            values = {
+                citation[index]: citation[0]
+                for citation in citations
+                if citation[0] not in ret and citation[index] is not None
+            }
+            found = self.get_reference_ids(values, column=column)
+            for value, reference_id in found.items():
+                ret[values[value]] = reference_id
+
+        new = [citation for citation in citations if citation[0] not in ret]
+        self.add_citations([citation[1:] for citation in new])
+        found = self.get_reference_ids([citation[2] for citation in new])
+        for citation in new:
+            ret[citation[0]] = found[citation[2]]
+
+        self.cur.executemany(
+            "INSERT OR REPLACE INTO log_reference "
+            "(log, local_id, reference_id) VALUES (?, ?, ?);",
+            [(log,) + item for item in ret.items()]
+        )
+
+        return ret
+
+    def _mentions_query(self, level, minimum, version=None):
+        """
+        Returns the query and parameters of mentions. The levels with a
+        column in citation_totals read it, and the others sum the contexts.
+        With a version, the text rendered with it is joined from the
+        render_cache table, and the fields of the citations without text
+        from the citation_fields table.
+        """
+
+        if level in _total_levels:
+            columns = "t2.level%d, %s" % (level, _total_level_sql)
+            totals = "citation_totals"
+            where = "t2.level%d >= ? AND t2.n_contexts%d > 0" % (level, level)
+            order = "t2.level%d" % level
+            parameters = [level]
+        else:
+            columns = "t2.counts, MIN(?, t2.level)"
+            totals = """(
+                SELECT reference_id, SUM(count) AS counts,
+                COALESCE(MIN(CASE WHEN count > 0 THEN MAX(level, 1) END), ?)
+                AS level
+                FROM context WHERE level <= ?
+                GROUP BY reference_id
+            )"""
+            where = "counts >= ?"
+            order = "counts"
+            parameters = [level, level, level]
+
+        render = ""
+        if version is not None:
+            # The fields are only needed to format the text that is missing
+            columns += ", t3.text, CASE WHEN t3.text IS NULL THEN t4.fields "
+            columns += "END"
+            render = (
+                "LEFT JOIN render_cache t3 ON t3.reference_id = t1.id "
+                "AND t3.raw_hash = t1.raw_hash AND t3.version = ?\n"
+                "LEFT JOIN citation_fields t4 ON t4.reference_id = t1.id "
+                "AND t4.raw_hash = t1.raw_hash"
+            )
+            parameters.append(version)
+        parameters.append(minimum)
+
+        return (
+            """
+            SELECT t1.id, t1.raw, %s
+            FROM citation t1
+            INNER JOIN %s t2
+            ON t1.id = t2.reference_id
+            %s
+            WHERE %s
+            ORDER BY %s DESC
+        """ % (columns, totals, render, where, order), parameters
+        )
+
+    def _apply_profile(self, profile):
+        """
+        Sets the PRAGMAs in the given dictionary on the connection.
+        """
+
+        for pragma, value in profile.items():
+            if not pragma.isidentifier():
+                raise ValueError('Invalid PRAGMA %s' % pragma)
+            if isinstance(value, str) and not value.isidentifier():
+                raise ValueError(
+                    'Invalid value %s for PRAGMA %s' % (value, pragma)
+                )
+            self.cur.execute("PRAGMA %s = %s;" % (pragma, value))
+            self.cur.fetchall()
+
+    def _initialize_tables(self):
+        """
+        Brings the schema of the database up to date. A database already at
+        the schema_version is recognized by a single PRAGMA, without running
+        any DDL. Otherwise the pending migrations run in one transaction,
+        which sets the new version.
+        """
+
+        version = self._user_version()
+        if version == self.schema_version:
+            return
+
+        if version > self.schema_version:
+            raise ValueError(
+                'The schema version %d of %s is newer than the version %d '
+                'supported' % (version, self.database, self.schema_version)
+            )
+
+        # Take the write lock before checking again, in case another
+        # process is upgrading the same database.
+        self.cur.execute("BEGIN IMMEDIATE;")
+        try:
+            version = self._user_version()
+            for target, migration in self.migrations:
+                if target > version:
+                    getattr(self, migration)()
+            self.cur.execute("PRAGMA user_version = %d;" % self.schema_version)
+        except Exception:
+            self.conn.rollback()
+            raise
+
+        self.conn.commit()
+
+    def _user_version(self):
+        """Returns the schema version recorded in the database."""
+
+        self.cur.execute("PRAGMA user_version;")
+
+        return self.cur.fetchone()[0]
+
+    def _create_tables(self):
+        """
+        Creates the citation and context tables, if they do not exist.
+        """
+
+        self._create_citation_table('citation')
+
+        self.cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS "context" (
+            "id"	INTEGER PRIMARY KEY AUTOINCREMENT,
+            "reference_id" INTEGER NOT NULL,
+            "module" TEXT NOT NULL,
+            "note" TEXT NOT NULL,
+            "count"	INTEGER NOT NULL,
+            "level" INTEGER NOT NULL,
+            FOREIGN KEY(reference_id) REFERENCES Citation(id)
+            );
+            """
+        )
+
+    def _create_citation_table(self, name):
+        """
+        Creates the citation table. The raw text is deduplicated through the
+        unique digest in raw_hash rather than an index on the text itself.
+        """
+
+        self.cur.execute(
+            """CREATE TABLE IF NOT EXISTS "%s" (
+            "id"	INTEGER PRIMARY KEY AUTOINCREMENT,
+            "alias" TEXT NOT NULL UNIQUE,
+            "raw"	TEXT NOT NULL,
+            "raw_hash"	TEXT NOT NULL UNIQUE,
+            "doi"	TEXT UNIQUE
+            );
+            """ % name
+        )
+
+    def _migrate_citation_hash(self):
+        """
+        Converts a citation table keyed by the full raw text into one keyed
+        by its digest. Citations whose raw texts only differ in surrounding
+        whitespace are merged into the oldest one. Then indexes the aliases
+        and DOIs.
+        """
+
+        self.cur.execute("PRAGMA table_info(citation);")
+        columns = [row[1] for row in self.cur.fetchall()]
+
+        if 'raw_hash' not in columns:
+            self._create_citation_table('citation_new')
+
+            self.cur.execute(
+                "SELECT id, alias, raw, doi FROM citation ORDER BY id;"
+            )
+            rows = self.cur.fetchall()
+
+            ids = {}
+            moved = []
+            for reference_id, alias, raw, doi in rows:
+                key = raw_digest(raw)
+                if key in ids:
+                    moved.append((ids[key], reference_id))
+                    continue
+                ids[key] = reference_id
+                self.cur.execute(
+                    "INSERT INTO citation_new (id, alias, raw, raw_hash, doi) "
+                    "VALUES (?, ?, ?, ?, ?);",
+                    (reference_id, alias, raw, key, doi)
+                )
+
+            self.cur.executemany(
+                "UPDATE context SET reference_id = ? WHERE reference_id = ?;",
+                moved
+            )
+
+            self.cur.execute("DROP TABLE citation;")
+            self.cur.execute("ALTER TABLE citation_new RENAME TO citation;")
+
+        self.cur.execute(
+            "CREATE INDEX IF NOT EXISTS idx_alias on citation (alias);"
+        )
+        self.cur.execute(
+            "CREATE INDEX IF NOT EXISTS idx_doi on citation (doi);"
+        )
+
+    def _create_context_key(self):
+        """
+        Creates the composite unique key on (reference_id, module, note,
+        level) of the context table. Any duplicate contexts already present
+        are merged first, summing their counts into the oldest one. Then
+        indexes the other columns used in queries.
+        """
+
+        self.cur.execute(
+            "SELECT COUNT(*) FROM sqlite_master "
+            "WHERE type = 'index' AND name = 'idx_context';"
+        )
+        if self.cur.fetchone()[0] == 0:
+            self.cur.execute(
+                """
+                UPDATE context SET count = (
+                    SELECT SUM(t2.count) FROM context t2
+                    WHERE t2.reference_id = context.reference_id
+                    AND t2.module = context.module
+                    AND t2.note = context.note
+                    AND t2.level = context.level
+                )
+                WHERE id IN (
+                    SELECT MIN(id) FROM context
+                    GROUP BY reference_id, module, note, level
+                    HAVING COUNT(*) > 1
+                );
+                """
+            )
+            self.cur.execute(
+                """
+                DELETE FROM context WHERE id NOT IN (
+                    SELECT MIN(id) FROM context
+                    GROUP BY reference_id, module, note, level
+                );
+                """
+            )
+            # The composite key also serves lookups by reference_id
+            self.cur.execute("DROP INDEX IF EXISTS idx_refid;")
+            self.cur.execute(
+                "CREATE UNIQUE INDEX idx_context ON context "
+                "(reference_id, module, note, level);"
+            )
+
+        self.cur.execute(
+            "CREATE INDEX IF NOT EXISTS idx_module on context (module);"
+        )
+        self.cur.execute(
+            "CREATE INDEX IF NOT EXISTS idx_count on context (count);"
+        )
+        self.cur.execute(
+            "CREATE INDEX IF NOT EXISTS idx_level on context (level);"
+        )
+
+    def _create_log_tables(self):
+        """
+        Creates the tables recording how far compact_logs has read the logs
+        of LogBackend.
+        """
+
+        self.cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS "log_segment" (
+            "name" TEXT PRIMARY KEY,
+            "offset" INTEGER NOT NULL
+            );
+            """
+        )
+        self.cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS "log_reference" (
+            "log" TEXT NOT NULL,
+            "local_id" INTEGER NOT NULL,
+            "reference_id" INTEGER NOT NULL,
+            PRIMARY KEY (log, local_id)
+            );
+            """
+        )
+
+    def _create_citation_totals(self):
+        """
+        Creates the citation_totals table, which holds for each citation the
+        number of its contexts and the sum of their counts, in total and up
+        to each of the _total_levels. Triggers on the context table keep it
+        current, so total_mentions and mentions read a single row per
+        citation instead of summing its contexts.
+        """
+
+        columns = ['"total" INTEGER NOT NULL DEFAULT 0']
+        columns.append('"n_contexts" INTEGER NOT NULL DEFAULT 0')
+        for level in _total_levels:
+            columns.append('"level%d" INTEGER NOT NULL DEFAULT 0' % level)
+            columns.append('"n_contexts%d" INTEGER NOT NULL DEFAULT 0' % level)
+
+        self.cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS "citation_totals" (
+            "reference_id" INTEGER PRIMARY KEY,
+            %s
+            );
+            """ % ',\n            '.join(columns)
+        )
+
+        # Adding a count to a context that keeps its citation and level, by
+        # far the most common write, needs a single UPDATE. Other changes
+        # remove the old row from the totals and add the new one.
+        same_context = (
+            "NEW.reference_id = OLD.reference_id AND NEW.level = OLD.level"
+        )
+        triggers = [
+            (
+                "context_totals_insert", "AFTER INSERT ON context",
+                _add_totals_sql('NEW', 'NEW.count', 1)
+            ),
+            (
+                "context_totals_delete", "AFTER DELETE ON context",
+                _add_totals_sql('OLD', '-OLD.count', -1)
+            ),
+            (
+                "context_totals_count",
+                "AFTER UPDATE OF count ON context WHEN %s" % same_context,
+                _add_totals_sql('NEW', '(NEW.count - OLD.count)')
+            ),
+            (
+                "context_totals_update",
+                "AFTER UPDATE OF reference_id, count, level ON context "
+                "WHEN NOT (%s)" % same_context,
+                _add_totals_sql('OLD', '-OLD.count', -1) +
+                _add_totals_sql('NEW', 'NEW.count', 1)
+            ),
+        ]
+        for name, event, body in triggers:
+            self.cur.execute(
+                "CREATE TRIGGER IF NOT EXISTS %s %s BEGIN\n%sEND;" %
+                (name, event, body)
+            )
+
+        # Fill the table from the contexts already in the database
+        self.cur.execute("DELETE FROM citation_totals;")
+        sums = ['SUM(count)', 'COUNT(*)']
+        for level in _total_levels:
+            sums.append(
+                'SUM(CASE WHEN level <= %d THEN count ELSE 0 END)' % level
+            )
+            sums.append('SUM(level <= %d)' % level)
+        self.cur.execute(
+            "INSERT INTO citation_totals SELECT reference_id, %s "
+            "FROM context GROUP BY reference_id;" % ', '.join(sums)
+        )
+
+    def _create_render_cache(self):
+        """
+        Creates the render_cache table, which holds the text of each
+        citation as rendered by dump, with the digest of the raw text and
+        the version of the formatting it was rendered from.
+        """
+
+        self.cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS "render_cache" (
+            "reference_id" INTEGER PRIMARY KEY,
+            "raw_hash" TEXT NOT NULL,
+            "version" TEXT NOT NULL,
+            "text" TEXT NOT NULL,
+            FOREIGN KEY(reference_id) REFERENCES Citation(id)
+            );
+            """
+        )
+
+    def _add_log_identity(self):
+        """
+        Adds to the log_segment table the log each segment belongs to, as
+        in the log_reference table, which tells a log from a later one
+        reusing its name. The logs written before they had an identity are
+        known by the name of their segments without the segment number.
+        """
+
+        self.cur.execute("PRAGMA table_info(log_segment);")
+        if 'log' in [row[1] for row in self.cur.fetchall()]:
+            return
+
+        self.cur.execute('ALTER TABLE log_segment ADD COLUMN "log" TEXT;')
+        self.cur.execute("SELECT name FROM log_segment;")
+        self.cur.executemany(
+            "UPDATE log_segment SET log = ? WHERE name = ?;",
+            [(name.rsplit('.', 2)[0], name) for name, in self.cur.fetchall()]
+        )
+
+    def _create_citation_fields(self):
+        """
+        Creates the citation_fields table, which holds the fields parsed
+        from the raw text of each citation as a JSON object, with the digest
+        of the raw text they were parsed from. The fields of the citations
+        already in the database are not parsed here, which would be slow,
+        but stored by the first text dump that needs them.
+        """
+
+        self.cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS "citation_fields" (
+            "reference_id" INTEGER PRIMARY KEY,
+            "raw_hash" TEXT NOT NULL,
+            "fields" TEXT NOT NULL,
+            FOREIGN KEY(reference_id) REFERENCES Citation(id)
+            );
+            """
+        )
+
+
+@functools.lru_cache(maxsize=None)
+def _new_file_mode():
+    """
+    Returns the mode of the files created by the process, from its umask,
+    which is read once since it can only be read by setting it.
+    """
+
+    umask = os.umask(0)
+    os.umask(umask)
+
+    return 0o666 & ~umask
+
+
+def _add_totals_sql(row, count, n_contexts=0):
+    """
+    Returns the statements of a trigger adding to citation_totals a count
+    and a number of contexts, for the citation and level of the given row
+    of the context table, 'NEW' or 'OLD'.
+    """
+
+    changes = ['total = total + %s' % count]
+    if n_contexts != 0:
+        changes.append('n_contexts = n_contexts + %d' % n_contexts)
+    for level in _total_levels:
+        changes.append(
+            'level%d = level%d + CASE WHEN %s.level <= %d THEN %s ELSE 0 END' %
+            (level, level, row, level, count)
+        )
+        if n_contexts != 0:
+            changes.append(
+                'n_contexts%d = n_contexts%d + (%s.level <= %d) * %d' %
+                (level, level, row, level, n_contexts)
+            )
+
+    # A new context may be the first of its citation
+    ret = ''
+    if n_contexts > 0:
+        ret += (
+            "INSERT OR IGNORE INTO citation_totals (reference_id) "
+            "VALUES (%s.reference_id);\n" % row
+        )
+
+    ret += "UPDATE citation_totals SET %s\nWHERE reference_id = %s;\n" % (
+        ',\n'.join(changes), row + '.reference_id'
+    )
+
+    return ret
+
+
+class MemoryBackend(Backend):
+    """
+    Stores the citations and contexts in dictionaries, for tests and short
+    runs whose citations need not outlive the process.
+    """
+
+    def __init__(self):
+        # Citations [raw, raw_hash, alias, doi] and contexts [reference_id,
+        # module, note, level, count] keyed by their IDs
+        self._citations = {}
+        self._contexts = {}
+        # The citation IDs keyed by the value of each key column
+        self._keys = {column: {} for column in _key_columns}
+        # The context IDs keyed by (reference_id, module, note, level)
+        self._context_ids = {}
+        # The context IDs of each citation
+        self._reference_contexts = {}
+        self._last_citation_id = 0
+        self._last_context_id = 0
+        # The writes since the last commit, undone in reverse by rollback
+        self._undo = []
+        # The rendered text of citations, as (raw_hash, version, text) keyed
+        # by their IDs
+        self._renderings = {}
+        # The parsed fields of citations, as (raw_hash, fields) keyed by
+        # their IDs
+        self._fields = {}
+
+    def get_reference_ids(self, keys, column='raw_hash'):
+        if column not in _key_columns:
+            raise NameError('Cannot look up citations by %s' % column)
+
+        ids = self._keys[column]
+
+        return {key: ids[key] for key in keys if key in ids}
+
+    def add_citations(self, citations):
+        import sqlite3
+
+        for raw, raw_hash, alias, doi in citations:
+            if raw is None or raw_hash is None or alias is None:
+                raise sqlite3.IntegrityError(
+                    'The raw text, its digest and the alias are required'
+                )
+            for column, value in (
+                ('raw_hash', raw_hash), ('alias', alias), ('doi', doi)
+            ):
+                if value is not None and value in self._keys[column]:
+                    raise sqlite3.IntegrityError(
+                        'A citation with %s %s already exists' %
+                        (column, value)
+                    )
+
+            self._last_citation_id += 1
+            reference_id = self._last_citation_id
+            self._citations[reference_id] = [raw, raw_hash, alias, doi]
+            self._keys['raw_hash'][raw_hash] = reference_id
+            self._keys['alias'][alias] = reference_id
+            if doi is not None:
+                self._keys['doi'][doi] = reference_id
+            self._undo.append(('citation', reference_id))
+
+    def get_context_id(self, reference_id, module, note, level):
+        return self._context_ids.get((reference_id, module, note, level))
+
+    def add_context(self, reference_id, module, note, level, count=0):
+        key = (reference_id, module, note, level)
+        if key in self._context_ids:
+            import sqlite3
+
+            raise sqlite3.IntegrityError(
+                'The context %s already exists' % (key,)
+            )
+
+        return self._insert_context(reference_id, module, note, level, count)
+
+    def add_counts(self, contexts):
+        for reference_id, module, note, level, count in contexts:
+            context_id = self._context_ids.get(
+                (reference_id, module, note, level)
+            )
+            if context_id is None:
+                self._insert_context(reference_id, module, note, level, count)
+            else:
+                self._add_count(context_id, count)
+
+    def increment_contexts(self, rows):
+        ret = []
+
+        for row in rows:
+            count, context_id, reference_id, module, note, level, key = row
+            context = self._contexts.get(context_id)
+            citation = self._citations.get(reference_id)
+            if (
+                context is None or
+                context[:4] != [reference_id, module, note, level] or
+                citation is None or citation[1] != key
+            ):
+                ret.append(row)
+            else:
+                self._add_count(context_id, count)
+
+        return ret
+
+    def mentions(self, level, minimum=1):
+        ret = []
+
+        for reference_id, (raw, raw_hash, alias,
+                           doi) in self._citations.items():
+            counts = None
+            context_level = level
+            for context_id in self._reference_contexts.get(reference_id, []):
+                context = self._contexts[context_id]
+                if context[3] <= level:
+                    counts = context[4] + (0 if counts is None else counts)
+                    if context[4] > 0:
+                        context_level = min(context_level, max(context[3], 1))
+            if counts is not None and counts >= minimum:
+                ret.append((reference_id, raw, counts, context_level))
+
+        ret.sort(key=lambda item: item[2], reverse=True)
+
+        return ret
+
+    def total_mentions(self, reference_id=None, alias=None):
+        if reference_id is None:
+            reference_id = self._keys['alias'].get(alias)
+
+        contexts = self._reference_contexts.get(reference_id)
+        if reference_id not in self._citations or not contexts:
+            return None
+
+        return (
+            reference_id,
+            sum(self._contexts[context_id][4] for context_id in contexts)
+        )
+
+    def get_renderings(self, reference_ids, version):
+        ret = {}
+
+        for reference_id in reference_ids:
+            rendering = self._renderings.get(reference_id)
+            citation = self._citations.get(reference_id)
+            if rendering is None or citation is None:
+                continue
+            if rendering[:2] == (citation[1], version):
+                ret[reference_id] = rendering[2]
+
+        return ret
+
+    def add_renderings(self, renderings):
+        for reference_id, version, text in renderings:
+            if reference_id in self._citations:
+                self._renderings[reference_id] = (
+                    self._citations[reference_id][1], version, text
+                )
+
+    def get_fields(self, reference_ids):
+        ret = {}
+
+        for reference_id in reference_ids:
+            fields = self._fields.get(reference_id)
+            citation = self._citations.get(reference_id)
+            if fields is None or citation is None:
+                continue
+            if fields[0] == citation[1]:
+                ret[reference_id] = dict(fields[1])
+
+        return ret
+
+    def add_fields(self, fields):
+        for reference_id, values in fields:
+            if reference_id in self._citations:
+                self._fields[reference_id] = (
+                    self._citations[reference_id][1], dict(values)
+                )
+
+    def total_citations(self, reference_id=None, alias=None):
+        if reference_id is not None:
+            return int(reference_id in self._citations)
+        elif alias is not None:
+            return int(alias in self._keys['alias'])
+
+        return len(self._citations)
+
+    def total_contexts(self, reference_id=None, alias=None):
+        if reference_id is None:
+            reference_id = self._keys['alias'].get(alias)
+
+        return len(self._reference_contexts.get(reference_id, []))
+
+    def commit(self):
+        self._undo = []
+
+    def rollback(self):
+        for change in reversed(self._undo):
+            if change[0] == 'citation':
+                raw, raw_hash, alias, doi = self._citations.pop(change[1])
+                del self._keys['raw_hash'][raw_hash]
+                del self._keys['alias'][alias]
+                if doi is not None:
+                    del self._keys['doi'][doi]
+                self._last_citation_id -= 1
+            elif change[0] == 'context':
+                context = self._contexts.pop(change[1])
+                del self._context_ids[tuple(context[:4])]
+                self._reference_contexts[context[0]].pop()
+                self._last_context_id -= 1
+            else:
+                self._contexts[change[1]][4] -= change[2]
+
+        self._undo = []
+
+    def close(self):
+        self.commit()
+
+    def _insert_context(self, reference_id, module, note, level, count):
+        """Adds a context known to be new and returns its ID."""
+
+        self._last_context_id += 1
+        context_id = self._last_context_id
+        self._contexts[context_id] = [reference_id, module, note, level, count]
+        self._context_ids[(reference_id, module, note, level)] = context_id
+        self._reference_contexts.setdefault(reference_id,
+                                            []).append(context_id)
+        self._undo.append(('context', context_id))
+
+        return context_id
+
+    def _add_count(self, context_id, count):
+        """Adds to the count of an existing context."""
+
+        self._contexts[context_id][4] += count
+        self._undo.append(('count', context_id, count))
+
+
+def _pack_strings(values):
+    """Packs strings, or None, each preceded by its length."""
+
+    ret = []
+    for value in values:
+        if value is None:
+            ret.append(_string_length.pack(-1))
+        else:
+            value = value.encode('utf-8')
+            ret += [_string_length.pack(len(value)), value]
+
+    return b''.join(ret)
+
+
+def _unpack_strings(payload, offset, n):
+    """Unpacks n strings packed by _pack_strings, starting at offset."""
+
+    ret = []
+    for i in range(n):
+        length, = _string_length.unpack_from(payload, offset)
+        offset += _string_length.size
+        if length < 0:
+            ret.append(None)
+        else:
+            ret.append(payload[offset:offset + length].decode('utf-8'))
+            offset += length
+
+    return ret
+
+
+def _pack_record(record):
+    """
+    Packs a citation, count or identity record of LogBackend, with its
+    header.
+    """
+
+    if record[0] == 'c':
+        kind = _citation_record
+        payload = _citation_fields.pack(record[1]) + _pack_strings(record[2:])
+    elif record[0] == 'i':
+        kind = _identity_record
+        payload = _pack_strings(record[1:])
+    else:
+        kind = _count_record
+        reference_id, module, note, level, count = record[1:]
+        payload = _count_fields.pack(reference_id, level, count)
+        payload += _pack_strings((module, note))
+
+    return _record_header.pack(
+        kind, len(payload), zlib.crc32(payload)
+    ) + payload
+
+
+def read_log(path, offset=0):
+    """
+    Reads the records of a segment of the log of LogBackend, from the given
+    offset up to the end of the file or the first incomplete or corrupted
+    record, such as one cut short by a crash.
+
+    Each record is a header of the record type (1 byte), the length of the
+    payload and its CRC-32 (4 bytes each), followed by the payload. A
+    citation payload is the ID of the citation in the log followed by its
+    raw text, digest, alias and DOI; a count payload is the citation ID,
+    level and count followed by the module and note; an identity payload,
+    at the start of each segment, is the identity of the log. Integers are
+    little endian and strings are UTF-8 preceded by their length, -1 for
+    None.
+
+    Parameters
+    ----------
+    path: str
+        The file name of the segment.
+
+    offset: int, Optional, default: 0
+        The position of the first record to read.
+
+    Returns
+    -------
+    ret: tuple
+        A list of the records, ('c', reference_id, raw, raw_hash, alias,
+        doi), ('x', reference_id, module, note, level, count) or ('i',
+        identity), and the position after the last complete record.
+    """
+
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        data = f.read()
+
+    records = []
+    position = 0
+    while position + _record_header.size <= len(data):
+        kind, length, crc = _record_header.unpack_from(data, position)
+        start = position + _record_header.size
+        payload = data[start:start + length]
+        if len(payload) < length or zlib.crc32(payload) != crc:
+            break
+
+        if kind == _citation_record:
+            reference_id, = _citation_fields.unpack_from(payload)
+            records.append(
+                ('c', reference_id) +
+                tuple(_unpack_strings(payload, _citation_fields.size, 4))
+            )
+        elif kind == _count_record:
+            reference_id, level, count = _count_fields.unpack_from(payload)
+            module, note = _unpack_strings(payload, _count_fields.size, 2)
+            records.append(('x', reference_id, module, note, level, count))
+        elif kind == _identity_record:
+            records.append(('i',) + tuple(_unpack_strings(payload, 0, 1)))
+        else:
+            break
+
+        position = start + length
+
+    return records, offset + position
+
+
+def read_log_identity(path):
+    """
+    Returns the identity of the log a segment belongs to, from the record at
+    its start, or None if the segment was written before logs had one or
+    its first record is not complete yet.
+    """
+
+    with open(path, 'rb') as f:
+        data = f.read(_record_header.size)
+        if len(data) < _record_header.size:
+            return None
+        kind, length, crc = _record_header.unpack(data)
+        if kind != _identity_record:
+            return None
+        payload = f.read(length)
+
+    if len(payload) < length or zlib.crc32(payload) != crc:
+        return None
+
+    return _unpack_strings(payload, 0, 1)[0]
+
+
+class LogBackend(MemoryBackend):
+    """
+    Keeps the citations and contexts in memory, like MemoryBackend, and
+    appends the changes made by each transaction to an event log private to
+    the process, from which they are rebuilt when it is opened again. No SQL
+    is run: compact_logs of SQLiteBackend folds the logs of all processes
+    into the database.
+
+    The log is a series of segment files, named by log_path with a sequence
+    number, each holding records in the format of read_log. Each segment
+    starts with the identity of the log, which is random, so that a log is
+    never mistaken for an earlier one of the same name whose segments have
+    been removed. Each commit is a single write to the end of the current
+    segment, opened with O_APPEND, and a new segment is started when it
+    would grow beyond segment_size. A record left incomplete by a crash is
+    discarded on reading.
+
+    Parameters
+    ----------
+    database: str
+        The file name of the database the log belongs to.
+
+    segment_size: int, Optional, default: 16777216
+        The size in bytes beyond which a new segment is started.
+    """
+
+    def __init__(self, database, segment_size=16 * 1024 * 1024):
+        super().__init__()
+
+        self.database = database
+        self.segment_size = segment_size
+        self.path = self.log_path(database)
+        # The changes of the current transaction, written by commit
+        self._records = []
+
+        segments = self.find_logs(database, self.path)
+        if len(segments) > 0:
+            # The segments of logs from before identities have none
+            self.identity = read_log_identity(segments[0])
+        else:
+            import uuid
+
+            self.identity = uuid.uuid4().hex
+        for segment in segments:
+            self._replay(segment)
+        self.commit()
+
+        self._n_segment = len(segments) - 1 if len(segments) > 0 else 0
+        self._open_segment()
+
+    @staticmethod
+    def log_path(database):
+        """
+        Returns the name, without the segment number, of the log of the
+        current process for the given database, which includes the host name
+        and process ID.
+        """
+
+        import socket
+
+        return '%s.%s.%d' % (database, socket.gethostname(), os.getpid())
+
+    @staticmethod
+    def find_logs(database, path=None):
+        """
+        Returns the names of all the log segments of the given database in
+        the order they were written, or only those of the given log_path.
+        """
+
+        if path is None:
+            path = glob.escape(database) + '.*'
+        else:
+            path = glob.escape(path)
+
+        return sorted(glob.glob(path + '.*.log'))
+
+    def add_citations(self, citations):
+        citations = [tuple(citation) for citation in citations]
+        first = self._last_citation_id + 1
+        super().add_citations(citations)
+        self._records += [
+            ('c', reference_id) + citation
+            for reference_id, citation in enumerate(citations, first)
+        ]
+
+    def add_context(self, reference_id, module, note, level, count=0):
+        ret = super().add_context(reference_id, module, note, level, count)
+        self._records.append(('x', reference_id, module, note, level, count))
+
+        return ret
+
+    def add_counts(self, contexts):
+        contexts = [tuple(context) for context in contexts]
+        super().add_counts(contexts)
+        self._records += [('x',) + context for context in contexts]
+
+    def increment_contexts(self, rows):
+        ret = super().increment_contexts(rows)
+        self._records += [
+            ('x',) + tuple(row[2:6]) + (row[0],)
+            for row in rows
+            if row not in ret
+        ]
+
+        return ret
+
+    def commit(self):
+        if len(self._records) > 0:
+            data = b''.join(_pack_record(record) for record in self._records)
+            if self._size > self._start and (
+                self._size + len(data) > self.segment_size
+            ):
+                os.close(self._fd)
+                self._n_segment += 1
+                self._open_segment()
+            os.write(self._fd, data)
+            self._size += len(data)
+            self._records = []
+        super().commit()
+
+    def rollback(self):
+        self._records = []
+        super().rollback()
+
+    def close(self):
+        if self._fd is None:
+            return
+
+        self.commit()
+        os.close(self._fd)
+        self._fd = None
+
+    def _open_segment(self):
+        """Opens the current segment for appending."""
+
+        path = '%s.%06d.log' % (self.path, self._n_segment)
+        self._fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._size = os.path.getsize(path)
+
+        # The size of the identity record starting a new segment
+        self._start = 0
+        if self._size == 0 and self.identity is not None:
+            data = _pack_record(('i', self.identity))
+            os.write(self._fd, data)
+            self._size = self._start = len(data)
+
+    def _replay(self, path):
+        """
+        Applies the changes recorded in a segment, and cuts off a last
+        record left incomplete by a crash so that new records start cleanly.
+        """
+
+        records, size = read_log(path)
+        for record in records:
+            if record[0] == 'c':
+                MemoryBackend.add_citations(self, [record[2:]])
+            elif record[0] == 'x':
+                MemoryBackend.add_counts(self, [record[1:]])
+
+        if size < os.path.getsize(path):
+            os.truncate(path, size)
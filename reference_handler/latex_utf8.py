@@ -66,9 +66,8 @@ LaTeX uses multiple dashes to represent different dashes:
 ========= ========= ===================
 """
 
+import functools
 import re
-import typing
-import unicodedata
 
 alphabet = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'
 
@@ -97,33 +96,8 @@ accent = {
     'v': '\N{Combining Caron}'
 }
 
-# The regexp to detect the LaTeX accent commands. The two added characters
-# are the dotless i and j.
-accent_re = re.compile(
-    r'\\([' + ''.join(accent.keys()) + r']){([a-zA-Z\u0131\u0237])}'
-)
 
-# Invert the accent dictionary for each letter in the alphabet to make
-# a dictionary of LaTeX encodings.
-encoding = {}
-for key, val in accent.items():
-    for char in list(alphabet):
-        encoding[char + val] = '\\' + key + '{' + char + '}'
-        # handle any precombined versions of the character
-        string = unicodedata.normalize('NFC', char + val)
-        if len(string) == 1:
-            encoding[string] = encoding[char + val]
-    for char in [
-        '\N{Latin Small Letter Dotless I}', '\N{Latin Small Letter Dotless J}'
-    ]:
-        encoding[char + val] = r'\%s{%s}' % (key, char)
-        string = unicodedata.normalize('NFC', char + val)
-        # These characters have no precombined versions, but check anyway
-        if len(string) == 1:
-            encoding[string] = encoding[char + val]
-
-
-def _decode_latex_accent(match: typing.Match) -> str:
+def _decode_latex_accent(match: re.Match) -> str:
     """Helper function for re.sub for replacing LaTeX accents.
 
     Parameters:
@@ -145,15 +119,8 @@ symbol = {
     'O': '\N{Latin Capital Letter O With Stroke}'
 }
 
-# The regexp to detect the LaTeX commands for special characters
-symbol_re = re.compile(r'\\([' + ''.join(symbol.keys()) + '])')
-
-# Invert the symbol dictionary to make a dictionary of LaTeX encodings.
-for key, val in symbol.items():
-    encoding[val] = '\\' + key
 
-
-def _decode_latex_symbol(match: typing.Match) -> str:
+def _decode_latex_symbol(match: re.Match) -> str:
     """Helper function for re.sub for replacing LaTeX special characters.
 
     Parameters:
@@ -165,18 +132,16 @@ def _decode_latex_symbol(match: typing.Match) -> str:
     return symbol[match[1]]
 
 
+# The symbols that may be the letter of an accent, i.e. \"{\i}
+_dotless = ''.join(
+    key for key, value in symbol.items() if value in '\u0131\u0237'
+)
+
 # LaTeX dashes
 dash = {'--': '\N{EN Dash}', '---': '\N{EM Dash}'}
 
-# The regexp to detect the LaTeX commands for dashes
-dash_re = re.compile(r'([^-]?)(-{2,3})([^-]?)')
-
-# Invert the dictionary tomake a dictionary of LaTeX encodings.
-for key, val in dash.items():
-    encoding[val] = key
-
 
-def _decode_latex_dash(match: typing.Match) -> str:
+def _decode_latex_dash(match: re.Match) -> str:
     """Helper function for re.sub for replacing LaTeX dashes.
 
     Parameters:
@@ -188,14 +153,164 @@ def _decode_latex_dash(match: typing.Match) -> str:
     return match[1] + dash[match[2]] + match[3]
 
 
-# LaTeX braces to protect capitalization.
-brace_re = re.compile(r"""{([^}]*)}""")
+def _decode_latex_command(match: re.Match) -> str:
+    """Helper function for re.sub for replacing the matches of decode_re.
+
+    Parameters:
+        match: The match object from re.sub
+
+    Returns:
+        The unicode characters for the accent, symbol or dashes.
+    """
+    ret = _build_decoding().get(match[0])
+    if ret is None:
+        # A run of more than three dashes, which dash_re replaces three at a
+        # time, leaving a single dash as is.
+        n, rest = divmod(len(match[0]), 3)
+        ret = dash['---'] * n + ('', '-', dash['--'])[rest]
+
+    return ret
+
+
+def _construct_encoding() -> dict:
+    """Inverts the accent, symbol and dash dictionaries to make the dictionary
+    of LaTeX encodings. This is slow, so the result is generated into
+    _latex_tables by devtools/scripts/generate_latex_tables.py.
+
+    Returns:
+        The LaTeX encoding of each accented or special character.
+    """
+    import unicodedata
+
+    encoding = {}
+
+    # Invert the accent dictionary for each letter in the alphabet.
+    for key, val in accent.items():
+        for char in list(alphabet):
+            encoding[char + val] = '\\' + key + '{' + char + '}'
+            # handle any precombined versions of the character
+            string = unicodedata.normalize('NFC', char + val)
+            if len(string) == 1:
+                encoding[string] = encoding[char + val]
+        for char in [
+            '\N{Latin Small Letter Dotless I}',
+            '\N{Latin Small Letter Dotless J}'
+        ]:
+            encoding[char + val] = r'\%s{%s}' % (key, char)
+            string = unicodedata.normalize('NFC', char + val)
+            # These characters have no precombined versions, but check anyway
+            if len(string) == 1:
+                encoding[string] = encoding[char + val]
+
+    for key, val in symbol.items():
+        encoding[val] = '\\' + key
+
+    for key, val in dash.items():
+        encoding[val] = key
+
+    return encoding
+
+
+def _construct_patterns() -> dict:
+    """Makes the regexps used to decode LaTeX. They are generated into
+    _latex_tables together with the encoding.
+
+    Returns:
+        The patterns, keyed by the module-level names of the regexps.
+    """
+    return {
+        # The LaTeX accent commands. The two added characters are the
+        # dotless i and j.
+        'accent_re':
+            r'\\([' + ''.join(accent.keys()) + r']){([a-zA-Z\u0131\u0237])}',
+        # The LaTeX commands for special characters
+        'symbol_re':
+            r'\\([' + ''.join(symbol.keys()) + '])',
+        # The LaTeX commands for dashes
+        'dash_re':
+            r'([^-]?)(-{2,3})([^-]?)',
+        # LaTeX braces to protect capitalization.
+        'brace_re':
+            r"""{([^}]*)}""",
+        # The runs of dashes, accent commands, including those of the
+        # dotless symbols, and symbol commands, in one scan.
+        'decode_re':
+            r'-{2,}|\\[' + ''.join(accent.keys()) +
+            r']{(?:[a-zA-Z\u0131\u0237]|\\[' + _dotless + r'])}' + r'|\\[' +
+            ''.join(symbol.keys()) + ']',
+    }
+
+
+# The names of the regexps used to decode LaTeX
+_regex_names = ('accent_re', 'symbol_re', 'dash_re', 'brace_re', 'decode_re')
+
+
+@functools.lru_cache(maxsize=None)
+def _build_encoding() -> dict:
+    """Loads the dictionary of LaTeX encodings on first use.
+
+    Returns:
+        The LaTeX encoding of each accented or special character.
+    """
+    from ._latex_tables import encoding
+
+    return encoding
+
+
+@functools.lru_cache(maxsize=None)
+def _build_decoding() -> dict:
+    """Makes the dictionary of the LaTeX commands matched by decode_re on
+    first use.
+
+    Returns:
+        The unicode characters for each accent and symbol command, and for
+        the dashes.
+    """
+    decoding = dict(dash)
+
+    for key, val in accent.items():
+        for char in alphabet + '\u0131\u0237':
+            decoding['\\' + key + '{' + char + '}'] = char + val
+        for char in _dotless:
+            decoding[r'\%s{\%s}' % (key, char)] = symbol[char] + val
+
+    for key, val in symbol.items():
+        decoding['\\' + key] = val
+
+    return decoding
+
+
+@functools.lru_cache(maxsize=None)
+def _build_regexes() -> dict:
+    """Compiles the regexps used to decode LaTeX on first use.
+
+    Returns:
+        The compiled regexps, keyed by their public module-level names.
+    """
+    from ._latex_tables import patterns
+
+    return {name: re.compile(patterns[name]) for name in _regex_names}
+
+
+def __getattr__(name):
+    """Builds the encoding dictionary and the regexps when first accessed."""
+    if name == 'encoding':
+        return _build_encoding()
+    if name in _regex_names:
+        return _build_regexes()[name]
+    raise AttributeError('module %r has no attribute %r' % (__name__, name))
 
 
 def decode_latex(text: str) -> str:
     """Replaces all LaTeX accents in the input string with their UTF8
     equivalents.
 
+    The dashes, symbols and accents are replaced in a single scan with
+    decode_re, rather than one for each of dash_re, symbol_re and accent_re,
+    and the braces are then paired as brace_re does, by splitting the text
+    on the closing braces: each one is removed with the first opening brace
+    since the previous one, if any.
+
     Parameters:
         text: The text to translate.
 
@@ -203,16 +318,17 @@ def decode_latex(text: str) -> str:
         The translated string, using LaTeX commands for accents and special
         characters.
     """
+    text = _build_regexes()['decode_re'].sub(_decode_latex_command, text)
+
+    parts = text.split('}')
+    last = parts.pop()
 
-    return brace_re.sub(
-        r'\1',
-        accent_re.sub(
-            _decode_latex_accent,
-            symbol_re.sub(
-                _decode_latex_symbol, dash_re.sub(_decode_latex_dash, text)
-            )
-        )
-    )
+    return ''.join(
+        [
+            part.replace('{', '', 1) if '{' in part else part + '}'
+            for part in parts
+        ]
+    ) + last
 
 
 def encode_latex(text: str) -> str:
@@ -227,6 +343,8 @@ def encode_latex(text: str) -> str:
         characters
     """
 
+    encoding = _build_encoding()
+
     # Map the double character representations
     text2 = ''
     char1 = text[0]
@@ -5,13 +5,26 @@ A Python package that facilitates the citation of scientific material.
 Handles the primary class
 """
 
-import sqlite3
-import pprint
+import atexit
+import collections
+import functools
+import glob
+import itertools
+import json
+import os
+import queue
 import re
-
-import bibtexparser
+import threading
+import time
+import weakref
+
+# asyncio, bibtexparser, concurrent.futures, pprint, socket, sqlite3 and
+# tempfile are imported where they are needed, to keep the import of the
+# package fast.
+from .backends import Backend, LogBackend, MemoryBackend, SQLiteBackend
+from .backends import profile_variable, sqlite_profiles  # noqa: F401
 from .latex_utf8 import decode_latex
-from .utils import entry_to_bibtex
+from .utils import entry_to_bibtex, LRUCache, raw_digest
 
 supported_fmts = ['bibtex', 'text']
 
@@ -50,7 +63,6 @@ subscript = {
     'v': '\N{Latin Subscript Small Letter V}',
     r'.': '.'
 }
-subscript_re = re.compile(r'\$_([' + ''.join(subscript.keys()) + r']+)\$')
 
 # '-' must be first for the regex to work.
 superscript = {
@@ -95,7 +107,6 @@ superscript = {
     'y': 'ʸ',
     'z': 'ᶻ'
 }
-superscript_re = re.compile(r'\$\^([' + ''.join(superscript.keys()) + r']+)\$')
 
 greek_symbol = {
     'alpha': '\N{Greek Small Letter Alpha}',
@@ -149,167 +160,530 @@ greek_symbol = {
     'Psi': '\N{Greek Capital Letter Psi}',
     'Omega': '\N{Greek Capital Letter Omega}',
 }
-greek_symbol_re = re.compile(r'\$\\(' + '|'.join(greek_symbol.keys()) + r')\$')
+
+
+def _math_symbol_patterns():
+    """
+    Makes the regexps of subscripts, superscripts and Greek symbols. They are
+    generated into _latex_tables by devtools/scripts/generate_latex_tables.py.
+    """
+
+    return {
+        'subscript_re': r'\$_([' + ''.join(subscript.keys()) + r']+)\$',
+        'superscript_re': r'\$\^([' + ''.join(superscript.keys()) + r']+)\$',
+        'greek_symbol_re': r'\$\\(' + '|'.join(greek_symbol.keys()) + r')\$'
+    }
+
+
+@functools.lru_cache(maxsize=None)
+def _math_symbol_res():
+    """
+    Compiles the regexps of subscripts, superscripts and Greek symbols on
+    first use.
+    """
+    from ._latex_tables import patterns
+
+    return {
+        name: re.compile(patterns[name])
+        for name in ('subscript_re', 'superscript_re', 'greek_symbol_re')
+    }
+
+
+def __getattr__(name):
+    # The regexps are module attributes compiled on first access
+    if name in ('subscript_re', 'superscript_re', 'greek_symbol_re'):
+        return _math_symbol_res()[name]
+
+    raise AttributeError('module %r has no attribute %r' % (__name__, name))
+
+
+# The storage backends that can be chosen by name
+storage_backends = ['sqlite', 'memory', 'log']
+
+# Policies for a full queue of citations written in the background
+backpressure_policies = ['block', 'drop', 'spill']
+
+# Queue items asking the background writer to write the spill file or stop
+_spill_marker = object()
+_stop_marker = object()
+
+# Handlers holding citations in memory, closed when the interpreter exits.
+_buffered_handlers = weakref.WeakSet()
+
+
+@atexit.register
+def _close_buffered_handlers():
+    for handler in list(_buffered_handlers):
+        try:
+            handler.close()
+        except Exception:
+            pass
+
+
+# Handlers shared through Reference_Handler.open, keyed by the canonical path
+# of their database.
+_shared_handlers = {}
+_shared_handlers_lock = threading.Lock()
+
+
+@atexit.register
+def _close_shared_handlers():
+    for handler in list(_shared_handlers.values()):
+        handler._n_shared = 1
+        try:
+            handler.close()
+        except Exception:
+            pass
+
+
+def _synchronized(method):
+    """Runs a method of Reference_Handler while holding its lock."""
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+# The instances formatting text in the worker processes of dump, by class
+_text_formatters = {}
+
+
+def _format_texts(cls, items):
+    """
+    Formats rows of mentions without cached text as plain text with the
+    format_* methods of a Reference_Handler class, like _format_row. Runs in a
+    worker process of dump, on an instance made without a database.
+    """
+
+    formatter = _text_formatters.get(cls)
+    if formatter is None:
+        formatter = cls.__new__(cls)
+        formatter.parse_cache = LRUCache()
+        _text_formatters[cls] = formatter
+
+    return [formatter._format_row(item) for item in items]
+
+
+def _read_shard(path):
+    """
+    Reads the citations and the summed context counts of a shard database.
+    Runs in a worker thread of Reference_Handler.merge.
+    """
+
+    import pathlib
+    import sqlite3
+
+    # The path is escaped, as characters like '#' or '?' end its part of
+    # the URI
+    uri = pathlib.Path(path).resolve().as_uri() + '?mode=ro'
+    conn = sqlite3.connect(uri, uri=True)
+    try:
+        citations = conn.execute(
+            "SELECT id, raw, raw_hash, alias, doi FROM citation;"
+        ).fetchall()
+        contexts = conn.execute(
+            "SELECT reference_id, module, note, level, SUM(count) "
+            "FROM context GROUP BY reference_id, module, note, level;"
+        ).fetchall()
+    finally:
+        conn.close()
+
+    return citations, contexts
 
 
 class Reference_Handler(object):
 
-    def __init__(self, database):
+    # The maximum number of queued acite calls written in one transaction
+    async_batch_size = 1000
+
+    # The version of the text formatting of dump, stored with the rendered
+    # text in the render cache. Increase it whenever the output of the
+    # format_* methods, decode_latex or decode_math_symbols changes.
+    text_format_version = 1
+
+    # For handlers from open, the key in _shared_handlers, the arguments they
+    # were constructed with and the number of calls to open not yet closed
+    _shared_key = None
+    _shared_kwargs = None
+    _n_shared = 0
+
+    # Set once close has released the database
+    _closed = False
+
+    def __init__(
+        self,
+        database=None,
+        buffered=False,
+        buffer_size=1000,
+        flush_interval=None,
+        parse_cache_size=1024,
+        call_site_cache_size=4096,
+        shard=False,
+        background=False,
+        queue_size=10000,
+        backpressure='block',
+        profile=None,
+        in_memory=False,
+        autosave_interval=None,
+        backend=None
+    ):
         """
         Constructs a reference handler class by connecting to a
         SQLite database and bulding the two tables within it.
+
+        Parameters
+        ----------
+        database: str
+            The file name of the SQLite database, or of the log of the 'log'
+            backend. Not needed by the 'memory' backend.
+
+        buffered: bool, Optional, default: False
+            If True, the contexts of the citations are accumulated in memory
+            and written to the database in a single transaction when the
+            buffer is flushed, instead of committing on every call to cite.
+
+        buffer_size: int, Optional, default: 1000
+            In buffered mode, the number of calls to cite after which the
+            buffer is flushed.
+
+        flush_interval: float, Optional, default: None
+            In buffered mode, the number of seconds after which the buffer is
+            flushed by the next call to cite. None disables the time limit.
+
+        parse_cache_size: int, Optional, default: 1024
+            The number of parsed BibTeX entries kept in memory, so that
+            repeated citations of the same raw text are parsed only once. 0
+            disables the cache and None makes it unbounded.
+
+        call_site_cache_size: int, Optional, default: 4096
+            The number of distinct calls to cite whose reference and context
+            IDs are kept in memory, so that repeating a call only increments
+            the counter. 0 disables the cache and None makes it unbounded.
+
+        shard: bool, Optional, default: False
+            If True, the citations are written to a database private to this
+            process, named by shard_path, to be combined later with merge.
+
+        background: bool, Optional, default: False
+            If True, cite only puts the citation on a queue and returns
+            None. A writer thread takes the citations off the queue, combines
+            identical ones and writes them in batches. Use flush or join to
+            wait until they are in the database.
+
+        queue_size: int, Optional, default: 10000
+            In background mode, the number of citations the queue can hold.
+
+        backpressure: str, Optional, default: 'block'
+            In background mode, what cite does when the queue is full: wait
+            for room ('block'), discard the citation and count it in
+            dropped ('drop'), or append it to a temporary file that the
+            writer reads later ('spill').
+
+        profile: str or dict, Optional, default: None
+            The name of one of the sqlite_profiles, 'durable', 'balanced' or
+            'ephemeral', or a dictionary of PRAGMAs to apply to the
+            connection. If None, the profile named by the environment
+            variable REFERENCE_HANDLER_PROFILE is used, and if that is not
+            set the SQLite defaults are left unchanged.
+
+        in_memory: bool, Optional, default: False
+            If True, the handler works on a copy of the database held in
+            memory, loaded from the file if it exists. The copy is written
+            back to the file by save, which close calls.
+
+        autosave_interval: float, Optional, default: None
+            With in_memory, the number of seconds between automatic saves
+            by a background thread. None disables the automatic saves.
+
+        backend: str or Backend, Optional, default: None
+            Where the citations are stored: the name of one of the
+            storage_backends, 'sqlite', 'memory' or 'log', or an instance of
+            a subclass of Backend. None is the same as 'sqlite'. The profile
+            and in_memory arguments only apply to the 'sqlite' backend.
         """
 
-        self.conn = sqlite3.connect(database)
-        self.cur = self.conn.cursor()
-        self._initialize_tables()
+        if backpressure not in backpressure_policies:
+            raise ValueError(
+                'Invalid backpressure policy %s. Please use one of %s' %
+                (backpressure, ', '.join(backpressure_policies))
+            )
+
+        if backend is None:
+            backend = 'sqlite'
+        if isinstance(backend, str):
+            if backend not in storage_backends:
+                raise ValueError(
+                    'Invalid backend %s. Please use one of %s' %
+                    (backend, ', '.join(storage_backends))
+                )
+            if database is None and backend != 'memory':
+                raise NameError(
+                    'The database must be provided for the %s backend' %
+                    backend
+                )
+
+        if shard:
+            database = self.shard_path(database)
+        self.database = database
+
+        if backend == 'sqlite':
+            backend = SQLiteBackend(
+                database, profile=profile, in_memory=in_memory
+            )
+        elif backend == 'memory':
+            backend = MemoryBackend()
+        elif backend == 'log':
+            backend = LogBackend(database)
+        elif not isinstance(backend, Backend):
+            raise TypeError(
+                'The backend must be a name or a Backend but it is %s' %
+                type(backend)
+            )
+        self.backend = backend
+
+        # The SQLite connection, which is shared by all threads, is exposed
+        # for direct queries.
+        self.conn = getattr(backend, 'conn', None)
+        self.cur = getattr(backend, 'cur', None)
+
+        # The backend is used by all threads, which take turns through the
+        # lock held by every public method.
+        self._lock = threading.RLock()
+        self.in_memory = in_memory
+
+        # Parsed BibTeX entries keyed by the digest of the raw text
+        self.parse_cache = LRUCache(parse_cache_size)
+        # (reference_id, context_id, raw_hash) keyed by the arguments of cite
+        self._call_sites = LRUCache(call_site_cache_size)
+
+        self.buffered = buffered
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        # Pending counts, as [count, reference_id, key, fmt] with the key and
+        # format of the cite, keyed by context ID
+        self._pending = {}
+        self._n_pending = 0
+        self._last_flush = time.monotonic()
+        if buffered or background or in_memory:
+            _buffered_handlers.add(self)
+
+        # The background writer and its queue
+        self.backpressure = backpressure
+        self.dropped = 0
+        self.background_errors = collections.deque(maxlen=100)
+        self._queue_lock = threading.Lock()
+        self._spill_file = None
+        self._n_spilled = 0
+        self._writer = None
+        if background:
+            self._queue = queue.Queue(queue_size)
+            self._writer = threading.Thread(
+                target=self._background_writer,
+                name='reference_handler-writer',
+                daemon=True
+            )
+            self._writer.start()
+
+        # The thread saving the in-memory database periodically
+        self._autosave = None
+        if in_memory and autosave_interval is not None:
+            self._autosave_stop = threading.Event()
+            self._autosave = threading.Thread(
+                target=self._autosave_loop,
+                args=(autosave_interval,),
+                name='reference_handler-autosave',
+                daemon=True
+            )
+            self._autosave.start()
+
+        # State of the asyncio interface, created on first use
+        self._aloop = None
+        self._aqueue = None
+        self._awriter = None
+        self._aexecutor = None
 
     def __del__(self):
         try:
-            self.conn.commit()
-            self.conn.close()
+            self.close()
             # print('Closed database connection.')
         except:  # noqa: E722
             pass
             # print('Database was already closed.')
 
-    def dump(self, outfile=None, fmt='bibtex', level=3):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+    @classmethod
+    def open(cls, database, **kwargs):
         """
-        Retrieves the individual citations that were collected during the
-        execution of a program and tallies the number of times each citation
-        was referenced.
+        Returns the handler of the given database shared by the whole
+        process, constructing it on the first call. The database is known by
+        its canonical path, so different names of the same file give the
+        same handler, which is connected and set up only once.
+
+        Every call must be matched by a call to close, and the handler is
+        only closed by the last one. Handlers still open when the
+        interpreter exits are closed then.
 
         Parameters
         ----------
-        outfile: str, Optional, default: None
-            The file name where for the dump, if desired.
-
-        fmt: str, Optional, default: 'bibtex'
-            The format of the dump file, if desired.
+        database: str
+            The file name of the database.
 
-        level: int, Optional, default: None
-            Only those citations whose level at least the specified by level
-            will be output.
+        kwargs:
+            The other arguments of the constructor. Later calls for the same
+            database must give the same arguments, or none.
 
         Returns
         -------
-        ret: list
-            A list whose elements are tuples containing pairs of raw citations
-            and their counts.
+        ret: Reference_Handler
+            The shared handler, which can be used as a context manager.
         """
 
-        if fmt not in supported_fmts:
-            raise NameError('Format %s not currently supported.' % (fmt))
+        if database is None:
+            raise NameError('The database must be provided')
 
-        if fmt not in supported_fmts:
-            raise NameError('Format %s not currently supported.' % (fmt))
+        key = os.path.normcase(os.path.realpath(database))
 
-        if level not in range(1, 4) and level is not None:
-            raise ValueError(
-                'Invalid value for level. Please input a value in the range '
-                '[1,3]'
-            )
+        with _shared_handlers_lock:
+            ret = _shared_handlers.get(key)
 
-        self.cur.execute(
-            """
-            SELECT t1.id, t1.raw, t2.counts, t2.level
-            FROM citation t1
-            LEFT JOIN(
-                SELECT id, reference_id, level, SUM(count) AS counts FROM
-                context WHERE level <= ?
-                GROUP BY reference_id
-            ) t2
-            ON t1.id = t2.reference_id WHERE counts > 0 ORDER BY counts DESC
-        """, (level,)
-        )
+            if ret is None:
+                ret = cls(database, **kwargs)
+                ret._shared_key = key
+                ret._shared_kwargs = kwargs
+                _shared_handlers[key] = ret
+            elif len(kwargs) > 0 and kwargs != ret._shared_kwargs:
+                raise ValueError(
+                    'The handler of %s is already open with the arguments %s' %
+                    (database, ret._shared_kwargs)
+                )
 
-        query = self.cur.fetchall()
+            ret._n_shared += 1
 
-        if fmt == 'bibtex':
+        return ret
 
-            ret = query
+    def close(self):
+        """
+        Writes any queued or buffered citations, stops the background writer
+        and closes the database connection. A handler from open is only
+        closed once close has been called for every call to open. Closing a
+        closed handler does nothing.
 
-            if outfile is not None:
-                if type(outfile) is not str:
-                    raise TypeError(
-                        'The name of the output file must be a string but it '
-                        'is %s' % type(outfile)
-                    )
+        Returns
+        -------
+        None
+        """
 
-                with open(outfile, 'w') as f:
-                    for item in query:
-                        f.write('TOTAL_MENTIONS: %s \n' % str(item[2]))
-                        f.write('LEVEL: %s \n' % str(item[3]))
-                        f.write(item[1])
-
-        elif fmt == 'text':
-
-            ret = []
-
-            for item in query:
-                parse = bibtexparser.loads(item[1]).entries[0]
-                entry_type = parse['ENTRYTYPE']
-                if entry_type == 'misc':
-                    plain_text = self.format_misc(parse)
-                elif entry_type == 'article':
-                    plain_text = self.format_article(parse)
-                elif entry_type == 'inbook':
-                    plain_text = self.format_inbook(parse)
-                elif entry_type == 'phdthesis':
-                    plain_text = self.format_phdthesis(parse)
-                else:
-                    plain_text = f"Do not have a handler for '{entry_type}':"
-                    plain_text += '\n'
-                    plain_text += pprint.pformat(parse)
+        if self._closed:
+            return
+
+        if self._shared_key is not None:
+            with _shared_handlers_lock:
+                self._n_shared -= 1
+                if self._n_shared > 0:
+                    return
+                del _shared_handlers[self._shared_key]
+                self._shared_key = None
+
+        if self._writer is not None:
+            self._queue.put(_stop_marker)
+            self._writer.join()
+            self._writer = None
+            if self._spill_file is not None:
+                self._spill_file.close()
+                self._spill_file = None
+
+        if self._autosave is not None:
+            self._autosave_stop.set()
+            self._autosave.join()
+            self._autosave = None
+
+        with self._lock:
+            if self._closed:
+                return
+            self._flush_buffer()
+            self.backend.close()
+            _buffered_handlers.discard(self)
+            self._closed = True
+
+    @_synchronized
+    def save(self):
+        """
+        Writes the in-memory database to its file, using the SQLite backup
+        API. The copy is made in a temporary file next to the database and
+        renamed over it, so the file is always either the old or the new
+        version. Does nothing if the handler does not work in memory.
 
-                plain_text = decode_latex(plain_text)
-                plain_text = self.decode_math_symbols(plain_text)
-                ret.append((item[0], plain_text, item[2], item[3]))
+        Returns
+        -------
+        None
+        """
 
-        return ret
+        if not self.in_memory:
+            return
 
-    @staticmethod
-    def load_bibliography(bibfile=None, fmt='bibtex'):
-        """
-        Utility function to read a bibliographic file in common formats.
-        The current supported formats are BibTeX.
+        self._flush_buffer()
+        self.backend.save()
 
-        Parameters
-        ----------
-        bibfile: str, default: None
-            The file name for the bibliographic file.
+    def _autosave_loop(self, interval):
+        """Saves the in-memory database every interval seconds."""
 
-        fmt: str, Optional, default: 'bibtex'
-            The format of the bibliographic file, if desired.
+        while not self._autosave_stop.wait(interval):
+            try:
+                self.save()
+            except Exception as e:
+                self.background_errors.append((None, e))
+
+    def join(self):
+        """
+        Waits until the background writer has written all the citations
+        queued, or spilled, before this call. Does nothing if the handler
+        does not write in the background.
 
         Returns
         -------
-        ret: dict
-            A dictionary whose keys are the identifiers used in the
-            bibliographic file (e.g. the first line in a BibTeX entry) and
-            values are the raw entries found in such file. Note that the values
-            of the dictionary might not be the exactly as found in the original
-            bibliographic file.
+        None
         """
 
-        if bibfile is None:
-            raise FileNotFoundError('A bibliography file must be specified.')
+        if self._writer is None:
+            return
 
-        if fmt not in supported_fmts:
-            raise NameError('Format %s not currently supported.' % (fmt))
+        self._queue.put(_spill_marker)
+        self._queue.join()
 
-        with open(bibfile, 'r') as f:
-            parser = bibtexparser.bparser.BibTexParser(common_strings=True)
-            bibliography = bibtexparser.load(f, parser=parser).entries
+    @classmethod
+    async def aopen(cls, *args, **kwargs):
+        """
+        Constructs a reference handler without blocking the event loop. The
+        arguments are those of the constructor.
 
-        ret = {k['ID']: {} for k in bibliography}
+        Returns
+        -------
+        ret: Reference_Handler
+            The new handler, which can be used as an async context manager.
+        """
 
-        for entry in bibliography:
-            ret[entry['ID']] = entry_to_bibtex(entry)
+        import asyncio
 
-        return ret
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, functools.partial(cls, *args, **kwargs)
+        )
 
-    def cite(
+    async def acite(
         self,
         raw=None,
         alias=None,
@@ -320,35 +694,17 @@ class Reference_Handler(object):
         doi=None
     ):
         """
-        Adds a given reference to the internal database.
-
-        Parameters
-        ----------
-
-        alias: str, default: None
-            A string ID for the citation.
-
-        raw: str, default: None
-            The raw text for a given citation.
-
-        module: str, default: None
-            The module or function where this citation was called from
-
-        level: int, default: 1
-            The level of importance for this citation. References with the
-            highest priority must have level 1 and references with lowest
-            priority must have level 3.
+        Adds a given reference to the internal database without blocking the
+        event loop. The arguments are those of cite.
 
-        note: str, default: None
-            A note that describes this citation.
-
-        doi: str, Optional, default: None
-            The digital object identifier if not provided in the raw
-            argument. If provided in raw, DOI in the doi argument will be used.
+        The citation is put on a queue drained by a single writer task, which
+        writes all the citations waiting on the queue in one transaction in
+        a worker thread.
 
         Returns
         -------
-        None
+        ret: int
+            The ID of the reference.
         """
 
         if alias is None or raw is None or module is None or note is None:
@@ -357,317 +713,1285 @@ class Reference_Handler(object):
                 'arguments'
             )
 
-        doi = self._extract_doi(raw, fmt)
-
-        reference_id = self._get_reference_id(raw=raw, alias=alias, doi=doi)
+        queue = self._async_queue()
+        future = self._aloop.create_future()
+        await queue.put(((raw, alias, module, note, level), fmt, future))
 
-        if reference_id is None:
-            self._create_citation(raw=raw, alias=alias, doi=doi)
-            reference_id = self.cur.lastrowid
-            self._create_context(
-                reference_id=reference_id,
-                module=module,
-                note=note,
-                level=level
-            )
-        else:
-            context_id = self._get_context_id(
-                reference_id=reference_id,
-                module=module,
-                note=note,
-                level=level
-            )
+        return await future
 
-            if context_id is None:
-                self._create_context(
-                    reference_id=reference_id,
-                    module=module,
-                    note=note,
-                    level=level
-                )
-            else:
-                self._update_counter(context_id=context_id)
+    async def aflush(self):
+        """
+        Waits until every citation queued by acite has been written to the
+        database, and flushes any buffered citations.
 
-        # Save the changes!
-        self.conn.commit()
+        Returns
+        -------
+        None
+        """
 
-        return reference_id
+        import asyncio
 
-    def _update_counter(self, context_id=None):
-        """
-        Updates the counter for given context
-        """
-        if context_id is None:
-            raise NameError("The context ID must be provided")
+        if self._aqueue is not None and (
+            self._aloop is asyncio.get_running_loop()
+        ):
+            await self._aqueue.join()
 
-        self.cur.execute(
-            "UPDATE context SET count = count + 1 WHERE id=?;", (context_id,)
-        )
+        await self._run_async(self.flush)
 
-    def _extract_doi(self, raw=None, fmt='bibtex'):
+    async def adump(self, outfile=None, fmt='bibtex', level=3):
         """
-        Parses DOI from bibliographic format
+        Dumps the database without blocking the event loop, once the
+        citations queued by acite have been written. The arguments and
+        return value are those of dump.
         """
 
-        if fmt not in supported_fmts:
-            raise NameError('Format %s not currently supported.' % (fmt))
+        await self.aflush()
 
-        if fmt == 'bibtex':
-            ret = bibtexparser.loads(raw)
-            ret = ret.entries[0]
-            if 'doi' in ret.keys():
-                return ret['doi']
+        return await self._run_async(
+            self.dump, outfile=outfile, fmt=fmt, level=level
+        )
 
-    def _initialize_tables(self):
+    async def aclose(self):
         """
-        Initializes the citation and context tables
+        Writes the queued citations, stops the writer task and closes the
+        database connection. Closing a closed handler does nothing.
+
+        Returns
+        -------
+        None
         """
 
-        self.cur.execute(
-            """CREATE TABLE IF NOT EXISTS "citation" (
-            "id"	INTEGER PRIMARY KEY AUTOINCREMENT,
-            "alias" TEXT NOT NULL UNIQUE,
-            "raw"	TEXT NOT NULL UNIQUE,
-            "doi"	TEXT UNIQUE
-            );
-            """
-        )
+        import asyncio
 
-        self.cur.execute(
-            "CREATE INDEX IF NOT EXISTS idx_raw on citation (raw);"
-        )
-        self.cur.execute(
-            "CREATE INDEX IF NOT EXISTS idx_alias on citation (alias);"
-        )
-        self.cur.execute(
-            "CREATE INDEX IF NOT EXISTS idx_doi on citation (doi);"
-        )
+        if self._closed:
+            return
 
-        self.cur.execute(
-            """
-            CREATE TABLE IF NOT EXISTS "context" (
-            "id"	INTEGER PRIMARY KEY AUTOINCREMENT,
-            "reference_id" INTEGER NOT NULL,
-            "module" TEXT NOT NULL,
-            "note" TEXT NOT NULL,
-            "count"	INTEGER NOT NULL,
-            "level" INTEGER NOT NULL,
-            FOREIGN KEY(reference_id) REFERENCES Citation(id)
-            );
-            """
-        )
+        await self.aflush()
 
-        self.cur.execute(
-            "CREATE INDEX IF NOT EXISTS idx_refid on context (reference_id);"
-        )
-        self.cur.execute(
-            "CREATE INDEX IF NOT EXISTS idx_module on context (module);"
-        )
-        self.cur.execute(
-            "CREATE INDEX IF NOT EXISTS idx_count on context (count);"
-        )
-        self.cur.execute(
-            "CREATE INDEX IF NOT EXISTS idx_level on context (level);"
-        )
+        if self._awriter is not None:
+            self._awriter.cancel()
+            try:
+                await self._awriter
+            except asyncio.CancelledError:
+                pass
+            self._awriter = None
 
-        self.conn.commit()
+        await self._run_async(self.close)
 
-    def _get_reference_id(self, raw=None, alias=None, doi=None):
+        if self._aexecutor is not None:
+            self._aexecutor.shutdown()
+            self._aexecutor = None
+
+    def _async_queue(self):
         """
-        Gets the ID of the given raw or doi if exists
+        Returns the queue of acite calls, starting the writer task for the
+        running event loop if needed.
         """
 
-        if raw is None:
-            if alias is None:
-                if doi is None:
-                    raise NameError(
-                        'Variables "raw" or "alias" or "DOI" must be input.'
-                    )
-                else:
-                    self.cur.execute(
-                        "SELECT id FROM citation WHERE doi=?;" (doi,)
-                    )
-            else:
-                self.cur.execute(
-                    "SELECT id FROM citation WHERE alias=?;" (alias,)
-                )
-        else:
-            self.cur.execute("SELECT id FROM citation WHERE raw=?;", (raw,))
-
-        ret = self.cur.fetchall()
-
-        if len(ret) == 0:
-            return None
+        import asyncio
 
-        return ret[0][0]
+        if self._closed:
+            raise ValueError('The handler is closed')
 
-    def _get_context_id(
-        self, reference_id=None, module=None, note=None, level=None
-    ):
-        """
-        Gets the ID of the context if exists. A context is specified by
-        (reference_id, module, note, level) combination
-        """
+        loop = asyncio.get_running_loop()
 
         if (
-            reference_id is None or module is None or note is None or
-            level is None
+            self._aloop is not loop or self._awriter is None or
+            self._awriter.done()
         ):
-            raise NameError(
-                'The variables "reference_id" and "module" and "note" and '
-                '"level" must be specified'
-            )
+            self._aloop = loop
+            self._aqueue = asyncio.Queue()
+            self._awriter = loop.create_task(self._async_writer())
 
-        self.cur.execute(
-            "SELECT id FROM context WHERE reference_id=? AND module=? AND "
-            "note=? AND level=?;", (reference_id, module, note, level)
-        )
+        return self._aqueue
 
-        ret = self.cur.fetchall()
+    async def _run_async(self, function, *args, **kwargs):
+        """Runs a blocking method in the thread used for the database."""
 
-        if len(ret) == 0:
-            return None
+        import asyncio
+        import concurrent.futures
 
-        return ret[0][0]
+        if self._aexecutor is None:
+            self._aexecutor = concurrent.futures.ThreadPoolExecutor(1)
 
-    def _create_citation(self, raw=None, alias=None, doi=None):
+        return await asyncio.get_running_loop().run_in_executor(
+            self._aexecutor, functools.partial(function, *args, **kwargs)
+        )
+
+    async def _async_writer(self):
         """
-        Adds a new record to the citation table using a raw reference text.
+        Drains the queue of acite calls, writing each batch with
+        _cite_batch, so that an error is only reported to the call that
+        caused it.
         """
 
-        if raw is None or alias is None:
-            raise NameError('The value for raw and alias must be provided')
-        else:
-            self.cur.execute(
-                "INSERT INTO citation (raw, alias, doi) VALUES (?, ?, ?);",
-                (raw, alias, doi)
-            )
+        queue = self._aqueue
 
-        self.conn.commit()
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < self.async_batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
 
-    def _create_context(
-        self, reference_id=None, module=None, note=None, level=None
+            try:
+                for fmt in {item[1] for item in batch}:
+                    items = [item for item in batch if item[1] == fmt]
+                    ids = await self._run_async(
+                        self._cite_batch, [item[0] for item in items], fmt
+                    )
+
+                    for item, reference_id in zip(items, ids):
+                        if item[2].done():
+                            continue
+                        if isinstance(reference_id, Exception):
+                            item[2].set_exception(reference_id)
+                        else:
+                            item[2].set_result(reference_id)
+            except Exception as e:
+                for item in batch:
+                    if not item[2].done():
+                        item[2].set_exception(e)
+            finally:
+                for item in batch:
+                    queue.task_done()
+
+    @_synchronized
+    def dump(
+        self, outfile=None, fmt='bibtex', level=3, collect=True, workers=None
     ):
         """
-        Adds a new record to the context table using the combination of the
-        provided arguments.
-        """
+        Retrieves the individual citations that were collected during the
+        execution of a program and tallies the number of times each citation
+        was referenced.
 
-        if reference_id is None:
-            raise NameError("Variables 'reference_id' or must be specified.")
+        Parameters
+        ----------
+        outfile: str, Optional, default: None
+            The file name where for the dump, if desired. The citations are
+            written as they are read from the database.
+
+        fmt: str, Optional, default: 'bibtex'
+            The format of the dump file, if desired.
+
+        level: int, Optional, default: None
+            Only those citations whose level at least the specified by level
+            will be output.
+
+        collect: bool, Optional, default: True
+            If False, the citations are only written to outfile and not
+            returned, so that memory use does not grow with the size of the
+            database.
+
+        workers: int, Optional, default: None
+            The number of processes formatting the citations in parallel
+            when fmt is 'text'. None formats them in this process.
+
+        Returns
+        -------
+        ret: list
+            A list whose elements are tuples containing pairs of raw citations
+            and their counts, or None if collect is False.
+        """
+
+        records = self.iter_dump(fmt=fmt, level=level, workers=workers)
+
+        # Only the BibTeX citations are written to a file
+        if outfile is None or fmt != 'bibtex':
+            return list(records) if collect else None
+
+        if type(outfile) is not str:
+            raise TypeError(
+                'The name of the output file must be a string but it '
+                'is %s' % type(outfile)
+            )
+
+        ret = [] if collect else None
+
+        with open(outfile, 'w') as f:
+            for item in records:
+                f.write('TOTAL_MENTIONS: %s \n' % str(item[2]))
+                f.write('LEVEL: %s \n' % str(item[3]))
+                f.write(item[1])
+                if collect:
+                    ret.append(item)
+
+        return ret
+
+    def iter_dump(self, fmt='bibtex', level=3, chunk_size=1000, workers=None):
+        """
+        Yields the citations of dump one at a time, reading them from the
+        database chunk_size at a time.
+
+        The lock of the handler is only held while a chunk is read and
+        formatted, so other threads may cite in between. While counts are
+        buffered in memory the citations have to be sorted in memory, so
+        call flush first to keep the memory use flat in buffered mode.
+
+        Parameters
+        ----------
+        fmt: str, Optional, default: 'bibtex'
+            The format of the citations, as in dump.
+
+        level: int, Optional, default: 3
+            Only those citations whose level at least the specified by level
+            will be output.
+
+        chunk_size: int, Optional, default: 1000
+            The number of citations read and formatted at a time.
+
+        workers: int, Optional, default: None
+            The number of processes formatting the chunks of citations in
+            parallel when fmt is 'text', while the next chunks are read. The
+            citations are still yielded in order. None formats them in this
+            process. The processes are spawned, so the class of the handler
+            must be importable, and a script using them must guard its code
+            with if __name__ == '__main__'. The format_* methods then run on
+            an instance of the class of the handler made without calling
+            __init__ in each process, so they must not depend on its
+            attributes.
+
+        Returns
+        -------
+        ret: generator
+            A generator of tuples (reference_id, citation, count, level).
+        """
+
+        if fmt not in supported_fmts:
+            raise NameError('Format %s not currently supported.' % (fmt))
+
+        if level not in range(1, 4) and level is not None:
+            raise ValueError(
+                'Invalid value for level. Please input a value in the range '
+                '[1,3]'
+            )
+
+        if chunk_size < 1:
+            raise ValueError('chunk_size must be a positive integer')
+
+        if workers is not None and workers < 1:
+            raise ValueError('workers must be a positive integer or None')
+
+        return self._iter_dump(fmt, level, chunk_size, workers)
+
+    def _iter_dump(self, fmt, level, chunk_size, workers):
+        """The generator of iter_dump, once its arguments are checked."""
 
-        self.cur.execute(
-            "INSERT INTO context (reference_id, module, note, count, level) "
-            "VALUES (?, ?, ?, ?, ?)", (reference_id, module, note, 1, level)
+        with self._lock:
+            # Counts buffered in memory are added to those in the database.
+            # The contexts of buffered citations exist with possibly zero
+            # counts, so their levels are taken from the buffer as well.
+            pending = self._pending_mentions(level)
+            levels = self._pending_levels(level)
+
+            # All the levels are included if none is given
+            if level is None:
+                level = 3
+
+            # The text is read from the render cache where it is current
+            version = self._render_version() if fmt == 'text' else None
+
+            query = self.backend.iter_mentions(
+                level, 0 if len(pending) > 0 else 1, chunk_size, version
+            )
+
+            if len(pending) > 0:
+                query = [
+                    (
+                        item[0], item[1], item[2] + pending.get(item[0], 0),
+                        min(item[3], levels.get(item[0], item[3]))
+                    ) + item[4:] for item in query
+                ]
+                query = [item for item in query if item[2] > 0]
+                query.sort(key=lambda item: item[2], reverse=True)
+                query = iter(query)
+
+        if fmt == 'text' and workers is not None:
+            yield from self._render_parallel(
+                query, version, chunk_size, workers
+            )
+            return
+
+        while True:
+            with self._lock:
+                chunk = list(itertools.islice(query, chunk_size))
+                if fmt == 'text':
+                    chunk = self._render_text(chunk, version)
+
+            if len(chunk) == 0:
+                break
+
+            yield from chunk
+
+    def _render_version(self):
+        """
+        Returns the version of the text formatting kept in the render cache,
+        which includes the class so that subclasses overriding the format_*
+        methods do not share the text of the base class.
+        """
+
+        cls = type(self)
+
+        return '%s.%s/%d' % (
+            cls.__module__, cls.__qualname__, cls.text_format_version
         )
 
-        self.conn.commit()
+    def _render_parallel(self, query, version, chunk_size, workers):
+        """
+        Yields the mentions from the query as plain text, formatting the
+        chunks without cached text in a pool of processes. Up to two chunks
+        per process are read ahead, and the chunks are yielded in order.
+
+        The processes are spawned rather than forked, since the lock of the
+        handler is held meanwhile and other threads, like the background
+        writer, may be running.
+        """
 
-    def total_mentions(self, reference_id=None, alias=None):
+        import concurrent.futures
+        import multiprocessing
+
+        in_flight = collections.deque()
+        done = False
+
+        with concurrent.futures.ProcessPoolExecutor(
+            workers, mp_context=multiprocessing.get_context('spawn')
+        ) as executor:
+            while True:
+                while not done and len(in_flight) <= 2 * workers:
+                    with self._lock:
+                        chunk = list(itertools.islice(query, chunk_size))
+                    if len(chunk) == 0:
+                        done = True
+                        break
+                    # Chunks whose text is all cached are not sent
+                    missing = [item for item in chunk if item[4] is None]
+                    future = None
+                    if len(missing) > 0:
+                        future = executor.submit(
+                            _format_texts, type(self), missing
+                        )
+                    in_flight.append((chunk, future))
+
+                if len(in_flight) == 0:
+                    break
+
+                chunk, future = in_flight.popleft()
+                formatted = [] if future is None else future.result()
+                with self._lock:
+                    chunk = self._render_text(chunk, version, formatted)
+
+                yield from chunk
+
+    def _render_text(self, chunk, version, formatted=None):
+        """
+        Returns the mentions in the chunk, with their cached text if any, as
+        plain text. The text of the others is formatted with _format_row,
+        unless its results are given in order in formatted, and added to the
+        render cache, along with the fields that had to be parsed. The caches
+        are only filled if the database can be written: if it is locked or
+        read-only, the text is returned all the same.
+        """
+
+        ret = []
+        renderings = []
+        parsed = []
+        if formatted is not None:
+            formatted = iter(formatted)
+
+        for item in chunk:
+            if item[4] is None:
+                if formatted is None:
+                    item, fields = self._format_row(item)
+                else:
+                    item, fields = next(formatted)
+                renderings.append((item[0], version, item[1]))
+                if fields is not None:
+                    parsed.append((item[0], fields))
+            else:
+                item = (item[0], item[4], item[2], item[3])
+            ret.append(item)
+
+        if len(renderings) > 0:
+            self.backend.cache_renderings(renderings, parsed)
+
+        return ret
+
+    def _format_row(self, item):
+        """
+        Formats a row (reference_id, raw, count, level, text, fields) of
+        iter_mentions without cached text. Returns the mentions as plain
+        text, and the fields parsed from the raw text if the row has none
+        stored, or None.
+        """
+
+        if item[5] is not None:
+            return self._format_text(item[:4], item[5]), None
+
+        fields = self._parse_bibtex(item[1])
+
+        return self._format_text(item[:4], fields), fields
+
+    def _format_text(self, item, fields=None):
+        """
+        Formats a tuple (reference_id, raw, count, level) of mentions as
+        plain text, from the fields of the raw text if given, or else from
+        the raw text itself.
+        """
+
+        if fields is None:
+            parse = self._parse_bibtex(item[1])
+        else:
+            parse = fields
+        entry_type = parse['ENTRYTYPE']
+        if entry_type == 'misc':
+            plain_text = self.format_misc(parse)
+        elif entry_type == 'article':
+            plain_text = self.format_article(parse)
+        elif entry_type == 'inbook':
+            plain_text = self.format_inbook(parse)
+        elif entry_type == 'phdthesis':
+            plain_text = self.format_phdthesis(parse)
+        else:
+            import pprint
+
+            plain_text = f"Do not have a handler for '{entry_type}':"
+            plain_text += '\n'
+            plain_text += pprint.pformat(parse)
+
+        plain_text = decode_latex(plain_text)
+        plain_text = self.decode_math_symbols(plain_text)
+
+        return (item[0], plain_text, item[2], item[3])
+
+    @staticmethod
+    def load_bibliography(bibfile=None, fmt='bibtex'):
+        """
+        Utility function to read a bibliographic file in common formats.
+        The current supported formats are BibTeX.
+
+        Parameters
+        ----------
+        bibfile: str, default: None
+            The file name for the bibliographic file.
+
+        fmt: str, Optional, default: 'bibtex'
+            The format of the bibliographic file, if desired.
+
+        Returns
+        -------
+        ret: dict
+            A dictionary whose keys are the identifiers used in the
+            bibliographic file (e.g. the first line in a BibTeX entry) and
+            values are the raw entries found in such file. Note that the values
+            of the dictionary might not be the exactly as found in the original
+            bibliographic file.
+        """
+
+        if bibfile is None:
+            raise FileNotFoundError('A bibliography file must be specified.')
+
+        if fmt not in supported_fmts:
+            raise NameError('Format %s not currently supported.' % (fmt))
+
+        import bibtexparser
+
+        with open(bibfile, 'r') as f:
+            parser = bibtexparser.bparser.BibTexParser(common_strings=True)
+            bibliography = bibtexparser.load(f, parser=parser).entries
+
+        ret = {k['ID']: {} for k in bibliography}
+
+        for entry in bibliography:
+            ret[entry['ID']] = entry_to_bibtex(entry)
+
+        return ret
+
+    def cite(
+        self,
+        raw=None,
+        alias=None,
+        module=None,
+        level=1,
+        note=None,
+        fmt='bibtex',
+        doi=None
+    ):
+        """
+        Adds a given reference to the internal database.
+
+        Parameters
+        ----------
+
+        alias: str, default: None
+            A string ID for the citation.
+
+        raw: str, default: None
+            The raw text for a given citation.
+
+        module: str, default: None
+            The module or function where this citation was called from
+
+        level: int, default: 1
+            The level of importance for this citation. References with the
+            highest priority must have level 1 and references with lowest
+            priority must have level 3.
+
+        note: str, default: None
+            A note that describes this citation.
+
+        doi: str, Optional, default: None
+            The digital object identifier if not provided in the raw
+            argument. If provided in raw, DOI in the doi argument will be used.
+
+        Returns
+        -------
+        ret: int
+            The ID of the reference, or None if the handler writes in the
+            background.
+        """
+
+        if alias is None or raw is None or module is None or note is None:
+            raise NameError(
+                'Need to provide the "alias", "raw", "module" and "note" '
+                'arguments'
+            )
+
+        if self._writer is not None:
+            self._enqueue((raw, alias, module, note, level), fmt)
+            return None
+
+        with self._lock:
+            return self._cite(raw, alias, module, note, level, fmt)
+
+    def _cite(self, raw, alias, module, note, level, fmt):
+        """
+        Adds a reference to the database, or to the buffer in buffered mode.
+        The caller must hold the lock.
+        """
+
+        key = (raw, alias, module, note, level)
+        cached = self._call_sites.get(key)
+
+        if self.buffered:
+            if cached is None:
+                reference_id = self._get_or_create_reference(raw, alias, fmt)
+                context_id = self._get_context_id(
+                    reference_id=reference_id,
+                    module=module,
+                    note=note,
+                    level=level
+                )
+                if context_id is None:
+                    # Create the context without counts, so that the counts
+                    # can be coalesced by its ID.
+                    context_id = self._create_context(
+                        reference_id=reference_id,
+                        module=module,
+                        note=note,
+                        level=level,
+                        count=0
+                    )
+                self.backend.commit()
+                self._call_sites.put(
+                    key, (reference_id, context_id, raw_digest(raw))
+                )
+            else:
+                reference_id, context_id, raw_hash = cached
+
+            if context_id in self._pending:
+                self._pending[context_id][0] += 1
+            else:
+                self._pending[context_id] = [1, reference_id, key, fmt]
+            self._n_pending += 1
+
+            if self._n_pending >= self.buffer_size or (
+                self.flush_interval is not None and
+                time.monotonic() - self._last_flush >= self.flush_interval
+            ):
+                self._flush_buffer()
+
+            return reference_id
+
+        if cached is not None:
+            reference_id, context_id, raw_hash = cached
+            if self._increment_context(
+                context_id, reference_id, module, note, level, raw_hash
+            ):
+                self.backend.commit()
+                return reference_id
+            # The context or its reference no longer exists, or the database
+            # has been replaced
+            self._call_sites.pop(key)
+
+        reference_id = self._get_or_create_reference(raw, alias, fmt)
+
+        self._count_context(
+            reference_id=reference_id, module=module, note=note, level=level
+        )
+        context_id = self._get_context_id(
+            reference_id=reference_id, module=module, note=note, level=level
+        )
+        self._call_sites.put(key, (reference_id, context_id, raw_digest(raw)))
+
+        # Save the changes!
+        self.backend.commit()
+
+        return reference_id
+
+    def _get_or_create_reference(self, raw, alias, fmt):
         """
-        Returns the number of times a given citation has been used.
+        Returns the ID of the reference with the given raw text, adding it to
+        the citation table if needed. Does not commit.
         """
+
+        fields = self._parse_fields(raw, fmt)
+        doi = None if fields is None else fields.get('doi')
+
+        reference_id = self._get_reference_id(raw=raw, alias=alias, doi=doi)
+
         if reference_id is None:
-            if alias is None:
+            self._create_citation(raw=raw, alias=alias, doi=doi)
+            reference_id = self._get_reference_id(raw=raw)
+            if fields is not None:
+                self.backend.add_fields([(reference_id, fields)])
+
+        return reference_id
+
+    def _increment_context(
+        self, context_id, reference_id, module, note, level, raw_hash
+    ):
+        """
+        Increments the counter of a context known by its ID, checking that
+        the row still holds that context and that its reference still has the
+        given digest of the raw text. Returns False, without changing
+        anything, if that is not the case.
+        """
+
+        return len(
+            self.backend.increment_contexts(
+                [(1, context_id, reference_id, module, note, level, raw_hash)]
+            )
+        ) == 0
+
+    @_synchronized
+    def invalidate_cache(self):
+        """
+        Forgets the reference and context IDs remembered from earlier calls
+        to cite. Rows deleted from the tables, and citations replaced by
+        others, as when the database file is restored from a backup, are
+        detected automatically, so this is rarely needed.
+
+        Returns
+        -------
+        None
+        """
+
+        self._call_sites.clear()
+
+    def _enqueue(self, citation, fmt):
+        """
+        Puts a citation on the queue of the background writer, applying the
+        backpressure policy if the queue is full.
+        """
+
+        if self.backpressure == 'block':
+            self._queue.put((citation, fmt))
+            return
+
+        try:
+            self._queue.put_nowait((citation, fmt))
+        except queue.Full:
+            with self._queue_lock:
+                if self.backpressure == 'drop':
+                    self.dropped += 1
+                    return
+                if self._spill_file is None:
+                    import tempfile
+
+                    self._spill_file = tempfile.TemporaryFile(
+                        'w+', prefix='reference_handler-', suffix='.spill'
+                    )
+                self._spill_file.write(json.dumps([citation, fmt]) + '\n')
+                self._n_spilled += 1
+
+    def _read_spill(self):
+        """Returns and removes the citations in the spill file."""
+
+        with self._queue_lock:
+            if self._n_spilled == 0:
+                return []
+            self._spill_file.seek(0)
+            lines = self._spill_file.readlines()
+            self._spill_file.seek(0)
+            self._spill_file.truncate()
+            self._n_spilled = 0
+
+        return [tuple(json.loads(line)) for line in lines]
+
+    def _background_writer(self):
+        """
+        Takes the citations off the queue and writes them in batches with
+        cite_many, which combines identical citations. Runs in its own
+        thread until close is called.
+        """
+
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.async_batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = _stop_marker in batch
+            items = [
+                item for item in batch
+                if item is not _stop_marker and item is not _spill_marker
+            ]
+            if self._n_spilled > 0:
+                items += self._read_spill()
+
+            for fmt in {item[1] for item in items}:
+                citations = [item[0] for item in items if item[1] == fmt]
+                results = self._cite_batch(citations, fmt)
+                for citation, result in zip(citations, results):
+                    if isinstance(result, Exception):
+                        self.background_errors.append((citation, result))
+
+            for item in batch:
+                self._queue.task_done()
+
+            if stop:
+                return
+
+    def _cite_batch(self, citations, fmt):
+        """
+        Writes citations with cite_many. If that fails the citations are
+        written one by one, so that only the failing ones are lost.
+
+        Returns
+        -------
+        ret: list
+            For each citation, the ID of its reference or the exception
+            raised when writing it.
+        """
+
+        try:
+            return self.cite_many(citations, fmt)
+        except Exception as e:
+            if len(citations) == 1:
+                return [e]
+
+        ret = []
+        for citation in citations:
+            try:
+                ret += self.cite_many([citation], fmt)
+            except Exception as e:
+                ret.append(e)
+
+        return ret
+
+    @_synchronized
+    def cite_many(self, citations, fmt='bibtex'):
+        """
+        Adds many references to the internal database in one transaction.
+
+        Equivalent to calling cite for each citation in turn, but the
+        citations are deduplicated first, the existing references are looked
+        up with a few set-based queries and the new rows and counts are
+        written with executemany.
+
+        Parameters
+        ----------
+        citations: iterable
+            Tuples (raw, alias, module, note, level) with the same meaning as
+            the arguments of cite.
+
+        fmt: str, Optional, default: 'bibtex'
+            The format of the raw citations.
+
+        Returns
+        -------
+        ret: list
+            The reference IDs of the citations, in input order.
+        """
+
+        if fmt not in supported_fmts:
+            raise NameError('Format %s not currently supported.' % (fmt))
+
+        citations = [tuple(citation) for citation in citations]
+        for raw, alias, module, note, level in citations:
+            if alias is None or raw is None or module is None or note is None:
                 raise NameError(
-                    "The 'reference_id' or 'alias' must be provided."
+                    'Need to provide the "alias", "raw", "module" and "note" '
+                    'arguments'
                 )
-            else:
-                self.cur.execute(
-                    """
-                    SELECT t1.alias, t2.counts
-                    FROM citation t1
-                    INNER JOIN (
-                        SELECT reference_id, SUM(count) AS counts FROM context
-                        GROUP BY reference_id
-                    ) t2
-                    ON t1.id = t2.reference_id
-                    WHERE alias = ?
-                """, (alias,)
+
+        keys = [raw_digest(citation[0]) for citation in citations]
+
+        try:
+            # Resolve the references, inserting the missing ones
+            reference_ids = self._get_reference_ids(set(keys))
+
+            new = {}
+            new_fields = {}
+            for key, (raw, alias, module, note, level) in zip(keys, citations):
+                if key not in reference_ids and key not in new:
+                    fields = self._parse_fields(raw, fmt)
+                    doi = None if fields is None else fields.get('doi')
+                    new[key] = (raw, key, alias, doi)
+                    if fields is not None:
+                        new_fields[key] = fields
+
+            if len(new) > 0:
+                self.backend.add_citations(new.values())
+                reference_ids.update(self._get_reference_ids(new.keys()))
+                self.backend.add_fields(
+                    [
+                        (reference_ids[key], fields)
+                        for key, fields in new_fields.items()
+                    ]
                 )
 
-        else:
-            self.cur.execute(
-                """
-                SELECT t1.id, t2.counts
-                FROM citation t1
-                INNER JOIN (
-                    SELECT reference_id, SUM(count) AS counts FROM context
-                    GROUP BY reference_id
-                ) t2
-                ON t1.id = t2.reference_id
-                WHERE id = ?
-            """, (reference_id,)
+            # Tally the contexts
+            counts = {}
+            for key, (raw, alias, module, note, level) in zip(keys, citations):
+                context = (reference_ids[key], module, note, level)
+                counts[context] = counts.get(context, 0) + 1
+
+            self.backend.add_counts(
+                [context + (count,) for context, count in counts.items()]
             )
+        except Exception:
+            self.backend.rollback()
+            raise
 
-        ret = self.cur.fetchall()
+        self.backend.commit()
 
-        if len(ret) == 0:
-            return 0
+        return [reference_ids[key] for key in keys]
+
+    @staticmethod
+    def shard_path(database):
+        """
+        Returns the name of the shard database of the current process for
+        the given database, which includes the host name and process ID.
+        """
 
-        return ret[0][1]
+        import socket
 
-    def total_citations(self, reference_id=None, alias=None):
+        return '%s.%s.%d.shard' % (database, socket.gethostname(), os.getpid())
+
+    @staticmethod
+    def find_shards(database):
         """
-        Returns the total number of citations in the citation table. If
-        reference is provided, returns the total number of citations for a
-        given reference ID.
+        Returns the names of all the shard databases of the given database.
         """
 
-        if reference_id is None:
-            if alias is None:
+        return sorted(glob.glob(glob.escape(database) + '.*.shard'))
 
-                self.cur.execute("SELECT COUNT(*) FROM citation")
-                ret = self.cur.fetchall()[0][0]
-                return ret
+    @_synchronized
+    def merge(self, shard_paths, workers=None, remove=False):
+        """
+        Folds shard databases into this database.
 
-            else:
-                self.cur.execute(
-                    "SELECT COUNT(*) FROM citation WHERE alias = ?", (alias,)
+        The shards are read in parallel and written in one transaction.
+        Citations are deduplicated by their raw text, then by DOI, then by
+        alias, and the counts of identical contexts are summed.
+
+        Parameters
+        ----------
+        shard_paths: iterable
+            The file names of the shard databases, e.g. from find_shards.
+
+        workers: int, Optional, default: None
+            The number of threads reading the shards. None lets
+            concurrent.futures choose.
+
+        remove: bool, Optional, default: False
+            If True, the shard files are deleted once they have been merged.
+
+        Returns
+        -------
+        None
+        """
+
+        import concurrent.futures
+
+        shard_paths = list(shard_paths)
+
+        with concurrent.futures.ThreadPoolExecutor(workers) as executor:
+            shards = list(executor.map(_read_shard, shard_paths))
+
+        # Combine the citations, each keyed by the digest of the first raw
+        # text seen for it.
+        citations = {}
+        by_key = {'raw_hash': {}, 'doi': {}, 'alias': {}}
+        counts = {}
+        for shard_citations, shard_contexts in shards:
+            ids = {}
+            for reference_id, raw, raw_hash, alias, doi in shard_citations:
+                for column, value in (
+                    ('raw_hash', raw_hash), ('doi', doi), ('alias', alias)
+                ):
+                    if value is not None and value in by_key[column]:
+                        key = by_key[column][value]
+                        break
+                else:
+                    key = raw_hash
+                    citations[key] = (raw, raw_hash, alias, doi)
+                for column, value in (
+                    ('raw_hash', raw_hash), ('doi', doi), ('alias', alias)
+                ):
+                    if value is not None:
+                        by_key[column].setdefault(value, key)
+                ids[reference_id] = key
+
+            for reference_id, module, note, level, count in shard_contexts:
+                context = (ids[reference_id], module, note, level)
+                counts[context] = counts.get(context, 0) + count
+
+        try:
+            # Match the citations to those already in this database
+            reference_ids = {}
+            for column, index in (('raw_hash', 1), ('doi', 3), ('alias', 2)):
+                values = {
+                    citation[index]: key
+                    for key, citation in citations.items()
+                    if key not in reference_ids and citation[index] is not None
+                }
+                found = self._get_reference_ids(values, column=column)
+                for value, reference_id in found.items():
+                    reference_ids[values[value]] = reference_id
+
+            new = [
+                citation for key, citation in citations.items()
+                if key not in reference_ids
+            ]
+            self.backend.add_citations(new)
+            reference_ids.update(
+                self._get_reference_ids([citation[1] for citation in new])
+            )
+
+            self.backend.add_counts(
+                [
+                    (reference_ids[key], module, note, level, count)
+                    for (key, module, note, level), count in counts.items()
+                ]
+            )
+        except Exception:
+            self.backend.rollback()
+            raise
+
+        self.backend.commit()
+
+        if remove:
+            for path in shard_paths:
+                os.remove(path)
+
+    @_synchronized
+    def compact(self, log_paths=None):
+        """
+        Folds the event logs written with the 'log' backend into this
+        database, so that dump and the totals include their citations. Only
+        the records appended since the last compaction are read.
+
+        Parameters
+        ----------
+        log_paths: iterable, Optional, default: None
+            The file names of the log segments. If None, all the logs of the
+            database, from LogBackend.find_logs, and what is kept of the
+            logs that have been removed is dropped from the database.
+
+        Returns
+        -------
+        ret: int
+            The number of records folded into the database.
+        """
+
+        if not isinstance(self.backend, SQLiteBackend):
+            raise ValueError('Logs can only be compacted into SQLite')
+
+        # The rows of the logs that have been removed are dropped, once all
+        # the logs of the database are known
+        if log_paths is None:
+            return self.backend.compact_logs(
+                LogBackend.find_logs(self.database), retire=True
+            )
+
+        return self.backend.compact_logs(log_paths)
+
+    def flush(self):
+        """
+        Makes sure that all citations made so far are in the database: waits
+        for the background writer, if any, then writes the citations
+        buffered in memory in a single transaction.
+
+        Returns
+        -------
+        None
+        """
+
+        self.join()
+        self._flush_buffer()
+
+    @_synchronized
+    def _flush_buffer(self):
+        """
+        Writes the counts buffered in memory to the database in a single
+        transaction. Does nothing if the handler is not buffered or the
+        buffer is empty.
+
+        The counts are coalesced by context, so this is one call to
+        increment_contexts of the backend. If some of the contexts or their
+        references have been deleted since they were cached, those counts are
+        written as new citations instead. If that fails, nothing is written
+        and the counts stay buffered.
+        """
+
+        self._last_flush = time.monotonic()
+
+        if len(self._pending) == 0:
+            return
+
+        try:
+            failed = self.backend.increment_contexts(
+                [
+                    (count, context_id, reference_id) + key[2:] +
+                    (raw_digest(key[0]),)
+                    for context_id, (count, reference_id, key,
+                                     fmt) in self._pending.items()
+                ]
+            )
+
+            if len(failed) > 0:
+                self._call_sites.clear()
+                for row in failed:
+                    count, reference_id, key, fmt = self._pending[row[1]]
+                    raw, alias, module, note, level = key
+                    reference_id = self._get_or_create_reference(
+                        raw, alias, fmt
+                    )
+                    self._count_context(
+                        reference_id=reference_id,
+                        module=module,
+                        note=note,
+                        level=level,
+                        count=count
+                    )
+        except Exception:
+            self.backend.rollback()
+            raise
+
+        self.backend.commit()
+
+        self._pending = {}
+        self._n_pending = 0
+
+    def _pending_mentions(self, level=None):
+        """
+        Returns the counts buffered in memory for each reference ID, for the
+        contexts whose level is at most the given level.
+        """
+
+        ret = {}
+        for count, reference_id, key, fmt in self._pending.values():
+            if level is None or key[4] <= level:
+                ret[reference_id] = ret.get(reference_id, 0) + count
+
+        return ret
+
+    def _pending_levels(self, level=None):
+        """
+        Returns the lowest level, but at least 1, of the contexts buffered in
+        memory for each reference ID, among those whose level is at most the
+        given level.
+        """
+
+        ret = {}
+        for count, reference_id, key, fmt in self._pending.values():
+            if level is None or key[4] <= level:
+                ret[reference_id] = min(
+                    ret.get(reference_id, key[4]), max(key[4], 1)
                 )
 
-        else:
+        return ret
 
-            self.cur.execute(
-                "SELECT COUNT(*) FROM citation WHERE id=?;", (reference_id,)
+    def _count_context(
+        self, reference_id=None, module=None, note=None, level=None, count=1
+    ):
+        """
+        Adds to the counter of the context given by the combination of the
+        arguments, creating the context if it does not exist, with a single
+        statement.
+        """
+
+        if (
+            reference_id is None or module is None or note is None or
+            level is None
+        ):
+            raise NameError(
+                'The variables "reference_id" and "module" and "note" and '
+                '"level" must be specified'
             )
 
-        ret = self.cur.fetchall()
+        self.backend.add_counts([(reference_id, module, note, level, count)])
 
-        if len(ret) == 0:
-            return 0
+    def _extract_doi(self, raw=None, fmt='bibtex'):
+        """
+        Parses DOI from bibliographic format
+        """
 
-        return ret[0][0]
+        ret = self._parse_fields(raw, fmt)
+        if ret is not None and 'doi' in ret.keys():
+            return ret['doi']
 
-    def total_contexts(self, reference_id=None, alias=None):
+    def _parse_fields(self, raw=None, fmt='bibtex'):
         """
-        Returns the total number of contexts for a given reference ID.
+        Returns the fields parsed from a raw citation in a bibliographic
+        format, which are stored with new citations so that dump need not
+        parse the raw text again, or None if the format has no fields.
         """
 
-        if reference_id is None:
+        if fmt not in supported_fmts:
+            raise NameError('Format %s not currently supported.' % (fmt))
+
+        if fmt == 'bibtex':
+            return self._parse_bibtex(raw)
+
+    def _parse_bibtex(self, raw):
+        """
+        Returns the fields of the first entry in a raw BibTeX text, using the
+        parse cache. The returned dictionary is shared and must not be
+        modified.
+        """
+
+        key = raw_digest(raw)
+        ret = self.parse_cache.get(key)
+
+        if ret is None:
+            import bibtexparser
+
+            ret = bibtexparser.loads(raw).entries[0]
+            self.parse_cache.put(key, ret)
+
+        return ret
+
+    def _get_reference_id(self, raw=None, alias=None, doi=None):
+        """
+        Gets the ID of the given raw or doi if exists
+        """
+
+        if raw is None:
             if alias is None:
-                raise NameError(
-                    "Variables 'reference_id' or 'alias' must be specified."
-                )
+                if doi is None:
+                    raise NameError(
+                        'Variables "raw" or "alias" or "DOI" must be input.'
+                    )
+                else:
+                    key, column = doi, 'doi'
             else:
-                self.cur.execute(
-                    """
-                    SELECT COUNT(*)
-                    FROM citation
-                    INNER JOIN (
-                        SELECT id, reference_id FROM context
-                    ) t2
-                    ON citation.id = t2.reference_id WHERE alias=?
-                """, (alias,)
-                )
+                key, column = alias, 'alias'
+        else:
+            key, column = raw_digest(raw), 'raw_hash'
+
+        return self.backend.get_reference_ids([key], column=column).get(key)
+
+    def _get_reference_ids(self, keys, column='raw_hash'):
+        """
+        Returns a dictionary of the IDs of the references with the given
+        digests of their raw text, for those that exist. The references can
+        also be looked up by their 'alias' or 'doi' column.
+        """
+
+        return self.backend.get_reference_ids(keys, column=column)
+
+    def _get_context_id(
+        self, reference_id=None, module=None, note=None, level=None
+    ):
+        """
+        Gets the ID of the context if exists. A context is specified by
+        (reference_id, module, note, level) combination
+        """
+
+        if (
+            reference_id is None or module is None or note is None or
+            level is None
+        ):
+            raise NameError(
+                'The variables "reference_id" and "module" and "note" and '
+                '"level" must be specified'
+            )
+
+        return self.backend.get_context_id(reference_id, module, note, level)
 
+    def _create_citation(self, raw=None, alias=None, doi=None):
+        """
+        Adds a new record to the citation table using a raw reference text.
+        """
+
+        if raw is None or alias is None:
+            raise NameError('The value for raw and alias must be provided')
         else:
-            self.cur.execute(
-                "SELECT COUNT(*) FROM context WHERE reference_id = ?;",
-                (reference_id,)
+            self.backend.add_citations([(raw, raw_digest(raw), alias, doi)])
+
+    def _create_context(
+        self, reference_id=None, module=None, note=None, level=None, count=1
+    ):
+        """
+        Adds a new record to the context table using the combination of the
+        provided arguments, and returns its ID.
+        """
+
+        if reference_id is None:
+            raise NameError("Variables 'reference_id' or must be specified.")
+
+        return self.backend.add_context(
+            reference_id, module, note, level, count=count
+        )
+
+    @_synchronized
+    def total_mentions(self, reference_id=None, alias=None):
+        """
+        Returns the number of times a given citation has been used,
+        including the uses buffered in memory.
+        """
+
+        if reference_id is None and alias is None:
+            raise NameError("The 'reference_id' or 'alias' must be provided.")
+
+        ret = self.backend.total_mentions(
+            reference_id=reference_id, alias=alias
+        )
+
+        if ret is None:
+            return 0
+
+        return ret[1] + self._pending_mentions().get(ret[0], 0)
+
+    @_synchronized
+    def total_citations(self, reference_id=None, alias=None):
+        """
+        Returns the total number of citations in the citation table. If
+        reference is provided, returns the total number of citations for a
+        given reference ID.
+        """
+
+        return self.backend.total_citations(
+            reference_id=reference_id, alias=alias
+        )
+
+    @_synchronized
+    def total_contexts(self, reference_id=None, alias=None):
+        """
+        Returns the total number of contexts for a given reference ID.
+        """
+
+        if reference_id is None and alias is None:
+            raise NameError(
+                "Variables 'reference_id' or 'alias' must be specified."
             )
 
-        return self.cur.fetchall()[0][0]
+        return self.backend.total_contexts(
+            reference_id=reference_id, alias=alias
+        )
 
     def __str__(self):
         pass
@@ -812,9 +2136,10 @@ class Reference_Handler(object):
 
     def decode_math_symbols(self, text):
         """Clean up math symbols such as subscripts."""
-        text = greek_symbol_re.sub(self._decode_greek_symbol, text)
-        text = superscript_re.sub(self._decode_superscript, text)
-        return subscript_re.sub(self._decode_subscript, text)
+        res = _math_symbol_res()
+        text = res['greek_symbol_re'].sub(self._decode_greek_symbol, text)
+        text = res['superscript_re'].sub(self._decode_superscript, text)
+        return res['subscript_re'].sub(self._decode_subscript, text)
 
     def _decode_subscript(self, match):
         result = ''
@@ -0,0 +1,412 @@
+"""
+Conformance tests run against every storage backend of reference_handler.
+"""
+
+# Import package, test suite, and other packages as needed
+import os
+import reference_handler
+import pytest
+import sqlite3
+from reference_handler.reference_handler import storage_backends
+from . import build_filenames
+
+first = (
+    '@article{first, title = {First}, doi = {10.1/first}}', 'hash1', 'first',
+    '10.1/first'
+)
+second = ('@article{second, title = {Second}}', 'hash2', 'second', None)
+third = ('@article{third, title = {Third}}', 'hash3', 'third', None)
+
+
+def _remove_backend_files(path):
+    """Removes the scratch file of a backend and its logs."""
+    if os.path.exists(path):
+        os.remove(path)
+    for segment in reference_handler.LogBackend.find_logs(path):
+        os.remove(segment)
+
+
+def _backend_path(name):
+    """The scratch file of a backend, removed with its logs if it exists."""
+    path = build_filenames.build_scratch_filename('backend.%s' % name)
+    _remove_backend_files(path)
+
+    return path
+
+
+@pytest.fixture(autouse=True)
+def _remove_scratch():
+    """Removes the files of the backends, whose logs are named by PID."""
+    yield
+    for name in storage_backends:
+        _remove_backend_files(
+            build_filenames.build_scratch_filename('backend.%s' % name)
+        )
+
+
+def _open_backend(name, path):
+    """Boiler plate"""
+    if name == 'sqlite':
+        return reference_handler.SQLiteBackend(path)
+    elif name == 'log':
+        return reference_handler.LogBackend(path)
+
+    return reference_handler.MemoryBackend()
+
+
+@pytest.fixture(params=storage_backends)
+def backend(request):
+    ret = _open_backend(request.param, _backend_path(request.param))
+    yield ret
+    ret.close()
+
+
+def test_add_citations(backend):
+
+    backend.add_citations([first, second])
+    backend.commit()
+
+    assert backend.get_reference_ids(['hash1', 'hash2', 'hash3']) == {
+        'hash1': 1,
+        'hash2': 2
+    }
+    assert backend.get_reference_ids(['second'], column='alias') == {
+        'second': 2
+    }
+    assert backend.get_reference_ids(['10.1/first'], column='doi') == {
+        '10.1/first': 1
+    }
+    assert backend.total_citations() == 2
+    assert backend.total_citations(reference_id=2) == 1
+    assert backend.total_citations(alias='third') == 0
+
+
+@pytest.mark.parametrize(
+    'citation', [
+        ('@article{other}', 'hash1', 'other', None),
+        ('@article{other}', 'other', 'first', None),
+        ('@article{other}', 'other', 'other', '10.1/first'),
+    ]
+)
+def test_add_citations_unique(backend, citation):
+
+    backend.add_citations([first])
+
+    with pytest.raises(sqlite3.IntegrityError):
+        backend.add_citations([citation])
+
+
+def test_lookup_column_exception(backend):
+
+    with pytest.raises(NameError):
+        backend.get_reference_ids(['first'], column='raw')
+
+
+def test_contexts(backend):
+
+    backend.add_citations([first, second])
+    context_id = backend.add_context(1, 'LAMMPS', 'Context 1', 1)
+
+    assert backend.get_context_id(1, 'LAMMPS', 'Context 1', 1) == context_id
+    assert backend.get_context_id(1, 'LAMMPS', 'Context 1', 2) is None
+
+    with pytest.raises(sqlite3.IntegrityError):
+        backend.add_context(1, 'LAMMPS', 'Context 1', 1)
+
+    backend.add_counts(
+        [(1, 'LAMMPS', 'Context 1', 1, 2), (1, 'LAMMPS', 'Context 2', 2, 3)]
+    )
+    backend.add_counts([(1, 'LAMMPS', 'Context 1', 1, 1)])
+    backend.commit()
+
+    assert backend.total_mentions(reference_id=1) == (1, 6)
+    assert backend.total_mentions(alias='first') == (1, 6)
+    assert backend.total_mentions(reference_id=2) is None
+    assert backend.total_contexts(reference_id=1) == 2
+    assert backend.total_contexts(alias='first') == 2
+    assert backend.total_contexts(alias='second') == 0
+
+
+def test_increment_contexts(backend):
+
+    backend.add_citations([first])
+    context_id = backend.add_context(1, 'LAMMPS', 'Context 1', 1)
+
+    stale = [
+        (1, context_id, 1, 'LAMMPS', 'Context 2', 1, 'hash1'),
+        (1, context_id + 1, 1, 'LAMMPS', 'Context 1', 1, 'hash1'),
+        (1, context_id, 2, 'LAMMPS', 'Context 1', 1, 'hash1'),
+        (1, context_id, 1, 'LAMMPS', 'Context 1', 1, 'hash2'),
+    ]
+    rows = [(4, context_id, 1, 'LAMMPS', 'Context 1', 1, 'hash1')] + stale
+
+    assert backend.increment_contexts(rows) == stale
+    backend.commit()
+
+    assert backend.total_mentions(reference_id=1) == (1, 4)
+
+
+def test_mentions(backend):
+
+    backend.add_citations([first, second, third])
+    backend.add_counts(
+        [
+            (1, 'LAMMPS', 'Context 1', 3, 5),
+            (2, 'NAMD', 'Context 1', 1, 2),
+            (2, 'NAMD', 'Context 2', 2, 1),
+            (3, 'VMD', 'Context 1', 1, 0),
+        ]
+    )
+    backend.commit()
+
+    assert [item[:3] for item in backend.mentions(3)] == [
+        (1, first[0], 5), (2, second[0], 3)
+    ]
+    assert [item[:3] for item in backend.mentions(1)] == [(2, second[0], 2)]
+    assert [item[0] for item in backend.mentions(1, minimum=0)] == [2, 3]
+
+
+def test_mentions_level(backend):
+
+    backend.add_citations([first, second, third])
+    backend.add_counts(
+        [
+            (1, 'LAMMPS', 'Context 1', 3, 5),
+            (1, 'LAMMPS', 'Context 2', 2, 1),
+            (2, 'NAMD', 'Context 1', 1, 0),
+            (2, 'NAMD', 'Context 2', 3, 2),
+            (3, 'VMD', 'Context 1', 2, 0),
+        ]
+    )
+    backend.commit()
+
+    assert backend.mentions(3, minimum=0) == [
+        (1, first[0], 6, 2), (2, second[0], 2, 3), (3, third[0], 0, 3)
+    ]
+    # The citations with the same count come in any order
+    assert sorted(backend.mentions(2, minimum=0)) == [
+        (1, first[0], 1, 2), (2, second[0], 0, 2), (3, third[0], 0, 2)
+    ]
+    assert backend.mentions(5) == [(1, first[0], 6, 2), (2, second[0], 2, 3)]
+
+
+def test_citation_totals():
+
+    path = _backend_path('sqlite')
+    backend = reference_handler.SQLiteBackend(path)
+    backend.add_citations([first, second, third])
+    backend.add_counts(
+        [
+            (1, 'LAMMPS', 'Context 1', 1, 5),
+            (1, 'LAMMPS', 'Context 2', 2, 1),
+            (2, 'NAMD', 'Context 1', 3, 2),
+        ]
+    )
+    context_id = backend.get_context_id(1, 'LAMMPS', 'Context 2', 2)
+    backend.increment_contexts(
+        [(3, context_id, 1, 'LAMMPS', 'Context 2', 2, 'hash1')]
+    )
+    backend.add_counts([(2, 'NAMD', 'Context 1', 3, 1)])
+    backend.commit()
+
+    # Rows moved to another citation or level, and deleted
+    backend.cur.execute(
+        "UPDATE context SET reference_id = 3, level = 1 WHERE module = 'NAMD'"
+    )
+    backend.cur.execute("DELETE FROM context WHERE note = 'Context 1'")
+    backend.add_counts([(2, 'NAMD', 'Context 3', 2, 7)])
+    backend.commit()
+
+    query = (
+        "SELECT reference_id, SUM(count), COUNT(*), "
+        "SUM(CASE WHEN level <= 1 THEN count ELSE 0 END), SUM(level <= 1), "
+        "SUM(CASE WHEN level <= 2 THEN count ELSE 0 END), SUM(level <= 2), "
+        "SUM(CASE WHEN level <= 3 THEN count ELSE 0 END), SUM(level <= 3) "
+        "FROM context GROUP BY reference_id"
+    )
+    totals = backend.cur.execute(query).fetchall()
+    assert totals == [(1, 4, 1, 0, 0, 4, 1, 4, 1), (2, 7, 1, 0, 0, 7, 1, 7, 1)]
+    assert backend.cur.execute(
+        "SELECT * FROM citation_totals WHERE n_contexts > 0"
+    ).fetchall() == totals
+    assert backend.total_mentions(reference_id=3) is None
+    backend.close()
+
+    # Databases from before the table was added are filled when upgraded
+    conn = sqlite3.connect(path)
+    conn.execute("DROP TABLE citation_totals")
+    conn.execute("PRAGMA user_version = 4")
+    conn.commit()
+    conn.close()
+
+    backend = reference_handler.SQLiteBackend(path)
+    backend.cur.execute("SELECT * FROM citation_totals")
+    assert backend.cur.fetchall() == totals
+    backend.close()
+
+
+def test_log_identity_migration():
+
+    path = _backend_path('sqlite')
+    backend = reference_handler.SQLiteBackend(path)
+    backend.close()
+
+    # The segments compacted before logs had an identity
+    conn = sqlite3.connect(path)
+    conn.execute("DROP TABLE log_segment")
+    conn.execute("CREATE TABLE log_segment (name TEXT PRIMARY KEY, offset)")
+    conn.execute("INSERT INTO log_segment VALUES ('db.host.1.000000.log', 9)")
+    conn.execute("PRAGMA user_version = 7")
+    conn.commit()
+    conn.close()
+
+    backend = reference_handler.SQLiteBackend(path)
+    backend.cur.execute("SELECT name, offset, log FROM log_segment")
+    assert backend.cur.fetchall() == [('db.host.1.000000.log', 9, 'db.host.1')]
+    backend.close()
+
+
+def test_renderings(backend):
+
+    backend.add_citations([first, second, third])
+    backend.add_counts(
+        [(1, 'LAMMPS', 'Context 1', 1, 2), (2, 'NAMD', 'Context 1', 1, 1)]
+    )
+    backend.add_renderings([(1, 'v1', 'First'), (2, 'v2', 'Second')])
+    backend.commit()
+
+    assert backend.get_renderings([1, 2, 3], 'v1') == {1: 'First'}
+    assert list(backend.iter_mentions(1, version='v1')) == [
+        (1, first[0], 2, 1, 'First', None), (2, second[0], 1, 1, None, None)
+    ]
+    assert list(backend.iter_mentions(1, chunk_size=1)) == backend.mentions(1)
+
+
+def test_fields(backend):
+
+    backend.add_citations([first, second, third])
+    backend.add_counts(
+        [(1, 'LAMMPS', 'Context 1', 1, 2), (2, 'NAMD', 'Context 1', 1, 1)]
+    )
+    fields = {'ENTRYTYPE': 'article', 'ID': 'first', 'title': 'First'}
+    backend.add_fields([(1, fields), (2, {'title': 'Second'})])
+    backend.add_renderings([(2, 'v1', 'Second')])
+    backend.commit()
+
+    assert backend.get_fields([1, 2, 3]) == {1: fields, 2: {'title': 'Second'}}
+    # The fields are only given with the citations without text
+    assert list(backend.iter_mentions(1, version='v1')) == [
+        (1, first[0], 2, 1, None, fields),
+        (2, second[0], 1, 1, 'Second', None)
+    ]
+
+
+def test_rollback(backend):
+
+    backend.add_citations([first])
+    backend.add_counts([(1, 'LAMMPS', 'Context 1', 1, 1)])
+    backend.commit()
+
+    backend.add_citations([second])
+    backend.add_counts(
+        [(1, 'LAMMPS', 'Context 1', 1, 1), (2, 'NAMD', 'Context 1', 1, 1)]
+    )
+    backend.rollback()
+
+    assert backend.get_reference_ids(['hash2']) == {}
+    assert backend.total_citations() == 1
+    assert backend.total_mentions(reference_id=1) == (1, 1)
+    assert backend.get_context_id(2, 'NAMD', 'Context 1', 1) is None
+
+    backend.add_citations([third])
+    backend.commit()
+
+    assert backend.get_reference_ids(['hash3']) == {'hash3': 2}
+
+
+@pytest.mark.parametrize('name', ['sqlite', 'log'])
+def test_reopen(name):
+
+    path = _backend_path(name)
+    backend = _open_backend(name, path)
+    backend.add_citations([first, second])
+    backend.add_counts([(2, 'NAMD', 'Context 1', 1, 2)])
+    backend.commit()
+    backend.add_counts([(1, 'LAMMPS', 'Context 1', 1, 7)])
+    backend.rollback()
+    backend.close()
+
+    backend = _open_backend(name, path)
+
+    assert backend.get_reference_ids(['hash1', 'hash2']) == {
+        'hash1': 1,
+        'hash2': 2
+    }
+    assert backend.total_mentions(reference_id=2) == (2, 2)
+    assert backend.total_mentions(reference_id=1) is None
+    backend.close()
+
+
+def test_log_truncated_tail():
+
+    path = _backend_path('log')
+    backend = reference_handler.LogBackend(path)
+    backend.add_citations([first])
+    backend.add_counts([(1, 'LAMMPS', 'Context 1', 1, 2)])
+    backend.commit()
+    backend.add_counts([(1, 'LAMMPS', 'Context 1', 1, 5)])
+    backend.close()
+
+    # A write cut short by a crash
+    segment, = reference_handler.LogBackend.find_logs(path)
+    size = os.path.getsize(segment)
+    os.truncate(segment, size - 3)
+
+    backend = reference_handler.LogBackend(path)
+    assert backend.total_mentions(reference_id=1) == (1, 2)
+    backend.add_counts([(1, 'LAMMPS', 'Context 1', 1, 1)])
+    backend.close()
+
+    backend = reference_handler.LogBackend(path)
+    assert backend.total_mentions(reference_id=1) == (1, 3)
+    backend.close()
+
+
+@pytest.mark.parametrize('buffered', [False, True])
+@pytest.mark.parametrize('name', storage_backends)
+def test_handler(name, buffered):
+
+    rf = reference_handler.Reference_Handler(
+        _backend_path(name), backend=name, buffered=buffered
+    )
+
+    for i in range(3):
+        rf.cite(
+            raw=first[0], alias='first', module='LAMMPS', level=1, note='A'
+        )
+    rf.cite(raw=second[0], alias='second', module='NAMD', level=2, note='A')
+    assert rf.cite_many(
+        [(second[0], 'second', 'NAMD', 'A', 1)] * 4 +
+        [(third[0], 'third', 'VMD', 'A', 3)]
+    ) == [2, 2, 2, 2, 3]
+
+    assert rf.total_mentions(alias='first') == 3
+    assert rf.total_mentions(reference_id=2) == 5
+    assert rf.total_contexts(reference_id=2) == 2
+    assert rf.total_citations() == 3
+    assert [(item[0], item[2]) for item in rf.dump(level=2)] == [
+        (2, 5), (1, 3)
+    ]
+    rf.close()
+
+
+def test_handler_backend_exception():
+
+    with pytest.raises(ValueError):
+        reference_handler.Reference_Handler('database.db', backend='redis')
+
+    with pytest.raises(NameError):
+        reference_handler.Reference_Handler(backend='sqlite')
+
+    with pytest.raises(TypeError):
+        reference_handler.Reference_Handler(backend=object())
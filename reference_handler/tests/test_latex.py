@@ -383,3 +383,50 @@ def test_latex_dashes():
     check = encode_latex(result)
 
     assert (result == answer and check == text)
+
+
+def test_latex_generated_tables():
+    """The generated tables are those built from the dictionaries"""
+    from reference_handler import _latex_tables, latex_utf8
+    from reference_handler.reference_handler import _math_symbol_patterns
+
+    patterns = latex_utf8._construct_patterns()
+    patterns.update(_math_symbol_patterns())
+
+    encoding = latex_utf8._construct_encoding()
+
+    assert list(_latex_tables.encoding.items()) == list(encoding.items())
+    assert _latex_tables.patterns == patterns
+    assert latex_utf8.encoding is _latex_tables.encoding
+    assert latex_utf8.accent_re.pattern == patterns['accent_re']
+
+
+def _decode_latex_passes(text):
+    """decode_latex as the four passes of the separate regexps"""
+    from reference_handler import latex_utf8
+
+    text = latex_utf8.dash_re.sub(latex_utf8._decode_latex_dash, text)
+    text = latex_utf8.symbol_re.sub(latex_utf8._decode_latex_symbol, text)
+    text = latex_utf8.accent_re.sub(latex_utf8._decode_latex_accent, text)
+
+    return latex_utf8.brace_re.sub(r'\1', text)
+
+
+def test_latex_decode_fuzz():
+    """decode_latex gives the result of the four separate passes"""
+    import random
+
+    rng = random.Random(1)
+    pieces = [
+        '\\', '{', '}', '-', '--', '"', "'", '^', 'a', 'b', 'i', 'j', 'l', 'O',
+        'u', 'v', 'Z', 'ı', ' ', '\n', r'\"{a}', r'\v{\i}', r'{\o}', '$'
+    ]
+
+    for i in range(20000):
+        text = ''.join(rng.choices(pieces, k=rng.randrange(30)))
+        assert decode_latex(text) == _decode_latex_passes(text), text
+
+    # The LaTeX of this file, which has every accent
+    with open(__file__, encoding='utf-8') as f:
+        text = f.read() * 10
+    assert decode_latex(text) == _decode_latex_passes(text)
@@ -3,10 +3,16 @@ Unit and regression test for the reference_handler package.
 """
 
 # Import package, test suite, and other packages as needed
+import asyncio
+import concurrent.futures
 import os
 import reference_handler
 import pytest
+import sqlite3
+import subprocess
 import sys
+import threading
+import time
 from . import build_filenames
 
 lammps_citation = """
@@ -43,17 +49,29 @@ namd_citation = """
 """  # noqa: E501
 
 
-def _create_db(database_name):
+def _create_db(database_name, **kwargs):
     """Boiler plate"""
     database = build_filenames.build_scratch_filename(database_name)
 
-    if os.path.exists(database):
-        os.remove(database)
+    # A journal left by a handler of an earlier test would be rolled back
+    # into the new database
+    for path in (database, database + '-journal', database + '-wal'):
+        if os.path.exists(path):
+            os.remove(path)
 
     # Make in memory to avoid issues testing on Windows, where the file is
     # not immediately release.
     # database = "file:reference_db?mode=memory&cache=shared"
-    return reference_handler.Reference_Handler(database)
+    return reference_handler.Reference_Handler(database, **kwargs)
+
+
+def _count_on_disk(database_name):
+    """Sum of the context counts as seen by a separate connection."""
+    database = build_filenames.build_scratch_filename(database_name)
+    conn = sqlite3.connect(database)
+    ret = conn.execute("SELECT TOTAL(count) FROM context").fetchone()[0]
+    conn.close()
+    return int(ret)
 
 
 def test_reference_handler_imported():
@@ -352,6 +370,253 @@ def test_dump_output():
     assert os.path.exists(outfile) is True
 
 
+@pytest.mark.parametrize('buffered', [False, True])
+@pytest.mark.parametrize('fmt', ['bibtex', 'text'])
+def test_iter_dump(fmt, buffered):
+
+    rf = _create_db('database.db', buffered=buffered)
+    for i in range(25):
+        for j in range(i % 4 + 1):
+            rf.cite(
+                raw='@misc{Paper%d, title = {Paper %d}}' % (i, i),
+                alias='paper_%d' % i,
+                module='Code',
+                level=1 + i % 3,
+                note='Context %d' % j
+            )
+
+    dump = rf.dump(fmt=fmt, level=2)
+    records = rf.iter_dump(fmt=fmt, level=2, chunk_size=3)
+
+    # The lock is not held between chunks
+    streamed = [next(records)]
+    rf.cite(
+        raw='@misc{Other, title = {Other}}',
+        alias='other',
+        module='Code',
+        note='A'
+    )
+    streamed += list(records)
+
+    assert streamed == dump
+    assert len(dump) == 17
+    counts = [item[2] for item in dump]
+    assert counts == sorted(counts, reverse=True)
+
+
+def test_dump_not_collected():
+
+    rf = _create_db('database.db')
+    for i in range(5):
+        for j in range(i + 1):
+            rf.cite(
+                raw='@misc{Paper%d, title = {Paper %d}}' % (i, i),
+                alias='paper_%d' % i,
+                module='Code',
+                note='Context %d' % j
+            )
+
+    collected = build_filenames.build_scratch_filename('collected.bib')
+    streamed = build_filenames.build_scratch_filename('streamed.bib')
+
+    assert len(rf.dump(outfile=collected)) == 5
+    assert rf.dump(outfile=streamed, collect=False) is None
+    with open(collected) as f, open(streamed) as g:
+        assert f.read() == g.read()
+
+
+def test_iter_dump_exception():
+
+    rf = _create_db('database.db')
+
+    with pytest.raises(NameError):
+        rf.iter_dump(fmt='rtf')
+
+    with pytest.raises(ValueError):
+        rf.iter_dump(level=4)
+
+    with pytest.raises(ValueError):
+        rf.iter_dump(chunk_size=0)
+
+
+class _FormatCounter(reference_handler.Reference_Handler):
+    formatted = 0
+
+    def _format_text(self, item, fields=None):
+        type(self).formatted += 1
+        return super()._format_text(item, fields)
+
+
+def test_render_cache():
+
+    rf = _create_db('database.db')
+    for i in range(3):
+        rf.cite(
+            raw='@misc{Paper%d, title = {Paper %d}}' % (i, i),
+            alias='paper_%d' % i,
+            module='Code',
+            note='Context 1'
+        )
+    database = rf.database
+    rf.close()
+
+    rf = _FormatCounter(database)
+    dump = rf.dump(fmt='text')
+    assert _FormatCounter.formatted == 3
+    assert sorted(rf.dump(fmt='text')) == sorted(dump)
+    rf.close()
+
+    # The cache is kept in the database
+    rf = _FormatCounter(database)
+    assert sorted(rf.dump(fmt='text')) == sorted(dump)
+    assert _FormatCounter.formatted == 3
+
+    # A change of the raw text invalidates its text
+    rf.cur.execute(
+        "UPDATE citation SET raw = '@misc{Paper0, title = {New}}', "
+        "raw_hash = 'new' WHERE alias = 'paper_0'"
+    )
+    rf.conn.commit()
+    texts = {item[0]: item[1] for item in rf.dump(fmt='text')}
+    assert 'New' in texts[1]
+    assert _FormatCounter.formatted == 4
+    rf.close()
+
+    # And so does a new version of the formatting
+    _FormatCounter.text_format_version += 1
+    rf = _FormatCounter(database)
+    rf.dump(fmt='text')
+    assert _FormatCounter.formatted == 7
+
+
+@pytest.mark.parametrize(
+    'lock', ['BEGIN IMMEDIATE', 'BEGIN; SELECT 1 FROM citation']
+)
+def test_render_cache_locked(lock):
+
+    rf = _create_db('database.db')
+    for i in range(3):
+        rf.cite(
+            raw='@misc{Paper%d, title = {Paper %d}}' % (i, i),
+            alias='paper_%d' % i,
+            module='Code',
+            note='Context 1'
+        )
+    expected = rf.dump(fmt='text')
+    rf.cur.execute("DELETE FROM render_cache;")
+    rf.conn.commit()
+    rf.cur.execute("PRAGMA busy_timeout = 0;")
+
+    # Another connection holds the write lock, or reads
+    conn = sqlite3.connect(rf.database, isolation_level=None)
+    conn.executescript(lock)
+    try:
+        assert rf.dump(fmt='text') == expected
+
+        # The dump goes on after each chunk fails to be cached
+        assert list(rf.iter_dump(fmt='text', chunk_size=1)) == expected
+    finally:
+        conn.execute("ROLLBACK;")
+        conn.close()
+
+    rf.cur.execute("SELECT COUNT(*) FROM render_cache;")
+    assert rf.cur.fetchone()[0] == 0
+    assert not rf.conn.in_transaction
+
+    # And after a write rolled back meanwhile
+    stream = rf.iter_dump(fmt='text', chunk_size=1)
+    assert next(stream) == expected[0]
+    with pytest.raises(sqlite3.IntegrityError):
+        rf.cite_many(
+            [('@misc{Other, title = {Other}}', 'paper_0', 'Code', 'Other', 1)]
+        )
+    assert list(stream) == expected[1:]
+
+    # The cache is filled by the dumps once the database can be written
+    rf.cur.execute("SELECT COUNT(*) FROM render_cache;")
+    assert rf.cur.fetchone()[0] == 3
+    rf.close()
+
+
+def test_citation_fields():
+
+    rf = _create_db('database.db')
+    rf.cite(
+        raw=lammps_citation,
+        alias='lammps_paper',
+        module='LAMMPS',
+        note='Context 1'
+    )
+    rf.cite_many([(namd_citation, 'namd_paper', 'NAMD', 'Context 1', 1)])
+
+    rf.cur.execute(
+        "SELECT json_extract(fields, '$.ENTRYTYPE') FROM citation_fields "
+        "ORDER BY reference_id"
+    )
+    assert rf.cur.fetchall() == [('article',), ('article',)]
+    assert rf.backend.get_fields([1])[1] == rf._parse_bibtex(lammps_citation)
+    database = rf.database
+    dump = rf.dump(fmt='text')
+    rf.close()
+
+    # The text is formatted without parsing the raw text
+    rf = reference_handler.Reference_Handler(database)
+    rf.cur.execute("DELETE FROM render_cache")
+    rf.conn.commit()
+    assert rf.dump(fmt='text') == dump
+    assert rf.parse_cache.misses == 0
+
+    # Citations without fields, e.g. from older databases, are parsed once
+    rf.cur.execute("DELETE FROM citation_fields WHERE reference_id = 2")
+    rf.cur.execute("DELETE FROM render_cache")
+    rf.conn.commit()
+    assert rf.dump(fmt='text') == dump
+    assert rf.parse_cache.misses == 1
+    assert sorted(rf.backend.get_fields([1, 2])) == [1, 2]
+
+
+def test_dump_workers():
+
+    rf = _create_db('database.db')
+    for i in range(12):
+        for j in range(i + 1):
+            rf.cite(
+                raw='@misc{Paper%d, title = {H$_2$O n\\"{u}mber %d}}' % (i, i),
+                alias='paper_%d' % i,
+                module='Code',
+                note='Context %d' % j
+            )
+
+    streamed = list(rf.iter_dump(fmt='text', chunk_size=2, workers=2))
+
+    rf.cur.execute("DELETE FROM render_cache")
+    rf.conn.commit()
+    serial = rf.dump(fmt='text')
+
+    assert streamed == serial
+    u_umlaut = 'u\N{Combining Diaeresis}'
+    assert streamed[0][1] == ' H\N{Subscript Two}O n%smber 11;' % u_umlaut
+
+    # With some of the text cached, and chunks of cached text only
+    rf.cur.execute("DELETE FROM render_cache WHERE reference_id % 3 = 0")
+    rf.conn.commit()
+    assert list(rf.iter_dump(fmt='text', chunk_size=2, workers=3)) == serial
+    rf.cur.execute("DELETE FROM render_cache WHERE reference_id % 3 = 0")
+    rf.conn.commit()
+    assert rf.dump(fmt='text', workers=3) == serial
+
+    # The formatting of subclasses is used by the worker processes
+    database = rf.database
+    rf.close()
+    rf = _FormatCounter(database)
+    rf.cur.execute("DELETE FROM render_cache")
+    rf.conn.commit()
+    assert rf.dump(fmt='text', workers=2) == serial
+
+    with pytest.raises(ValueError):
+        rf.dump(fmt='text', workers=0)
+
+
 def test_cite_return():
 
     rf = _create_db('database.db')
@@ -388,3 +653,1374 @@ def test_cite_return():
     assert lammps_id1 == lammps_id2
     assert lammps_id1 == lammps_id3
     assert namd_id == 2
+
+
+def test_buffered_cite():
+
+    rf = _create_db('database.db', buffered=True, buffer_size=100)
+
+    for i in range(3):
+        lammps_id = rf.cite(
+            raw=lammps_citation,
+            alias='lammps_paper',
+            module='LAMMPS',
+            level=1,
+            note='Context 1'
+        )
+    namd_id = rf.cite(
+        raw=namd_citation,
+        alias='namd_paper',
+        module='NAMD',
+        level=1,
+        note='Context 1'
+    )
+
+    assert lammps_id == 1
+    assert namd_id == 2
+    assert _count_on_disk('database.db') == 0
+
+    # Queries read through the buffer without flushing it
+    assert rf.total_mentions(reference_id=1) == 3
+    assert rf.total_mentions(alias='namd_paper') == 1
+    assert rf.total_contexts(reference_id=1) == 1
+    assert _count_on_disk('database.db') == 0
+
+    rf.flush()
+
+    assert _count_on_disk('database.db') == 4
+    assert rf.total_mentions(reference_id=1) == 3
+
+
+def test_buffered_flush_on_size():
+
+    rf = _create_db('database.db', buffered=True, buffer_size=5)
+
+    for i in range(7):
+        rf.cite(
+            raw=lammps_citation,
+            alias='lammps_paper',
+            module='LAMMPS',
+            level=1,
+            note='Context %d' % (i % 2)
+        )
+
+    assert _count_on_disk('database.db') == 5
+
+    rf.flush()
+
+    assert _count_on_disk('database.db') == 7
+    assert rf.total_contexts(reference_id=1) == 2
+
+
+def test_buffered_flush_on_interval():
+
+    rf = _create_db('database.db', buffered=True, flush_interval=0)
+
+    rf.cite(
+        raw=lammps_citation,
+        alias='lammps_paper',
+        module='LAMMPS',
+        level=1,
+        note='Context 1'
+    )
+
+    assert _count_on_disk('database.db') == 1
+
+
+def test_buffered_dump():
+
+    rf = _create_db('database.db', buffered=True)
+
+    for module in ('Code1', 'Code2', 'Code1'):
+        rf.cite(
+            raw=namd_citation,
+            alias='namd_paper',
+            module=module,
+            level=1,
+            note='Context 1'
+        )
+
+    dump = rf.dump()
+
+    assert len(dump) == 1
+    assert dump[0][2] == 3
+
+
+def test_buffered_dump_level():
+
+    rf = _create_db('database.db', buffered=True)
+
+    rf.cite(raw=lammps_citation, alias='lammps', module='A', note='n', level=2)
+    rf.cite(raw=namd_citation, alias='namd', module='A', note='n', level=3)
+    rf.cite(raw=namd_citation, alias='namd', module='B', note='n', level=1)
+
+    before = rf.dump()
+    assert [item[2:] for item in before] == [(2, 1), (1, 2)]
+    levels = {item[0]: item[2:] for item in rf.dump(level=2)}
+    assert levels == {1: (1, 2), 2: (1, 1)}
+
+    # The levels are the same once the counts are written
+    rf.flush()
+    assert rf.dump() == before
+
+
+def test_parse_cache():
+
+    rf = _create_db('database.db')
+
+    for i in range(5):
+        rf.cite(
+            raw=lammps_citation,
+            alias='lammps_paper',
+            module='LAMMPS',
+            level=1,
+            note='Context %d' % i
+        )
+
+    assert rf.parse_cache.misses == 1
+    assert rf.parse_cache.hits == 4
+
+    # The text is formatted from the fields stored with the citation
+    dump = rf.dump(fmt='text')
+
+    assert 'Plimpton' in dump[0][1]
+    assert rf.parse_cache.cache_info() == {
+        'hits': 4,
+        'misses': 1,
+        'maxsize': 1024,
+        'currsize': 1
+    }
+
+
+def test_parse_cache_eviction():
+
+    rf = _create_db('database.db', parse_cache_size=1)
+
+    for raw in (lammps_citation, namd_citation, lammps_citation):
+        rf._parse_bibtex(raw)
+
+    assert rf.parse_cache.misses == 3
+    assert len(rf.parse_cache) == 1
+
+    rf = _create_db('database.db', parse_cache_size=0)
+    rf._parse_bibtex(lammps_citation)
+    rf._parse_bibtex(lammps_citation)
+
+    assert rf.parse_cache.misses == 2
+    assert len(rf.parse_cache) == 0
+
+
+def _create_legacy_db(database_name):
+    """A database with the citation table keyed by the full raw text."""
+    database = build_filenames.build_scratch_filename(database_name)
+
+    if os.path.exists(database):
+        os.remove(database)
+
+    conn = sqlite3.connect(database)
+    conn.executescript(
+        """
+        CREATE TABLE citation (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        alias TEXT NOT NULL UNIQUE,
+        raw TEXT NOT NULL UNIQUE,
+        doi TEXT UNIQUE
+        );
+        CREATE INDEX idx_raw on citation (raw);
+        CREATE TABLE context (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        reference_id INTEGER NOT NULL,
+        module TEXT NOT NULL,
+        note TEXT NOT NULL,
+        count INTEGER NOT NULL,
+        level INTEGER NOT NULL
+        );
+        """
+    )
+    conn.executemany(
+        "INSERT INTO citation (alias, raw, doi) VALUES (?, ?, ?)", [
+            ('lammps_paper', lammps_citation, None),
+            ('namd_paper', namd_citation, '10.1002/jcc.20289'),
+            ('namd_copy', namd_citation.strip(), None),
+        ]
+    )
+    conn.executemany(
+        "INSERT INTO context (reference_id, module, note, count, level) "
+        "VALUES (?, ?, ?, ?, ?)", [
+            (1, 'LAMMPS', 'Context 1', 4, 1),
+            (2, 'NAMD', 'Context 1', 2, 1),
+            (3, 'NAMD', 'Context 2', 1, 1),
+            (1, 'LAMMPS', 'Context 1', 3, 1),
+            (3, 'NAMD', 'Context 1', 1, 1),
+        ]
+    )
+    conn.commit()
+    conn.close()
+
+    return database
+
+
+def test_raw_hash_migration():
+
+    database = _create_legacy_db('legacy.db')
+
+    rf = reference_handler.Reference_Handler(database)
+
+    columns = [row[1] for row in rf.cur.execute("PRAGMA table_info(citation)")]
+    assert 'raw_hash' in columns
+    assert rf.cur.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE name = 'idx_raw'"
+    ).fetchone()[0] == 0
+
+    assert rf.total_citations() == 2
+    assert rf.total_mentions(reference_id=1) == 7
+    assert rf.total_contexts(reference_id=1) == 1
+    assert rf.total_mentions(alias='namd_paper') == 4
+    assert rf.total_contexts(reference_id=2) == 2
+
+    namd_id = rf.cite(
+        raw=namd_citation,
+        alias='namd_paper',
+        module='NAMD',
+        level=1,
+        note='Context 1'
+    )
+
+    assert namd_id == 2
+    assert rf.total_mentions(reference_id=2) == 5
+    assert rf.total_contexts(reference_id=2) == 2
+    rf.cur.execute("SELECT count FROM context WHERE id = 2")
+    assert rf.cur.fetchone()[0] == 4
+
+
+def test_context_key_unique():
+
+    rf = _create_db('database.db')
+
+    rf.cite(
+        raw=lammps_citation,
+        alias='lammps_paper',
+        module='LAMMPS',
+        level=1,
+        note='Context 1'
+    )
+
+    with pytest.raises(sqlite3.IntegrityError):
+        rf._create_context(
+            reference_id=1, module='LAMMPS', note='Context 1', level=1
+        )
+
+    rf._count_context(
+        reference_id=1, module='LAMMPS', note='Context 1', level=1, count=5
+    )
+
+    assert rf.total_mentions(reference_id=1) == 6
+    assert rf.total_contexts(reference_id=1) == 1
+    rf.close()
+
+
+def test_cite_many():
+
+    rf = _create_db('database.db')
+
+    rf.cite(
+        raw=lammps_citation,
+        alias='lammps_paper',
+        module='LAMMPS',
+        level=1,
+        note='Context 1'
+    )
+
+    ids = rf.cite_many(
+        [
+            (namd_citation, 'namd_paper', 'NAMD', 'Context 1', 1),
+            (lammps_citation, 'lammps_paper', 'LAMMPS', 'Context 1', 1),
+            (namd_citation, 'namd_paper', 'NAMD', 'Context 1', 1),
+            (lammps_citation, 'lammps_paper', 'LAMMPS', 'Context 2', 2),
+            (namd_citation, 'namd_paper', 'NAMD', 'Context 1', 3),
+        ]
+    )
+
+    assert ids == [2, 1, 2, 1, 2]
+
+    assert rf.total_citations() == 2
+    assert rf.total_mentions(reference_id=1) == 3
+    assert rf.total_mentions(reference_id=2) == 3
+    assert rf.total_contexts(reference_id=1) == 2
+    assert rf.total_contexts(reference_id=2) == 2
+    rf.cur.execute("SELECT doi FROM citation WHERE id = 2")
+    assert rf.cur.fetchone()[0] == '10.1002/jcc.20289'
+
+    assert rf.cite_many([]) == []
+
+
+def test_cite_many_exception():
+
+    rf = _create_db('database.db')
+
+    with pytest.raises(NameError):
+        rf.cite_many([(lammps_citation, None, 'LAMMPS', 'Context 1', 1)])
+
+    assert rf.total_citations() == 0
+
+
+def test_call_site_cache():
+
+    rf = _create_db('database.db')
+
+    for i in range(5):
+        rf.cite(
+            raw=lammps_citation,
+            alias='lammps_paper',
+            module='LAMMPS',
+            level=1,
+            note='Context 1'
+        )
+
+    # Repeated calls go straight to the counter
+    assert rf.parse_cache.misses == 1
+    assert rf.parse_cache.hits == 0
+    assert rf.total_mentions(reference_id=1) == 5
+
+
+def test_call_site_cache_deleted_rows():
+
+    rf = _create_db('database.db')
+
+    def cite():
+        return rf.cite(
+            raw=lammps_citation,
+            alias='lammps_paper',
+            module='LAMMPS',
+            level=1,
+            note='Context 1'
+        )
+
+    cite()
+    rf.cur.execute("DELETE FROM context;")
+    rf.conn.commit()
+    cite()
+
+    assert rf.total_mentions(reference_id=1) == 1
+    assert rf.total_contexts(reference_id=1) == 1
+
+    rf.cur.execute("DELETE FROM citation;")
+    rf.conn.commit()
+
+    assert cite() == 2
+    assert rf.total_citations() == 1
+    assert rf.total_mentions(reference_id=2) == 1
+
+
+def test_call_site_cache_buffered():
+
+    rf = _create_db('database.db', buffered=True)
+
+    for i in range(3):
+        rf.cite(
+            raw=lammps_citation,
+            alias='lammps_paper',
+            module='LAMMPS',
+            level=1,
+            note='Context 1'
+        )
+
+    assert rf.parse_cache.misses == 1
+    assert rf.parse_cache.hits == 0
+
+    rf.flush()
+    rf.cur.execute("DELETE FROM citation;")
+    rf.conn.commit()
+
+    for i in range(2):
+        rf.cite(
+            raw=lammps_citation,
+            alias='lammps_paper',
+            module='LAMMPS',
+            level=1,
+            note='Context 1'
+        )
+
+    # The deleted reference is found when the counts are written
+    rf.flush()
+
+    assert rf.total_citations() == 1
+    assert rf.total_mentions(alias='lammps_paper') == 2
+    assert rf.total_contexts(alias='lammps_paper') == 1
+
+
+def test_flush_exception():
+
+    rf = _create_db('database.db', buffered=True)
+
+    rf.cite(raw=lammps_citation, alias='a', module='LAMMPS', note='n')
+    rf.cite(raw=namd_citation, alias='b', module='NAMD', note='n')
+
+    # Another raw text takes the alias of the deleted reference
+    rf.cur.execute("DELETE FROM citation WHERE alias = 'a';")
+    rf.conn.commit()
+    other = reference_handler.Reference_Handler(rf.database)
+    other.cite(raw='Other', alias='a', module='A', note='n', fmt='text')
+    other.close()
+
+    for i in range(2):
+        with pytest.raises(sqlite3.IntegrityError):
+            rf.flush()
+
+    # Nothing was written and the counts are still buffered
+    assert _count_on_disk('database.db') == 1
+    assert rf.total_mentions(alias='b') == 1
+    assert len(rf._pending) == 2
+
+
+def test_flush_text_format():
+
+    rf = _create_db('database.db', buffered=True)
+
+    rf.cite(
+        raw='Plain text reference',
+        alias='text',
+        module='A',
+        note='n',
+        fmt='text'
+    )
+    rf.flush()
+    rf.cur.execute("DELETE FROM citation;")
+    rf.conn.commit()
+
+    # The deleted reference is recreated from the text when it is flushed
+    rf.cite(
+        raw='Plain text reference',
+        alias='text',
+        module='A',
+        note='n',
+        fmt='text'
+    )
+    rf.flush()
+
+    assert rf.total_citations() == 1
+    assert rf.total_mentions(alias='text') == 1
+
+
+@pytest.mark.parametrize('buffered', [False, True])
+def test_call_site_cache_replaced_database(buffered):
+
+    rf = _create_db('database.db', buffered=buffered)
+    rf.cite(
+        raw=lammps_citation,
+        alias='lammps_paper',
+        module='LAMMPS',
+        level=1,
+        note='Context 1'
+    )
+    rf.flush()
+
+    # A backup in which the same IDs belong to another citation
+    backup = _create_db('tmp.db')
+    backup.cite(
+        raw=namd_citation,
+        alias='namd_paper',
+        module='LAMMPS',
+        level=1,
+        note='Context 1'
+    )
+    conn = sqlite3.connect(rf.database)
+    backup.conn.backup(conn)
+    conn.close()
+    backup.close()
+
+    rf.cite(
+        raw=lammps_citation,
+        alias='lammps_paper',
+        module='LAMMPS',
+        level=1,
+        note='Context 1'
+    )
+    rf.flush()
+
+    assert rf.total_mentions(alias='namd_paper') == 1
+    assert rf.total_mentions(alias='lammps_paper') == 1
+    rf.close()
+
+
+def test_coalesced_counts():
+
+    rf = _create_db('database.db', buffered=True)
+
+    for i in range(10):
+        rf.cite(
+            raw=lammps_citation,
+            alias='lammps_paper',
+            module='LAMMPS',
+            level=1 + i % 3,
+            note='Context 1'
+        )
+    rf.cite(
+        raw=namd_citation,
+        alias='namd_paper',
+        module='NAMD',
+        level=1,
+        note='Context 1'
+    )
+
+    assert len(rf._pending) == 4
+    assert rf.total_mentions(alias='lammps_paper') == 10
+    assert [item[2] for item in rf.dump()] == [10, 1]
+    assert [item[2] for item in rf.dump(level=1)] == [4, 1]
+    assert _count_on_disk('database.db') == 0
+
+    # Deleted contexts are recreated when the counts are written
+    rf.cur.execute("DELETE FROM context WHERE level = 3;")
+    rf.conn.commit()
+    rf.flush()
+
+    assert _count_on_disk('database.db') == 11
+    assert rf.total_contexts(alias='lammps_paper') == 3
+    assert [item[2] for item in rf.dump()] == [10, 1]
+
+
+@pytest.mark.parametrize('buffered', [False, True])
+def test_cite_from_threads(buffered):
+
+    rf = _create_db('database.db', buffered=buffered, buffer_size=50)
+    n_threads = 8
+    n_cites = 200
+
+    def worker(i):
+        for j in range(n_cites):
+            rf.cite(
+                raw=lammps_citation if j % 2 else namd_citation,
+                alias='lammps_paper' if j % 2 else 'namd_paper',
+                module='Worker %d' % i,
+                level=1,
+                note='Context %d' % (j % 3)
+            )
+
+    threads = [
+        threading.Thread(target=worker, args=(i,)) for i in range(n_threads)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert rf.total_citations() == 2
+    assert rf.total_mentions(alias='lammps_paper') == n_threads * n_cites / 2
+    assert rf.total_mentions(alias='namd_paper') == n_threads * n_cites / 2
+    assert rf.total_contexts(alias='lammps_paper') == n_threads * 3
+
+
+def test_shard_path():
+
+    database = build_filenames.build_scratch_filename('sharded.db')
+    for path in reference_handler.Reference_Handler.find_shards(database):
+        os.remove(path)
+
+    rf = reference_handler.Reference_Handler(database, shard=True)
+
+    assert rf.database.startswith(database)
+    assert str(os.getpid()) in rf.database
+    assert reference_handler.Reference_Handler.find_shards(database) == [
+        rf.database
+    ]
+
+    rf.close()
+    os.remove(rf.database)
+
+
+def test_merge_shards():
+
+    lammps_copy = lammps_citation.replace('Steve Plimpton', 'S. Plimpton')
+
+    shards = []
+    for i in range(3):
+        rf = _create_db('shard%d.db' % i)
+        rf.cite(
+            raw=lammps_citation if i != 2 else lammps_copy,
+            alias='lammps_paper',
+            module='LAMMPS',
+            level=1,
+            note='Context 1'
+        )
+        rf.cite(
+            raw=namd_citation,
+            alias='namd_paper_%d' % i,
+            module='NAMD',
+            level=i + 1,
+            note='Context 1'
+        )
+        rf.cite(
+            raw=namd_citation,
+            alias='namd_paper_%d' % i,
+            module='NAMD',
+            level=1,
+            note='Context 1'
+        )
+        shards.append(rf.database)
+        rf.conn.close()
+
+    target = _create_db('merged.db')
+    target.cite(
+        raw=namd_citation,
+        alias='namd',
+        module='NAMD',
+        level=1,
+        note='Context 1'
+    )
+    target.merge(shards, workers=2)
+
+    assert target.total_citations() == 2
+    assert target.total_mentions(alias='lammps_paper') == 3
+    assert target.total_contexts(alias='lammps_paper') == 1
+    assert target.total_mentions(alias='namd') == 7
+    assert target.total_contexts(alias='namd') == 3
+
+    target.merge(shards, remove=True)
+
+    assert target.total_mentions(alias='lammps_paper') == 6
+    assert not any(os.path.exists(path) for path in shards)
+
+
+def test_merge_shard_uri():
+
+    # Characters with a meaning in URIs
+    rf = _create_db('shard #1?%20.db')
+    rf.cite(
+        raw=lammps_citation,
+        alias='lammps_paper',
+        module='LAMMPS',
+        level=1,
+        note='Context 1'
+    )
+    rf.close()
+
+    target = _create_db('merged.db')
+    target.merge([rf.database], remove=True)
+
+    assert target.total_mentions(alias='lammps_paper') == 1
+    assert not any(
+        name.startswith('shard ')
+        for name in os.listdir(os.path.dirname(rf.database))
+    )
+
+
+def test_async_cite():
+
+    database = build_filenames.build_scratch_filename('database.db')
+    if os.path.exists(database):
+        os.remove(database)
+
+    async def cite(rf, i):
+        return await rf.acite(
+            raw=lammps_citation if i % 2 else namd_citation,
+            alias='lammps_paper' if i % 2 else 'namd_paper',
+            module='Module %d' % (i % 5),
+            level=1,
+            note='Context 1'
+        )
+
+    async def main():
+        rf = await reference_handler.Reference_Handler.aopen(database)
+        async with rf:
+            ids = await asyncio.gather(*[cite(rf, i) for i in range(2000)])
+            dump = await rf.adump()
+            mentions = rf.total_mentions(alias='lammps_paper')
+        return ids, dump, mentions
+
+    ids, dump, mentions = asyncio.run(main())
+
+    assert set(ids[0::2]) == {ids[0]}
+    assert set(ids[1::2]) == {ids[1]}
+    assert mentions == 1000
+    assert [item[2] for item in dump] == [1000, 1000]
+
+
+def test_async_cite_exception():
+
+    rf = _create_db('database.db')
+
+    async def main():
+        with pytest.raises(NameError):
+            await rf.acite(raw=lammps_citation, module='LAMMPS', note='')
+
+        # The alias is already used by another reference
+        good, bad = await asyncio.gather(
+            rf.acite(
+                raw=lammps_citation,
+                alias='paper',
+                module='LAMMPS',
+                note='Context 1'
+            ),
+            rf.acite(
+                raw=namd_citation,
+                alias='paper',
+                module='NAMD',
+                note='Context 1'
+            ),
+            return_exceptions=True
+        )
+        await rf.aclose()
+        return good, bad
+
+    good, bad = asyncio.run(main())
+
+    assert good == 1
+    assert isinstance(bad, sqlite3.IntegrityError)
+
+
+def test_background_cite():
+
+    rf = _create_db('database.db', background=True)
+
+    for i in range(500):
+        ret = rf.cite(
+            raw=lammps_citation if i % 2 else namd_citation,
+            alias='lammps_paper' if i % 2 else 'namd_paper',
+            module='LAMMPS' if i % 2 else 'NAMD',
+            level=1,
+            note='Context %d' % (i % 4)
+        )
+        assert ret is None
+
+    rf.flush()
+
+    assert _count_on_disk('database.db') == 500
+    assert rf.total_mentions(alias='lammps_paper') == 250
+    assert rf.total_contexts(alias='namd_paper') == 2
+
+    rf.close()
+
+
+@pytest.mark.parametrize('backpressure', ['block', 'drop', 'spill'])
+def test_background_backpressure(backpressure):
+
+    rf = _create_db(
+        'database.db',
+        background=True,
+        queue_size=5,
+        backpressure=backpressure
+    )
+
+    # Stall the writer so that the queue fills up
+    with rf._lock:
+        for i in range(50):
+            if backpressure == 'block' and i == 5:
+                break
+            rf.cite(
+                raw=lammps_citation,
+                alias='lammps_paper',
+                module='LAMMPS',
+                level=1,
+                note='Context 1'
+            )
+
+    rf.flush()
+
+    if backpressure == 'block':
+        assert rf.total_mentions(reference_id=1) == 5
+    elif backpressure == 'drop':
+        assert rf.dropped > 0
+        assert rf.total_mentions(reference_id=1) + rf.dropped == 50
+    else:
+        assert rf.dropped == 0
+        assert rf.total_mentions(reference_id=1) == 50
+
+    rf.close()
+
+
+def test_background_errors():
+
+    rf = _create_db('database.db', background=True)
+
+    rf.cite(
+        raw=lammps_citation,
+        alias='paper',
+        module='LAMMPS',
+        level=1,
+        note='Context 1'
+    )
+    rf.cite(raw=namd_citation, alias='paper', module='NAMD', level=1, note='1')
+    rf.flush()
+
+    assert rf.total_citations() == 1
+    assert len(rf.background_errors) == 1
+    citation, error = rf.background_errors[0]
+    assert citation[1] == 'paper'
+    assert isinstance(error, sqlite3.IntegrityError)
+
+    rf.close()
+
+
+def test_background_backpressure_exception():
+
+    with pytest.raises(ValueError):
+        _create_db('database.db', background=True, backpressure='ignore')
+
+
+@pytest.mark.parametrize(
+    'profile, journal_mode, synchronous', [
+        ('durable', 'delete', 2),
+        ('balanced', 'wal', 1),
+        ('ephemeral', 'memory', 0),
+    ]
+)
+def test_profiles(profile, journal_mode, synchronous):
+
+    rf = _create_db('database.db', profile=profile)
+
+    rf.cite(
+        raw=lammps_citation,
+        alias='lammps_paper',
+        module='LAMMPS',
+        level=1,
+        note='Context 1'
+    )
+
+    assert rf.cur.execute("PRAGMA journal_mode").fetchone()[0] == journal_mode
+    assert rf.cur.execute("PRAGMA synchronous").fetchone()[0] == synchronous
+    assert rf.cur.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+    assert rf.total_mentions(reference_id=1) == 1
+
+    rf.close()
+
+
+def test_profile_from_environment(monkeypatch):
+
+    monkeypatch.setenv('REFERENCE_HANDLER_PROFILE', 'balanced')
+
+    rf = _create_db('database.db')
+
+    assert rf.cur.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+
+    rf.close()
+
+    rf = _create_db('database.db', profile={'journal_mode': 'truncate'})
+
+    assert rf.cur.execute("PRAGMA journal_mode").fetchone()[0] == 'truncate'
+
+    rf.close()
+
+
+def test_profile_exception():
+
+    with pytest.raises(ValueError):
+        _create_db('database.db', profile='fastest')
+
+    with pytest.raises(ValueError):
+        _create_db('database.db', profile={'journal_mode': 'wal; DROP'})
+
+
+def test_in_memory():
+
+    database = build_filenames.build_scratch_filename('memory.db')
+    if os.path.exists(database):
+        os.remove(database)
+
+    rf = reference_handler.Reference_Handler(database, in_memory=True)
+    rf.cite(
+        raw=lammps_citation,
+        alias='lammps_paper',
+        module='LAMMPS',
+        level=1,
+        note='Context 1'
+    )
+
+    assert not os.path.exists(database)
+
+    rf.save()
+
+    assert _count_on_disk('memory.db') == 1
+
+    rf.cite(
+        raw=lammps_citation,
+        alias='lammps_paper',
+        module='LAMMPS',
+        level=1,
+        note='Context 1'
+    )
+
+    assert _count_on_disk('memory.db') == 1
+
+    rf.close()
+
+    assert _count_on_disk('memory.db') == 2
+
+    # Seeded from the file
+    rf = reference_handler.Reference_Handler(database, in_memory=True)
+    rf.cite(
+        raw=namd_citation,
+        alias='namd_paper',
+        module='NAMD',
+        level=1,
+        note='Context 1'
+    )
+
+    assert rf.total_mentions(reference_id=1) == 2
+    assert rf.total_mentions(reference_id=2) == 1
+
+    rf.close()
+
+    assert _count_on_disk('memory.db') == 3
+    assert [
+        name for name in os.listdir(os.path.dirname(database))
+        if name.startswith('memory.db.')
+    ] == []
+
+
+def test_in_memory_autosave():
+
+    database = build_filenames.build_scratch_filename('memory.db')
+    if os.path.exists(database):
+        os.remove(database)
+
+    rf = reference_handler.Reference_Handler(
+        database, in_memory=True, autosave_interval=0.01
+    )
+    rf.cite(
+        raw=lammps_citation,
+        alias='lammps_paper',
+        module='LAMMPS',
+        level=1,
+        note='Context 1'
+    )
+
+    for i in range(100):
+        if os.path.exists(database):
+            break
+        time.sleep(0.01)
+
+    assert _count_on_disk('memory.db') == 1
+
+    rf.close()
+
+
+@pytest.mark.skipif(os.name != 'posix', reason='POSIX file modes')
+def test_in_memory_file_mode():
+
+    database = build_filenames.build_scratch_filename('memory.db')
+    if os.path.exists(database):
+        os.remove(database)
+
+    rf = reference_handler.Reference_Handler(database, in_memory=True)
+    rf.save()
+
+    # A new file has the mode of the other files of the process
+    umask = os.umask(0)
+    os.umask(umask)
+    assert os.stat(database).st_mode & 0o777 == 0o666 & ~umask
+
+    os.chmod(database, 0o644)
+    rf.cite(
+        raw=lammps_citation,
+        alias='lammps_paper',
+        module='LAMMPS',
+        level=1,
+        note='Context 1'
+    )
+    rf.save()
+
+    assert os.stat(database).st_mode & 0o777 == 0o644
+    assert _count_on_disk('memory.db') == 1
+
+    rf.close()
+
+
+def _cite_to_log(database, i):
+    """Cites through the log backend, in a worker process."""
+    rf = reference_handler.Reference_Handler(database, backend='log')
+    rf.cite(
+        raw=lammps_citation,
+        alias='lammps_paper',
+        module='LAMMPS',
+        level=1,
+        note='Context 1'
+    )
+    rf.cite(
+        raw=namd_citation,
+        alias='namd_paper',
+        module='NAMD',
+        level=i % 3 + 1,
+        note='Context 1'
+    )
+    rf.close()
+
+
+def _remove_logs(database):
+    for segment in reference_handler.LogBackend.find_logs(database):
+        os.remove(segment)
+
+
+def test_compact_logs():
+
+    rf = _create_db('logged.db')
+    _remove_logs(rf.database)
+    rf.cite(
+        raw=namd_citation,
+        alias='namd',
+        module='NAMD',
+        level=1,
+        note='Context 1'
+    )
+
+    with concurrent.futures.ProcessPoolExecutor(2) as executor:
+        list(executor.map(_cite_to_log, [rf.database] * 4, range(4)))
+
+    assert rf.compact() > 0
+    assert rf.total_citations() == 2
+    assert rf.total_mentions(alias='lammps_paper') == 4
+    assert rf.total_mentions(alias='namd') == 5
+    assert rf.total_contexts(alias='namd') == 3
+
+    # Only the new records are read
+    assert rf.compact() == 0
+    _cite_to_log(rf.database, 0)
+    rf.compact()
+    assert rf.total_mentions(alias='lammps_paper') == 5
+    assert rf.total_mentions(alias='namd') == 6
+
+    rf.close()
+    _remove_logs(rf.database)
+
+
+def test_compact_logs_segments():
+
+    rf = _create_db('logged.db')
+    _remove_logs(rf.database)
+    log = reference_handler.Reference_Handler(
+        backend=reference_handler.LogBackend(rf.database, segment_size=1)
+    )
+
+    for i in range(3):
+        log.cite(
+            raw=lammps_citation,
+            alias='lammps_paper',
+            module='LAMMPS',
+            level=1,
+            note='Context 1'
+        )
+
+    segments = reference_handler.LogBackend.find_logs(rf.database)
+    assert len(segments) == 3
+    assert rf.compact() == 4
+    assert rf.total_mentions(reference_id=1) == 3
+
+    # A record cut short is left for the next compaction
+    log.cite(
+        raw=lammps_citation,
+        alias='lammps_paper',
+        module='LAMMPS',
+        level=1,
+        note='Context 1'
+    )
+    segment = reference_handler.LogBackend.find_logs(rf.database)[-1]
+    with open(segment, 'rb') as f:
+        record = f.read()
+    with open(segment, 'wb') as f:
+        f.write(record[:-2])
+
+    assert rf.compact() == 0
+    assert rf.total_mentions(reference_id=1) == 3
+
+    with open(segment, 'wb') as f:
+        f.write(record)
+
+    assert rf.compact() == 1
+    assert rf.total_mentions(reference_id=1) == 4
+
+    log.close()
+    rf.close()
+    _remove_logs(rf.database)
+
+
+def test_compact_logs_reused_name():
+
+    rf = _create_db('logged.db')
+    _remove_logs(rf.database)
+
+    log = reference_handler.Reference_Handler(rf.database, backend='log')
+    for i in range(5):
+        log.cite(
+            raw=lammps_citation,
+            alias='lammps_paper',
+            module='LAMMPS',
+            level=1,
+            note='Context 1'
+        )
+    log.close()
+    assert rf.compact() == 6
+    _remove_logs(rf.database)
+
+    # A new log of the same name, whose citation 1 is another one
+    log = reference_handler.Reference_Handler(rf.database, backend='log')
+    for i in range(3):
+        log.cite(
+            raw=namd_citation,
+            alias='namd_paper',
+            module='NAMD',
+            level=1,
+            note='Context 1'
+        )
+    log.close()
+
+    assert rf.compact() == 4
+    assert rf.total_mentions(alias='lammps_paper') == 5
+    assert rf.total_mentions(alias='namd_paper') == 3
+
+    # Only the rows of the new log are kept
+    rf.cur.execute("SELECT DISTINCT log FROM log_reference;")
+    assert rf.cur.fetchall() == [(log.backend.identity,)]
+    rf.cur.execute("SELECT COUNT(*) FROM log_segment;")
+    assert rf.cur.fetchone()[0] == 1
+
+    rf.close()
+    _remove_logs(rf.database)
+
+
+def test_compact_logs_concurrent(monkeypatch):
+
+    rf = _create_db('logged.db')
+    _remove_logs(rf.database)
+    _cite_to_log(rf.database, 0)
+
+    other = reference_handler.Reference_Handler(rf.database)
+    other.cur.execute("PRAGMA busy_timeout = 0;")
+    read_log = reference_handler.backends.read_log
+    errors = []
+
+    def compact_meanwhile(path, offset=0):
+        # The other compaction cannot fold the records being read
+        monkeypatch.undo()
+        try:
+            other.compact()
+        except sqlite3.OperationalError as e:
+            errors.append(e)
+        return read_log(path, offset)
+
+    monkeypatch.setattr(
+        reference_handler.backends, 'read_log', compact_meanwhile
+    )
+    assert rf.compact() == 4
+
+    assert len(errors) == 1
+    assert other.compact() == 0
+    assert _count_on_disk('logged.db') == 2
+
+    other.close()
+    rf.close()
+    _remove_logs(rf.database)
+
+
+def test_compact_exception():
+
+    rf = reference_handler.Reference_Handler(backend='memory')
+
+    with pytest.raises(ValueError):
+        rf.compact()
+
+
+def test_open_shared():
+
+    database = build_filenames.build_scratch_filename('shared.db')
+    if os.path.exists(database):
+        os.remove(database)
+
+    rf = reference_handler.Reference_Handler.open(database, buffered=True)
+    other = reference_handler.Reference_Handler.open(
+        os.path.join(os.path.dirname(database), '.', 'shared.db')
+    )
+    assert other is rf
+
+    other.cite(
+        raw=lammps_citation,
+        alias='lammps_paper',
+        module='LAMMPS',
+        level=1,
+        note='Context 1'
+    )
+    other.close()
+
+    # Still open for the first caller
+    assert rf.total_mentions(reference_id=1) == 1
+
+    with reference_handler.Reference_Handler.open(database) as other:
+        assert other is rf
+    rf.close()
+
+    assert _count_on_disk('shared.db') == 1
+
+    other = reference_handler.Reference_Handler.open(database)
+    assert other is not rf
+    other.close()
+
+
+def test_close_twice():
+
+    rf = _create_db('database.db', buffered=True)
+    with rf:
+        rf.cite(
+            raw=lammps_citation,
+            alias='lammps_paper',
+            module='LAMMPS',
+            level=1,
+            note='Context 1'
+        )
+    rf.close()
+    rf.close()
+
+    assert _count_on_disk('database.db') == 1
+
+    # One close too many for a handler from open
+    database = build_filenames.build_scratch_filename('shared.db')
+    rf = reference_handler.Reference_Handler.open(database)
+    rf.close()
+    rf.close()
+
+
+def test_acite_closed():
+
+    rf = _create_db('database.db')
+
+    async def main():
+        await rf.acite(
+            raw=lammps_citation,
+            alias='lammps_paper',
+            module='LAMMPS',
+            level=1,
+            note='Context 1'
+        )
+        await rf.aclose()
+        await rf.aclose()
+        with pytest.raises(ValueError):
+            await rf.acite(
+                raw=lammps_citation,
+                alias='lammps_paper',
+                module='LAMMPS',
+                level=1,
+                note='Context 1'
+            )
+
+    asyncio.run(main())
+
+    assert _count_on_disk('database.db') == 1
+
+
+def test_open_exception():
+
+    database = build_filenames.build_scratch_filename('shared.db')
+
+    rf = reference_handler.Reference_Handler.open(database, buffered=True)
+
+    with pytest.raises(ValueError):
+        reference_handler.Reference_Handler.open(database, buffered=False)
+
+    rf.close()
+
+    with pytest.raises(NameError):
+        reference_handler.Reference_Handler.open(None)
+
+
+def _indexes(database_name):
+    """The names of the indexes as seen by a separate connection."""
+    database = build_filenames.build_scratch_filename(database_name)
+    conn = sqlite3.connect(database)
+    ret = [
+        row[0] for row in
+        conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+    ]
+    conn.close()
+    return ret
+
+
+def _set_user_version(database_name, version):
+    database = build_filenames.build_scratch_filename(database_name)
+    conn = sqlite3.connect(database)
+    conn.execute("PRAGMA user_version = %d" % version)
+    conn.execute("DROP INDEX IF EXISTS idx_level")
+    conn.commit()
+    conn.close()
+
+
+def test_schema_version():
+
+    rf = _create_db('versioned.db')
+    version = reference_handler.SQLiteBackend.schema_version
+    assert rf.cur.execute("PRAGMA user_version").fetchone()[0] == version
+    rf.close()
+
+    # An up-to-date database is opened without running any DDL
+    _set_user_version('versioned.db', version)
+    rf = reference_handler.Reference_Handler(rf.database)
+    rf.close()
+    assert 'idx_level' not in _indexes('versioned.db')
+
+    # An older one goes through the migrations again
+    _set_user_version('versioned.db', 2)
+    rf = reference_handler.Reference_Handler(rf.database)
+    assert rf.cur.execute("PRAGMA user_version").fetchone()[0] == version
+    rf.close()
+    assert 'idx_level' in _indexes('versioned.db')
+
+
+class _FailingBackend(reference_handler.SQLiteBackend):
+    migrations = reference_handler.SQLiteBackend.migrations + [
+        (reference_handler.SQLiteBackend.schema_version + 1, '_fail')
+    ]
+    schema_version = migrations[-1][0]
+
+    def _fail(self):
+        self.cur.execute("CREATE TABLE extra (id INTEGER);")
+        raise RuntimeError('Failed migration')
+
+
+def test_schema_version_exception():
+
+    rf = _create_db('versioned.db')
+    database = rf.database
+    rf.close()
+
+    with pytest.raises(RuntimeError):
+        _FailingBackend(database)
+
+    conn = sqlite3.connect(database)
+    assert conn.execute("PRAGMA user_version").fetchone(
+    )[0] == (reference_handler.SQLiteBackend.schema_version)
+    assert conn.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE name = 'extra'"
+    ).fetchone()[0] == 0
+    conn.execute("PRAGMA user_version = 100")
+    conn.commit()
+    conn.close()
+
+    with pytest.raises(ValueError):
+        reference_handler.Reference_Handler(database)
+
+
+def test_lazy_imports():
+
+    lazy = ['asyncio', 'bibtexparser', 'pprint', 'sqlite3']
+    script = (
+        'import sys, reference_handler; '
+        'print(" ".join(m for m in %r if m in sys.modules))' % (lazy,)
+    )
+    package = os.path.dirname(os.path.dirname(reference_handler.__file__))
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [package] + [p for p in [env.get('PYTHONPATH')] if p]
+    )
+    result = subprocess.run(
+        [sys.executable, '-c', script],
+        env=env,
+        stdout=subprocess.PIPE,
+        universal_newlines=True,
+        check=True
+    )
+    assert result.stdout.split() == []
+
+    # The lazily built attributes are still there
+    module = reference_handler.reference_handler
+    assert module.greek_symbol_re.match(r'$\alpha$')
+    assert module.subscript_re.pattern
+    assert module.superscript_re.pattern
+    assert isinstance(reference_handler.__version__, str)
+    with pytest.raises(AttributeError):
+        module.missing
@@ -1,7 +1,84 @@
-import bibtexparser
+import collections
+import hashlib
+
+
+def raw_digest(raw):
+    """
+    Returns a fixed-width hexadecimal digest of a raw citation text. The
+    text is canonicalized by removing the surrounding whitespace first.
+    """
+    return hashlib.blake2b(raw.strip().encode('utf-8'),
+                           digest_size=16).hexdigest()
+
+
+class LRUCache(object):
+    """
+    A bounded mapping that evicts the least recently used items first and
+    counts the hits and misses of its lookups.
+
+    Parameters
+    ----------
+    maxsize: int, Optional, default: 1024
+        The maximum number of items kept. 0 disables the cache and None
+        makes it unbounded.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        """Returns the item for key, marking it as recently used."""
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """Adds or replaces an item, evicting the oldest ones if full."""
+        if self.maxsize == 0:
+            return
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if self.maxsize is not None:
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        """Removes and returns the item for key."""
+        return self._data.pop(key, default)
+
+    def clear(self):
+        """Removes all items and resets the counters."""
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def cache_info(self):
+        """Returns a dictionary with the hits, misses and sizes."""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'maxsize': self.maxsize,
+            'currsize': len(self._data)
+        }
 
 
 def _str_or_expr_to_bibtex(e):
+    import bibtexparser
+
     if isinstance(e, bibtexparser.bibdatabase.BibDataStringExpression):
         return ' # '.join([_str_or_expr_to_bibtex(s) for s in e.expr])
     elif isinstance(e, bibtexparser.bibdatabase.BibDataString):